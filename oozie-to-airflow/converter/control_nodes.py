@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Removes the pass-through control nodes from the parsed workflow"""
+from collections import deque
+from typing import AbstractSet, Dict, NamedTuple
+
+from converter.parsed_node import ParsedNode
+from converter.primitives import Relation, Workflow
+from mappers.decision_mapper import DecisionMapper
+from mappers.dummy_mapper import DummyMapper
+from utils.trigger_rule import TriggerRule
+
+# Tags of the workflow nodes mapped to tasks which only pass the control on
+COLLAPSIBLE_NODE_TAGS = ("fork", "join")
+
+
+class CollapsedControlNodes(NamedTuple):
+    removed_tasks: int
+    removed_relations: int
+
+
+def _is_collapsible(
+    workflow: Workflow,
+    node: ParsedNode,
+    nodes_by_first_task_id: Dict[str, ParsedNode],
+    decision_task_ids: AbstractSet[str],
+) -> bool:
+    """
+    A control node is collapsible when connecting its upstream tasks directly to its downstream
+    tasks does not change when and whether any task runs, nor the state of the DAG run:
+
+    * its task, and the tasks downstream of it, run only when all their upstream tasks succeed,
+      so the downstream tasks see the same outcome from the upstream tasks as from the node,
+    * none of its upstream tasks is a branch, which follows the node by its task id,
+    * it is not a leaf, as the leaves determine the state of the DAG run,
+    * it has a single upstream or a single downstream task, so that rewiring it does not add
+      more relations than it removes.
+    """
+    if not isinstance(node.mapper, DummyMapper) or node.mapper.oozie_node.tag not in COLLAPSIBLE_NODE_TAGS:
+        return False
+    if node.mapper.trigger_rule != TriggerRule.ALL_SUCCESS:
+        return False
+    task_id = node.first_task_id
+    upstream_task_ids = workflow.relations.get_upstream_task_ids(task_id)
+    downstream_task_ids = workflow.relations.get_downstream_task_ids(task_id)
+    if not downstream_task_ids or (len(upstream_task_ids) > 1 and len(downstream_task_ids) > 1):
+        return False
+    if not decision_task_ids.isdisjoint(upstream_task_ids):
+        return False
+    for downstream_task_id in downstream_task_ids:
+        downstream_node = nodes_by_first_task_id.get(downstream_task_id)
+        if downstream_node is None or downstream_node.mapper.trigger_rule != TriggerRule.ALL_SUCCESS:
+            return False
+    return True
+
+
+def collapse_control_nodes(workflow: Workflow) -> CollapsedControlNodes:
+    """
+    Removes the fork and join nodes that only pass the control on, connecting their upstream
+    tasks directly to their downstream tasks. Each of them would otherwise be a DummyOperator,
+    costing a task instance and a slot of the executor in every DAG run.
+
+    :param workflow: Workflow after the relations and the trigger rules are created.
+    :return: Numbers of the removed tasks and relations.
+    """
+    relations_count = len(workflow.relations)
+    nodes_by_first_task_id = {node.first_task_id: node for node in workflow.nodes.values()}
+    nodes_by_last_task_id = {node.last_task_id: node for node in workflow.nodes.values()}
+    decision_task_ids = {
+        node.last_task_id for node in workflow.nodes.get_nodes_by_mapper_type(DecisionMapper)
+    }
+    candidates = deque(workflow.nodes.get_nodes_by_mapper_type(DummyMapper))
+    removed_tasks = 0
+    while candidates:
+        node = candidates.popleft()
+        if node.mapper.name not in workflow.nodes or not _is_collapsible(
+            workflow, node, nodes_by_first_task_id, decision_task_ids
+        ):
+            continue
+        task_id = node.first_task_id
+        upstream_task_ids = workflow.relations.get_upstream_task_ids(task_id)
+        downstream_task_ids = workflow.relations.get_downstream_task_ids(task_id)
+        workflow.relations.remove_relations_to(task_id)
+        workflow.relations.remove_relations_from(task_id)
+        for upstream_task_id in upstream_task_ids:
+            for downstream_task_id in downstream_task_ids:
+                workflow.relations.add(Relation(from_task_id=upstream_task_id, to_task_id=downstream_task_id))
+        del workflow.nodes[node.mapper.name]
+        del nodes_by_first_task_id[task_id]
+        removed_tasks += 1
+        # The degrees of the neighbours changed, so they may have become collapsible
+        neighbours = [nodes_by_last_task_id.get(upstream_task_id) for upstream_task_id in upstream_task_ids]
+        neighbours += [
+            nodes_by_first_task_id.get(downstream_task_id) for downstream_task_id in downstream_task_ids
+        ]
+        candidates.extend(neighbour for neighbour in neighbours if neighbour is not None)
+    return CollapsedControlNodes(
+        removed_tasks=removed_tasks, removed_relations=relations_count - len(workflow.relations)
+    )
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Persistent cache of conversion outputs keyed by the content of the converted workflow"""
+import functools
+import getpass
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Set
+from xml.etree import ElementTree as ET
+
+from converter.output import ConversionOutput
+from definitions import ROOT_DIR, TPL_PATH
+from utils import el_utils
+from utils.constants import CONFIGURATION_PROPERTIES, JOB_PROPERTIES, WORKFLOW_XML
+
+# Bump when the layout of the cache entries changes
+CACHE_FORMAT_VERSION = "1"
+
+# Directories with the code that determines the content of the generated DAGs
+CONVERTER_SOURCE_DIRECTORIES = ["converter", "mappers", "utils", "o2a_libs"]
+CONVERTER_SOURCE_FILES = ["o2a.py", "definitions.py"]
+
+APPLICATION_FILES = [WORKFLOW_XML, JOB_PROPERTIES, CONFIGURATION_PROPERTIES]
+ASSETS_DIRECTORY = "assets"
+
+
+def _hash_file(hasher, file_path: str) -> None:
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(65536), b""):
+            hasher.update(chunk)
+
+
+def _hash_directory(hasher, directory_path: str, suffix: str = "") -> None:
+    """Hashes names and content of all files under the directory, in a stable order"""
+    for current_path, directory_names, file_names in os.walk(directory_path):
+        directory_names.sort()
+        for file_name in sorted(file_names):
+            if not file_name.endswith(suffix):
+                continue
+            file_path = os.path.join(current_path, file_name)
+            hasher.update(os.path.relpath(file_path, directory_path).encode())
+            hasher.update(b"\0")
+            _hash_file(hasher, file_path)
+            hasher.update(b"\0")
+
+
+@functools.lru_cache(maxsize=None)
+def get_converter_fingerprint() -> str:
+    """
+    Returns a hash of the converter code and the template set. Any change to them
+    invalidates all entries of the cache.
+    """
+    hasher = hashlib.sha256(CACHE_FORMAT_VERSION.encode())
+    for directory_name in CONVERTER_SOURCE_DIRECTORIES:
+        _hash_directory(hasher, os.path.join(ROOT_DIR, directory_name), suffix=".py")
+    for file_name in CONVERTER_SOURCE_FILES:
+        hasher.update(file_name.encode())
+        hasher.update(b"\0")
+        _hash_file(hasher, os.path.join(ROOT_DIR, file_name))
+    _hash_directory(hasher, TPL_PATH)
+    return hasher.hexdigest()
+
+
+def find_subworkflow_app_paths(input_directory_path: str, user: str = None) -> List[str]:
+    """
+    Returns local directories of the sub-workflow applications referenced by the workflow.
+    The app-path is resolved the same way the SubworkflowMapper resolves it.
+    """
+    params = el_utils.load_workflow_params(input_directory_path, user=user or getpass.getuser())
+
+    app_paths = []
+    root = ET.parse(os.path.join(input_directory_path, WORKFLOW_XML)).getroot()
+    for node in root.iter():
+        if node.tag.split("}")[-1] != "sub-workflow":
+            continue
+        # Imported only for workflows with sub-workflows, so that other mappers are not loaded
+        from mappers.subworkflow_mapper import get_app_directory_path
+
+        for child in node:
+            if child.tag.split("}")[-1] == "app-path" and child.text:
+                app_path = el_utils.replace_el_with_var(child.text.strip(), params=params, quote=False)
+                app_paths.append(get_app_directory_path(app_path, input_directory_path))
+    return app_paths
+
+
+def get_application_digest(input_directory_path: str, user: str = None, visited: Set[str] = None) -> str:
+    """
+    Returns hash of the workflow application: its workflow.xml, properties files, assets and,
+    recursively, of all sub-workflow applications it references. A change in a child
+    application therefore changes the digest of all its parents.
+
+    :param input_directory_path: Oozie workflow application directory.
+    :param user: The user used in place of ${user.name}.
+    :param visited: Applications on the current path, used to break reference cycles.
+    """
+    input_directory_path = os.path.abspath(input_directory_path)
+    visited = set(visited or ())
+    visited.add(input_directory_path)
+
+    hasher = hashlib.sha256()
+    for file_name in APPLICATION_FILES:
+        file_path = os.path.join(input_directory_path, file_name)
+        hasher.update(file_name.encode())
+        if os.path.isfile(file_path):
+            hasher.update(b"\1")
+            _hash_file(hasher, file_path)
+        hasher.update(b"\0")
+    assets_directory_path = os.path.join(input_directory_path, ASSETS_DIRECTORY)
+    if os.path.isdir(assets_directory_path):
+        _hash_directory(hasher, assets_directory_path)
+
+    for app_path in find_subworkflow_app_paths(input_directory_path, user):
+        app_path = os.path.abspath(app_path)
+        hasher.update(app_path.encode())
+        if app_path in visited:
+            continue
+        if os.path.isdir(app_path):
+            hasher.update(get_application_digest(app_path, user=user, visited=visited).encode())
+    return hasher.hexdigest()
+
+
+class ConversionCache:
+    """
+    On-disk cache of conversion outputs. Each entry is a copy of the output directory
+    (the DAG file and all its assets) stored under the cache key.
+    """
+
+    def __init__(self, cache_directory_path: str):
+        self.cache_directory_path = cache_directory_path
+
+    @staticmethod
+    def get_key(input_directory_path: str, options: Dict[str, Any], user: str = None) -> str:
+        """
+        Returns the cache key of the conversion.
+
+        :param input_directory_path: Oozie workflow application directory.
+        :param options: Conversion options that influence the output, such as the DAG name.
+        :param user: The user used in place of ${user.name}.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(get_converter_fingerprint().encode())
+        hasher.update(get_application_digest(input_directory_path, user=user).encode())
+        hasher.update(json.dumps(options, sort_keys=True, default=str).encode())
+        return hasher.hexdigest()
+
+    def _get_entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_directory_path, key[:2], key)
+
+    def restore(self, key: str, output: ConversionOutput) -> bool:
+        """
+        Replaces the output with the cached output, if there is one.
+
+        :param output: Output the cached files are written to.
+        :return: True on a cache hit, False otherwise.
+        """
+        entry_path = self._get_entry_path(key)
+        if not os.path.isdir(entry_path):
+            return False
+        output.reset()
+        for current_path, _, file_names in os.walk(entry_path):
+            for file_name in file_names:
+                file_path = os.path.join(current_path, file_name)
+                with open(file_path, "rb") as file:
+                    output.write_asset(os.path.relpath(file_path, entry_path), file.read())
+        output.finish()
+        logging.info(f"Reused cached conversion output: {entry_path}")
+        return True
+
+    def store(self, key: str, output_directory_path: str) -> str:
+        """
+        Stores the output directory in the cache. The entry is first written to a temporary
+        directory and then renamed, so concurrent conversions never see a partial entry.
+
+        :return: Path of the cache entry.
+        """
+        entry_path = self._get_entry_path(key)
+        if os.path.isdir(entry_path):
+            return entry_path
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        temporary_path = tempfile.mkdtemp(prefix=f".{key}.", dir=os.path.dirname(entry_path))
+        try:
+            shutil.copytree(output_directory_path, os.path.join(temporary_path, key))
+            os.rename(os.path.join(temporary_path, key), entry_path)
+        except OSError:
+            if not os.path.isdir(entry_path):
+                raise
+        finally:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+        logging.info(f"Stored conversion output in cache: {entry_path}")
+        return entry_path
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Options of the conversion of a workflow"""
+from typing import NamedTuple, Optional
+
+
+class ConversionOptions(NamedTuple):
+    """
+    Options of how a workflow and its sub-workflows are converted, passed as a whole from
+    the entry points to the converters, the parsers and the mappers of the sub-workflows.
+
+    :param user: The user used in place of ${user.name} [defaults to the user who runs the conversion].
+    :param start_days_ago: Desired DAG start date, expressed as number of days ago from the present day.
+    :param schedule_interval: Desired DAG schedule interval, expressed as number of days.
+    :param fast_format: Skip black's safety checks when formatting the generated DAGs.
+    :param prune_params: Write to the DAGs and pass to the tasks only the params they reference.
+    :param shared_params: Write the params from the configuration properties to a separate file,
+        loaded once per process by all the DAGs converted with the same configuration.
+    :param collapse_control_nodes: Remove the fork and join tasks which only pass the control on.
+    :param reduce_relations: Remove the relations between tasks implied by other relations.
+    :param compact_dag: Write the tasks and relations as data, created by the task factory of o2a_libs.
+    """
+
+    user: Optional[str] = None
+    start_days_ago: int = 0
+    schedule_interval: int = 0
+    fast_format: bool = False
+    prune_params: bool = True
+    shared_params: bool = False
+    collapse_control_nodes: bool = False
+    reduce_relations: bool = True
+    compact_dag: bool = False
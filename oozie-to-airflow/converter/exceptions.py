@@ -21,3 +21,16 @@ class O2AException(Exception):
 
 class ParseException(O2AException):
     """Raised when an error occurs in the parsing phase."""
+
+
+class ELParserException(ParseException):
+    """Raised when an EL expression cannot be parsed."""
+
+
+class WorkflowValidationException(O2AException):
+    """Raised when a workflow does not conform to the Oozie XML schemas."""
+
+    def __init__(self, file_path, errors):
+        super().__init__(f"Workflow failed schema validation: {file_path}")
+        self.file_path = file_path
+        self.errors = errors
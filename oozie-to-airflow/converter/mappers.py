@@ -19,40 +19,101 @@ particular actions.
 
 """
 
-from typing import Type, Dict
+import importlib
+import logging
+from typing import Any, Dict, Generic, Iterator, List, Mapping, Optional, Tuple, Type, TypeVar
 
 from mappers.action_mapper import ActionMapper
 from mappers.base_mapper import BaseMapper
-from mappers.decision_mapper import DecisionMapper
-from mappers.dummy_mapper import DummyMapper
-from mappers.end_mapper import EndMapper
-from mappers.fs_mapper import FsMapper
-from mappers.kill_mapper import KillMapper
-from mappers.mapreduce_mapper import MapReduceMapper
-from mappers.pig_mapper import PigMapper
-from mappers.shell_mapper import ShellMapper
-from mappers.spark_mapper import SparkMapper
-from mappers.ssh_mapper import SSHMapper
-from mappers.start_mapper import StartMapper
-from mappers.subworkflow_mapper import SubworkflowMapper
-
-
-CONTROL_MAP: Dict[str, Type[BaseMapper]] = {
-    "decision": DecisionMapper,
-    "end": EndMapper,
-    "kill": KillMapper,
-    "fork": DummyMapper,
-    "join": DummyMapper,
-    "start": StartMapper,
-}
-
-ACTION_MAP: Dict[str, Type[ActionMapper]] = {
-    "unknown": DummyMapper,
-    "ssh": SSHMapper,
-    "spark": SparkMapper,
-    "pig": PigMapper,
-    "fs": FsMapper,
-    "sub-workflow": SubworkflowMapper,
-    "shell": ShellMapper,
-    "map-reduce": MapReduceMapper,
-}
+
+# Entry point group under which other packages can register mappers of their action types, e.g.:
+#     entry_points={"o2a.mappers": ["my-action = my_package.my_mapper:MyMapper"]}
+MAPPERS_ENTRY_POINT_GROUP = "o2a.mappers"
+
+Mapper = TypeVar("Mapper", bound=BaseMapper)
+
+
+def _iter_entry_points(group: str) -> List[Tuple[str, str]]:
+    """Returns (name, 'module:attribute') pairs of the entry points registered in the group"""
+    try:
+        from importlib import metadata
+    except ImportError:  # Python < 3.8
+        import pkg_resources
+
+        return [
+            (entry_point.name, f"{entry_point.module_name}:{'.'.join(entry_point.attrs)}")
+            for entry_point in pkg_resources.iter_entry_points(group)
+        ]
+    # A dictionary of the groups before Python 3.10, selectable by the group since
+    entry_points: Any = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        selected = entry_points.select(group=group)
+    else:
+        selected = entry_points.get(group, [])
+    return [(entry_point.name, entry_point.value) for entry_point in selected]
+
+
+class MapperRegistry(Mapping[str, Type[Mapper]], Generic[Mapper]):
+    """
+    Maps Oozie node tags to mapper classes. The classes are given as 'module:ClassName'
+    paths and their modules are imported only when the mapper is first needed, so that
+    converting a workflow only loads the mappers it uses.
+
+    :param mapper_paths: Dictionary of {'tag': 'module:ClassName'}.
+    :param entry_point_group: Optional entry point group of additional mappers. They are
+        discovered on first lookup and take precedence over the built-in ones.
+    """
+
+    def __init__(self, mapper_paths: Dict[str, str], entry_point_group: Optional[str] = None):
+        self._mapper_paths = dict(mapper_paths)
+        self._entry_point_group = entry_point_group
+        self._mappers: Dict[str, Type[Mapper]] = {}
+
+    def _get_mapper_paths(self) -> Dict[str, str]:
+        if self._entry_point_group:
+            for name, path in _iter_entry_points(self._entry_point_group):
+                logging.info(f"Registered mapper {path} for the {name} nodes")
+                self._mapper_paths[name] = path
+            self._entry_point_group = None
+        return self._mapper_paths
+
+    def __getitem__(self, tag: str) -> Type[Mapper]:
+        if tag not in self._mappers:
+            module_name, class_name = self._get_mapper_paths()[tag].split(":")
+            self._mappers[tag] = getattr(importlib.import_module(module_name), class_name)
+        return self._mappers[tag]
+
+    def __contains__(self, tag) -> bool:
+        return tag in self._get_mapper_paths()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._get_mapper_paths())
+
+    def __len__(self) -> int:
+        return len(self._get_mapper_paths())
+
+
+CONTROL_MAP: MapperRegistry[BaseMapper] = MapperRegistry(
+    {
+        "decision": "mappers.decision_mapper:DecisionMapper",
+        "end": "mappers.end_mapper:EndMapper",
+        "kill": "mappers.kill_mapper:KillMapper",
+        "fork": "mappers.dummy_mapper:DummyMapper",
+        "join": "mappers.dummy_mapper:DummyMapper",
+        "start": "mappers.start_mapper:StartMapper",
+    }
+)
+
+ACTION_MAP: MapperRegistry[ActionMapper] = MapperRegistry(
+    {
+        "unknown": "mappers.dummy_mapper:DummyMapper",
+        "ssh": "mappers.ssh_mapper:SSHMapper",
+        "spark": "mappers.spark_mapper:SparkMapper",
+        "pig": "mappers.pig_mapper:PigMapper",
+        "fs": "mappers.fs_mapper:FsMapper",
+        "sub-workflow": "mappers.subworkflow_mapper:SubworkflowMapper",
+        "shell": "mappers.shell_mapper:ShellMapper",
+        "map-reduce": "mappers.mapreduce_mapper:MapReduceMapper",
+    },
+    entry_point_group=MAPPERS_ENTRY_POINT_GROUP,
+)
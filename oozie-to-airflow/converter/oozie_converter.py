@@ -14,9 +14,10 @@
 # limitations under the License.
 """Converts Oozie application workflow into Airflow's DAG
 """
-import shutil
-from pathlib import Path
-from typing import Dict, TextIO, Type, Set, Union, List
+import getpass
+import hashlib
+import io
+from typing import Dict, Mapping, Optional, TextIO, Type, Set, Union, List
 
 import os
 import json
@@ -24,20 +25,30 @@ import json
 import textwrap
 import logging
 
-import black
-
 from converter import parser
+from converter.conversion_options import ConversionOptions
+from converter.output import ConversionOutput, DirectoryOutput
 from converter.parsed_node import ParsedNode
 from converter.primitives import Relation
 from mappers.action_mapper import ActionMapper
 from mappers.base_mapper import BaseMapper
-from utils import el_utils
+from utils import el_utils, params_utils, profile_utils
 from utils.constants import CONFIGURATION_PROPERTIES, JOB_PROPERTIES
 from utils.el_utils import comma_separated_string_to_list
+from utils.format_utils import format_source
+from utils.relation_utils import sort_relations
+from utils.task_table_utils import TASK_FACTORY_IMPORT, TaskTable, get_import_aliases
 from utils.template_utils import render_template
 
 INDENT = 4
 
+SHARED_PARAMS_IMPORT = "from o2a_libs.shared_params import load_shared_params"
+
+
+def convert_params(params: Mapping[str, str]) -> Dict[str, Union[List[str], str]]:
+    """Converts the comma-separated values of the params to lists"""
+    return {key: comma_separated_string_to_list(value) for key, value in params.items()}
+
 
 class OozieConverter:
     """Converts Oozie Workflow app to Airflow's DAG
@@ -47,86 +58,78 @@ class OozieConverter:
         self,
         dag_name: str,
         input_directory_path: str,
-        output_directory_path: str,
-        action_mapper: Dict[str, Type[ActionMapper]],
-        control_mapper: Dict[str, Type[BaseMapper]],
-        user: str = None,
-        start_days_ago: int = None,
-        schedule_interval: str = None,
+        output_directory_path: Optional[str],
+        action_mapper: Mapping[str, Type[ActionMapper]],
+        control_mapper: Mapping[str, Type[BaseMapper]],
         output_dag_name: str = None,
+        output: ConversionOutput = None,
+        options: ConversionOptions = ConversionOptions(),
     ):
         """
         :param input_directory_path: Oozie workflow directory.
-        :param output_directory_path: Desired output directory.
-        :param user: Username.  # TODO remove me and use real ${user} EL
-        :param start_days_ago: Desired DAG start date, expressed as number of days ago from the present day
-        :param schedule_interval: Desired DAG schedule interval, expressed as number of days
+        :param output_directory_path: Desired output directory. Not used when the output is given.
         :param dag_name: Desired output DAG name.
+        :param output: Destination of the generated files [defaults to the output directory].
+        :param options: Options of the conversion, including the user and the schedule of the DAG.
         """
         # Each OozieParser class corresponds to one workflow, where one can get
         # the workflow's required dependencies (imports), operator relations,
         # and operator execution sequence.
         self.input_directory_path = input_directory_path
         self.output_directory_path = output_directory_path
-        self.start_days_ago = start_days_ago
-        self.schedule_interval = schedule_interval
         self.dag_name = dag_name
+        self.options = options
         self.configuration_properties_file = os.path.join(input_directory_path, CONFIGURATION_PROPERTIES)
         self.job_properties_file = os.path.join(input_directory_path, JOB_PROPERTIES)
-        self.output_dag_name = (
-            os.path.join(output_directory_path, output_dag_name)
-            if output_dag_name
-            else os.path.join(output_directory_path, self.dag_name) + ".py"
+        self.output_dag_name = output_dag_name or f"{self.dag_name}.py"
+        if output is None:
+            if output_directory_path is None:
+                raise ValueError("Either the output or the output directory path is required")
+            output = DirectoryOutput(output_directory_path)
+        self.output: ConversionOutput = output
+        self.params = el_utils.load_workflow_params(
+            input_directory_path, user=options.user or getpass.getuser()
         )
-        params = {"user.name": user or os.environ["USER"]}
-        params = self.add_properties_to_params(params)
-        params = el_utils.parse_els(self.configuration_properties_file, params)
-        self.params = params
         self.parser = parser.OozieParser(
             input_directory_path=input_directory_path,
             output_directory_path=output_directory_path,
-            params=params,
+            params=self.params,
             dag_name=dag_name,
             action_mapper=action_mapper,
             control_mapper=control_mapper,
+            output=self.output,
+            options=options,
         )
 
     def recreate_output_directory(self):
-        self._recreate_output_directory()
+        self.output.reset()
 
     def convert(self):
-        self.parser.parse_workflow()
+        with profile_utils.phase("parse_workflow"):
+            self.parser.parse_workflow()
         relations = self.parser.get_relations()
         depends = self.parser.get_dependencies()
         nodes = self.parser.get_nodes()
-        self.create_dag_file(nodes, depends, relations)
-
-    def _recreate_output_directory(self):
-        shutil.rmtree(self.output_directory_path, ignore_errors=True)
-        os.makedirs(self.output_directory_path, exist_ok=True)
-
-    def add_properties_to_params(self, params: Dict[str, str]):
-        """
-        Template method, can be overridden.
-        """
-        return el_utils.parse_els(self.job_properties_file, params)
+        with profile_utils.phase("create_dag_file"):
+            self.create_dag_file(nodes, depends, relations)
 
     def create_dag_file(self, nodes: Dict[str, ParsedNode], depends: Set[str], relations: Set[Relation]):
         """
-        Writes to a file the Apache Oozie parsed workflow in Airflow's DAG format.
+        Writes to the output the Apache Oozie parsed workflow in Airflow's DAG format.
 
         :param nodes: A dictionary of {'task_id': ParsedNode object}
         :param depends: A list of strings that will be interpreted as import
             statements
         :param relations: A list of Relation corresponding to operator relations
         """
-        file_name = self.output_dag_name
-        with open(file_name, "w") as file:
-            logging.info(f"Saving to file: {file_name}")
-            self.write_dag(depends, file, nodes, relations)
-        black.format_file_in_place(
-            Path(file_name), mode=black.FileMode(line_length=110), fast=False, write_back=black.WriteBack.YES
-        )
+        source = io.StringIO()
+        self.write_dag(depends, source, nodes, relations)
+        profile_utils.memory_checkpoint("write_dag")
+        formatted_source = format_source(source.getvalue(), fast=self.options.fast_format)
+        profile_utils.memory_checkpoint("format_source")
+        with profile_utils.phase("write_output"):
+            self.output.write_dag(self.output_dag_name, formatted_source)
+        profile_utils.memory_checkpoint("write_output")
 
     def write_dag(
         self, depends: Set[str], file: TextIO, nodes: Dict[str, ParsedNode], relations: Set[Relation]
@@ -134,19 +137,145 @@ class OozieConverter:
         """
         Template method, can be overridden.
         """
-        self.write_dependencies(file, depends)
-        self.write_params(file, self.params)
-        self.write_dag_header(file, self.dag_name, self.schedule_interval, self.start_days_ago)
-        self.write_nodes(file, nodes)
-        file.write("\n\n")
-        self.write_relations(file, relations)
+        nodes_file = io.StringIO()
+        self.write_nodes(nodes_file, nodes, indent=0)
+        nodes_source = nodes_file.getvalue()
+        task_table = (
+            self.create_task_table(nodes_source, relations, depends) if self.options.compact_dag else None
+        )
+        user_defined_macros = el_utils.uses_el_macros(nodes_source)
+        shared_params = self.get_shared_params() if self.options.shared_params else {}
+        self.write_dependencies(
+            file,
+            self.get_dag_dependencies(
+                depends, task_table, user_defined_macros, shared_params=bool(shared_params)
+            ),
+        )
+        self.write_dag_params(file, nodes_source, shared_params)
+        if task_table:
+            file.write(task_table.render_data())
+        self.write_dag_header(
+            file,
+            self.dag_name,
+            self.options.schedule_interval,
+            self.options.start_days_ago,
+            user_defined_macros=user_defined_macros,
+        )
+        self.write_tasks(file, nodes_source, relations, task_table)
 
     @staticmethod
-    def write_params(file: TextIO, params: Dict[str, str]) -> None:
-        converted_params: Dict[str, Union[List[str], str]] = {
-            x: comma_separated_string_to_list(y) for x, y in params.items()
+    def get_dag_dependencies(
+        depends: Set[str],
+        task_table: Optional[TaskTable],
+        user_defined_macros: bool,
+        shared_params: bool = False,
+    ) -> Set[str]:
+        """
+        Returns the imports of the DAG, together with the ones of the task factory of the compact
+        DAG, of the EL macros and of the shared params loader, if they are used.
+        """
+        dag_depends = set(depends)
+        if task_table:
+            dag_depends.add(TASK_FACTORY_IMPORT)
+        if user_defined_macros:
+            dag_depends.add(el_utils.EL_MACROS_IMPORT)
+        if shared_params:
+            dag_depends.add(SHARED_PARAMS_IMPORT)
+        return dag_depends
+
+    @staticmethod
+    def create_task_table(nodes_source: str, relations: Set[Relation], depends: Set[str]) -> TaskTable:
+        """
+        Converts the tasks and the relations to the data of the compact DAG.
+
+        :param nodes_source: The generated source of the tasks, not indented.
+        :param relations: The relations between the tasks.
+        :param depends: The imports of the DAG, which the operators of the tasks come from.
+        """
+        task_table = TaskTable(get_import_aliases(depends))
+        task_table.add_source(nodes_source)
+        task_table.add_relations(relations)
+        return task_table
+
+    def write_tasks(
+        self,
+        file: TextIO,
+        nodes_source: str,
+        relations: Set[Relation],
+        task_table: Optional[TaskTable],
+        indent: int = INDENT,
+    ) -> None:
+        """
+        Writes the tasks and the relations to the body of the DAG - as code, or as the calls
+        of the task factory in the compact mode.
+
+        :param nodes_source: The generated source of the tasks, not indented.
+        """
+        if task_table:
+            file.write(textwrap.indent(task_table.render_body(), indent * " "))
+            return
+        file.write(textwrap.indent(nodes_source, indent * " "))
+        file.write("\n\n")
+        self.write_relations(file, relations, indent=indent)
+
+    def get_dag_params(self, nodes_source: str) -> Mapping[str, str]:
+        """
+        Returns the params to write to the DAG - only the ones referenced by the tasks, unless
+        pruning is disabled.
+
+        :param nodes_source: The generated source of the tasks.
+        """
+        if not self.options.prune_params:
+            return self.params
+        return params_utils.prune_params(nodes_source, self.params)
+
+    def get_shared_params(self) -> Dict[str, str]:
+        """
+        Returns the params of the configuration properties resolved on their own - the layer shared
+        by the workflows converted with the same configuration. The params whose value in the workflow
+        depends on its job properties or on the user are left to the DAG.
+        """
+        if not os.path.isfile(self.configuration_properties_file):
+            return {}
+        configuration_params = el_utils.parse_els(self.configuration_properties_file)
+        return {
+            key: configuration_params[key]
+            for key in sorted(configuration_params)
+            if self.params.get(key) == configuration_params[key]
         }
-        file.write("PARAMS = " + json.dumps(converted_params, indent=INDENT) + "\n\n")
+
+    def write_dag_params(
+        self, file: TextIO, nodes_source: str, shared_params: Mapping[str, str] = None
+    ) -> None:
+        """
+        Writes the PARAMS of the DAG. With shared params, the shared layer is written to a
+        separate file and the DAG overlays only its own params on it.
+
+        :param file: The file pointer to write to.
+        :param nodes_source: The generated source of the tasks.
+        :param shared_params: The params shared with the other workflows, see get_shared_params.
+        """
+        params = self.get_dag_params(nodes_source)
+        if not shared_params:
+            self.write_params(file, params)
+            return
+        content = (json.dumps(convert_params(shared_params), indent=INDENT, sort_keys=True) + "\n").encode()
+        shared_params_file_name = f"o2a_params_{hashlib.sha256(content).hexdigest()[:16]}.json"
+        self.output.write_asset(shared_params_file_name, content)
+        own_params = {key: value for key, value in params.items() if shared_params.get(key) != value}
+        self.write_params(file, own_params, shared_params_file_name=shared_params_file_name)
+
+    @staticmethod
+    def write_params(file: TextIO, params: Mapping[str, str], shared_params_file_name: str = None) -> None:
+        converted_params = convert_params(params)
+        if not shared_params_file_name:
+            file.write("PARAMS = " + json.dumps(converted_params, indent=INDENT, sort_keys=True) + "\n\n")
+            return
+        items = [f"**load_shared_params(__file__, {json.dumps(shared_params_file_name)})"]
+        items.extend(
+            f"{json.dumps(key)}: {json.dumps(value)}" for key, value in sorted(converted_params.items())
+        )
+        file.write("PARAMS = {" + ", ".join(items) + "}\n\n")
 
     def write_nodes(self, file: TextIO, nodes: Dict[str, ParsedNode], indent: int = INDENT):
         """
@@ -157,12 +286,18 @@ class OozieConverter:
         :param indent: integer of how many spaces to indent entire operator
         """
         for node in nodes.values():
-            file.write(textwrap.indent(node.mapper.convert_to_text(), indent * " "))
+            with profile_utils.phase("convert_to_text/" + type(node.mapper).__name__):
+                task_source = node.mapper.convert_to_text()
+            if self.options.prune_params:
+                task_source = params_utils.project_task_params(task_source, self.params)
+            file.write(textwrap.indent(task_source, indent * " "))
             logging.info(f"Wrote tasks corresponding to the action named: {node.mapper.name}")
-            node.mapper.copy_extra_assets(
-                input_directory_path=os.path.join(self.input_directory_path, "assets"),
-                output_directory_path=self.output_directory_path,
-            )
+            with profile_utils.phase("copy_assets"):
+                extra_assets = node.mapper.get_extra_assets(
+                    input_directory_path=os.path.join(self.input_directory_path, "assets")
+                )
+                for path, content in extra_assets.items():
+                    self.output.write_asset(path, content)
 
     @staticmethod
     def write_relations(file, relations, indent=INDENT):
@@ -172,22 +307,24 @@ class OozieConverter:
         These are each written on a new line.
         """
         logging.info("Writing control flow dependencies to file.")
-        relations_str = render_template(template_name="relations.tpl", relations=relations)
+        relations_str = render_template(template_name="relations.tpl", relations=sort_relations(relations))
         file.write(textwrap.indent(relations_str, indent * " "))
 
     @staticmethod
     def write_dependencies(file, depends, line_prefix=""):
         """
-        Writes each dependency on a new line of the given file pointer.
+        Writes each dependency on a new line of the given file pointer, in sorted order.
 
         Of the form: from time import time, etc.
         """
         logging.info("Writing imports to file")
-        file.write(f"\n{line_prefix}".join(depends))
+        file.write(f"\n{line_prefix}".join(sorted(depends)))
         file.write("\n\n")
 
     @staticmethod
-    def write_dag_header(file, dag_name, schedule_interval, start_days_ago, template="dag.tpl"):
+    def write_dag_header(
+        file, dag_name, schedule_interval, start_days_ago, template="dag.tpl", user_defined_macros=False
+    ):
         """
         Write the DAG header to the open file specified in the file pointer
         :param file: Opened file to write to.
@@ -195,6 +332,8 @@ class OozieConverter:
         :param schedule_interval: Desired DAG schedule interval, expressed as number of days
         :param start_days_ago: Desired DAG start date, expressed as number of days ago from the present day
         :param template: Desired template to use when creating the DAG header.
+        :param user_defined_macros: Whether to register the EL functions and operators as the
+            macros of the DAG, so that its Jinja templates can call them.
         """
 
         file.write(
@@ -203,6 +342,7 @@ class OozieConverter:
                 dag_name=dag_name,
                 schedule_interval=schedule_interval,
                 start_days_ago=start_days_ago,
+                user_defined_macros=user_defined_macros,
             )
         )
         logging.info("Wrote DAG header.")
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Destinations of the files generated by a conversion"""
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from typing import Dict, Optional, Set
+
+
+class ConversionOutput:
+    """
+    Receives the DAG files and the assets generated by a conversion. The paths are relative
+    to the root of the output.
+    """
+
+    def reset(self) -> None:
+        """Removes everything written before"""
+        raise NotImplementedError("Not Implemented")
+
+    def write_dag(self, file_name: str, source: str) -> None:
+        """Writes the source of a DAG or a sub-DAG"""
+        raise NotImplementedError("Not Implemented")
+
+    def write_asset(self, path: str, content: bytes) -> None:
+        """Writes a file required by the DAG - such as a script file"""
+        raise NotImplementedError("Not Implemented")
+
+    def finish(self) -> None:
+        """Called once everything is written"""
+
+
+class DirectoryOutput(ConversionOutput):
+    """Writes the generated files to a directory"""
+
+    def __init__(self, directory_path: str):
+        self.directory_path = directory_path
+
+    def reset(self) -> None:
+        shutil.rmtree(self.directory_path, ignore_errors=True)
+        os.makedirs(self.directory_path, exist_ok=True)
+
+    def write_dag(self, file_name: str, source: str) -> None:
+        file_path = os.path.join(self.directory_path, file_name)
+        logging.info(f"Saving to file: {file_path}")
+        with open(file_path, "w") as file:
+            file.write(source)
+
+    def write_asset(self, path: str, content: bytes) -> None:
+        file_path = os.path.join(self.directory_path, path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as file:
+            file.write(content)
+
+
+class MemoryOutput(ConversionOutput):
+    """Keeps the generated files in memory"""
+
+    def __init__(self):
+        self.dags: Dict[str, str] = {}
+        self.assets: Dict[str, bytes] = {}
+
+    def reset(self) -> None:
+        self.dags.clear()
+        self.assets.clear()
+
+    def write_dag(self, file_name: str, source: str) -> None:
+        self.dags[file_name] = source
+
+    def write_asset(self, path: str, content: bytes) -> None:
+        self.assets[path] = content
+
+
+def _get_file_digest(file_path: str) -> Optional[bytes]:
+    try:
+        with open(file_path, "rb") as file:
+            hasher = hashlib.sha256()
+            for chunk in iter(lambda: file.read(65536), b""):
+                hasher.update(chunk)
+            return hasher.digest()
+    except FileNotFoundError:
+        return None
+
+
+class SyncedDirectoryOutput(DirectoryOutput):
+    """
+    Writes the generated files to a directory, replacing only the files whose content changed.
+    A changed file is written to a temporary file and atomically renamed, so readers never see
+    a partially written file, and unchanged files keep their modification time. The files which
+    were not written by the conversion are deleted when it finishes.
+    """
+
+    def __init__(self, directory_path: str):
+        super().__init__(directory_path)
+        self.written_paths: Set[str] = set()
+
+    def reset(self) -> None:
+        self.written_paths.clear()
+        os.makedirs(self.directory_path, exist_ok=True)
+
+    def write_dag(self, file_name: str, source: str) -> None:
+        self.write_asset(file_name, source.encode())
+
+    def write_asset(self, path: str, content: bytes) -> None:
+        file_path = os.path.normpath(os.path.join(self.directory_path, path))
+        self.written_paths.add(file_path)
+        if _get_file_digest(file_path) == hashlib.sha256(content).digest():
+            logging.info(f"File did not change: {file_path}")
+            return
+        directory_path = os.path.dirname(file_path)
+        os.makedirs(directory_path, exist_ok=True)
+        # Hidden, so that Airflow does not try to load it as a DAG
+        temporary_path = os.path.join(directory_path, f".{os.path.basename(file_path)}.{uuid.uuid4().hex}")
+        try:
+            with open(temporary_path, "xb") as file:
+                file.write(content)
+            os.replace(temporary_path, file_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        logging.info(f"Saved file: {file_path}")
+
+    def finish(self) -> None:
+        for current_directory_path, _, file_names in os.walk(self.directory_path, topdown=False):
+            for file_name in file_names:
+                file_path = os.path.normpath(os.path.join(current_directory_path, file_name))
+                if file_path not in self.written_paths:
+                    logging.info(f"Removing stale file: {file_path}")
+                    os.remove(file_path)
+            if current_directory_path != self.directory_path and not os.listdir(current_directory_path):
+                os.rmdir(current_directory_path)
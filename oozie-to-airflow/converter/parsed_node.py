@@ -17,8 +17,7 @@
 from typing import List, Optional
 import logging
 
-from airflow.utils.trigger_rule import TriggerRule
-
+from utils.trigger_rule import TriggerRule
 from mappers.base_mapper import BaseMapper
 
 
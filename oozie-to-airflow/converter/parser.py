@@ -19,35 +19,97 @@ import logging
 # noinspection PyPep8Naming
 import xml.etree.ElementTree as ET
 
-import uuid
+import hashlib
 
 # noinspection PyPackageRequirements
-from typing import Type, Dict, Set
+from typing import Type, Mapping, Optional, Set, Iterator
 
-from airflow.utils.trigger_rule import TriggerRule
+from utils import profile_utils
+from utils.profile_utils import PARSE_NODE_PHASE
+from utils.trigger_rule import TriggerRule
 import utils.xml_utils
+from converter.control_nodes import collapse_control_nodes
+from converter.conversion_options import ConversionOptions
+from converter.output import ConversionOutput
 from converter.parsed_node import ParsedNode
-from converter.primitives import Relation, Workflow
+from converter.primitives import NodeIndex, Relation, RelationGraph, Workflow
+from converter.transitive_reduction import reduce_relations
 from mappers.action_mapper import ActionMapper
 from mappers.base_mapper import BaseMapper
 
+# Attributes referencing names of the workflow nodes
+NAME_ATTRIBUTES = ("name", "to", "error", "start")
+
+
+def normalize_node(node: ET.Element) -> None:
+    """
+    Strips the namespace of the node's tag and changes the names of the
+    workflow nodes it references to python syntax.
+    """
+    node.tag = node.tag.rsplit("}", 1)[-1]
+    for attribute in NAME_ATTRIBUTES:
+        if attribute in node.attrib:
+            node.attrib[attribute] = node.attrib[attribute].replace("-", "_")
+
+
+def iterate_workflow_nodes(workflow_file) -> Iterator[ET.Element]:
+    """
+    Streams the top-level nodes of the workflow. Each node is normalized as it
+    arrives and yielded as soon as it is complete. Once the consumer is done
+    with it, the node is detached from the document and all its descendants
+    are emptied, so that memory is bounded by the largest single node rather
+    than by the whole document. The nodes keep their tags, attributes and text.
+
+    :param workflow_file: Path or file object of the workflow.xml
+    """
+    depth = 0
+    root: Optional[ET.Element] = None
+    for event, node in ET.iterparse(workflow_file, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            normalize_node(node)
+            if depth == 1:
+                root = node
+            continue
+        depth -= 1
+        if depth == 1:
+            yield node
+            if root is not None:
+                root.remove(node)
+            for descendant in list(node.iter()):
+                del descendant[:]
+
 
 # noinspection PyDefaultArgument
 class OozieParser:
     """Parses XML of an Oozie workflow"""
 
-    control_map: Dict[str, Type[BaseMapper]]
-    action_map: Dict[str, Type[ActionMapper]]
-    params: Dict[str, str]
+    control_map: Mapping[str, Type[BaseMapper]]
+    action_map: Mapping[str, Type[ActionMapper]]
+    params: Mapping[str, str]
+
+    # Maps the tag of a workflow node to the name of the method parsing it.
+    # Nodes with other tags (global, parameters, credentials...) are ignored.
+    NODE_PARSERS = {
+        "action": "parse_action_node",
+        "start": "parse_start_node",
+        "kill": "parse_kill_node",
+        "end": "parse_end_node",
+        "fork": "parse_fork_node",
+        "join": "parse_join_node",
+        "decision": "parse_decision_node",
+    }
 
     def __init__(
         self,
         input_directory_path: str,
-        output_directory_path: str,
-        params: Dict[str, str],
-        action_mapper: Dict[str, Type[ActionMapper]],
-        control_mapper: Dict[str, Type[BaseMapper]],
+        output_directory_path: Optional[str],
+        params: Mapping[str, str],
+        action_mapper: Mapping[str, Type[ActionMapper]],
+        control_mapper: Mapping[str, Type[BaseMapper]],
         dag_name: str = None,
+        output: ConversionOutput = None,
+        options: ConversionOptions = ConversionOptions(),
     ):
         self.workflow = Workflow(
             dag_name=dag_name,
@@ -58,6 +120,8 @@ class OozieParser:
         self.params = params
         self.action_map = action_mapper
         self.control_map = control_mapper
+        self.output = output
+        self.options = options
 
     def parse_kill_node(self, kill_node: ET.Element):
         """
@@ -70,7 +134,8 @@ class OozieParser:
         )
         p_node = ParsedNode(mapper)
 
-        mapper.on_parse_node()
+        with profile_utils.phase(PARSE_NODE_PHASE + type(mapper).__name__):
+            mapper.on_parse_node()
 
         logging.info(f"Parsed {mapper.name} as Kill Node.")
         self.workflow.nodes[kill_node.attrib["name"]] = p_node
@@ -85,52 +150,40 @@ class OozieParser:
         mapper = map_class(oozie_node=end_node, name=end_node.attrib["name"])
         p_node = ParsedNode(mapper)
 
-        mapper.on_parse_node()
+        with profile_utils.phase(PARSE_NODE_PHASE + type(mapper).__name__):
+            mapper.on_parse_node()
 
         logging.info(f"Parsed {mapper.name} as End Node.")
         self.workflow.nodes[end_node.attrib["name"]] = p_node
         self.workflow.dependencies.update(mapper.required_imports())
 
-    def parse_fork_node(self, root, fork_node):
+    def parse_fork_node(self, fork_node):
         """
         Fork nodes need to be dummy operators with multiple parallel downstream
         tasks.
 
-        This parses the fork node, the action nodes that it references and then
-        the join node at the end.
-
-        This will only parse well-formed xml-adhering workflows where all paths
-        end at the join node.
+        The nodes referenced by the paths of the fork are only recorded as its
+        downstream nodes. They are parsed on their own when they are reached in
+        the workflow.
         """
         map_class = self.control_map["fork"]
         fork_name = fork_node.attrib["name"]
         mapper = map_class(oozie_node=fork_node, name=fork_name)
         p_node = ParsedNode(mapper)
 
-        mapper.on_parse_node()
+        with profile_utils.phase(PARSE_NODE_PHASE + type(mapper).__name__):
+            mapper.on_parse_node()
 
         logging.info(f"Parsed {mapper.name} as Fork Node.")
-        paths = []
         for node in fork_node:
-            if "path" in node.tag:
-                # Parse all the downstream tasks that can run in parallel.
-                curr_name = node.attrib["start"]
-                paths.append(utils.xml_utils.find_node_by_name(root, curr_name))
+            if node.tag == "path":
+                # All the downstream tasks can run in parallel.
+                p_node.add_downstream_node_name(node.attrib["start"])
+                logging.info(f"Added {mapper.name}'s downstream: {node.attrib['start']}")
 
         self.workflow.nodes[fork_name] = p_node
         self.workflow.dependencies.update(mapper.required_imports())
 
-        for path in paths:
-            p_node.add_downstream_node_name(path.attrib["name"])
-            logging.info(f"Added {mapper.name}'s downstream: {path.attrib['name']}")
-
-            # Theoretically these will all be action nodes, however I don't
-            # think that is guaranteed.
-            # The end of the execution path has not been reached
-            self.parse_node(root, path)
-            if path.attrib["name"] not in self.workflow.nodes:
-                root.remove(path)
-
     def parse_join_node(self, join_node):
         """
         Join nodes wait for the corresponding beginning fork node paths to
@@ -143,7 +196,8 @@ class OozieParser:
         p_node = ParsedNode(mapper)
         p_node.add_downstream_node_name(join_node.attrib["to"])
 
-        mapper.on_parse_node()
+        with profile_utils.phase(PARSE_NODE_PHASE + type(mapper).__name__):
+            mapper.on_parse_node()
 
         logging.info(f"Parsed {mapper.name} as Join Node.")
         self.workflow.nodes[join_node.attrib["name"]] = p_node
@@ -174,13 +228,14 @@ class OozieParser:
         </decision>
         """
         map_class = self.control_map["decision"]
-        mapper = map_class(oozie_node=decision_node, name=decision_node.attrib["name"])
+        mapper = map_class(oozie_node=decision_node, name=decision_node.attrib["name"], params=self.params)
 
         p_node = ParsedNode(mapper)
         for cases in decision_node[0]:
             p_node.add_downstream_node_name(cases.attrib["to"])
 
-        mapper.on_parse_node()
+        with profile_utils.phase(PARSE_NODE_PHASE + type(mapper).__name__):
+            mapper.on_parse_node()
 
         logging.info(f"Parsed {mapper.name} as Decision Node.")
         self.workflow.nodes[decision_node.attrib["name"]] = p_node
@@ -212,6 +267,8 @@ class OozieParser:
             control_mapper=self.control_map,
             input_directory_path=self.workflow.input_directory_path,
             output_directory_path=self.workflow.output_directory_path,
+            output=self.output,
+            options=self.options,
         )
 
         p_node = ParsedNode(mapper)
@@ -224,7 +281,8 @@ class OozieParser:
             raise Exception("Missing error node in {}".format(action_node))
         p_node.set_error_node_name(error_node.attrib["to"])
 
-        mapper.on_parse_node()
+        with profile_utils.phase(PARSE_NODE_PHASE + type(mapper).__name__):
+            mapper.on_parse_node()
 
         logging.info(f"Parsed {mapper.name} as Action Node of type {action_name}.")
         self.workflow.dependencies.update(mapper.required_imports())
@@ -242,71 +300,95 @@ class OozieParser:
         A workflow definition must have one start node.
         """
         map_class = self.control_map["start"]
+        # Derived from the first node, so that the name is the same in every conversion.
         # Theoretically this could cause conflicts, but it is very unlikely
-        start_name = "start_node_" + str(uuid.uuid4())[:4]
+        start_name = "start_node_" + hashlib.sha256(start_node.attrib["to"].encode()).hexdigest()[:4]
         mapper = map_class(oozie_node=start_node, name=start_name)
 
         p_node = ParsedNode(mapper)
         p_node.add_downstream_node_name(start_node.attrib["to"])
 
-        mapper.on_parse_node()
+        with profile_utils.phase(PARSE_NODE_PHASE + type(mapper).__name__):
+            mapper.on_parse_node()
 
         logging.info(f"Parsed {mapper.name} as Start Node.")
         self.workflow.nodes[start_name] = p_node
         self.workflow.dependencies.update(mapper.required_imports())
 
-    def parse_node(self, root, node):
+    def parse_node(self, node):
         """
         Given a node, determines its tag, and then passes it to the correct
         parser.
 
-        :param root:  The root node of the XML tree.
         :param node: The node to parse.
         """
-        if "action" in node.tag:
-            self.parse_action_node(node)
-        elif "start" in node.tag:
-            self.parse_start_node(node)
-        elif "kill" in node.tag:
-            self.parse_kill_node(node)
-        elif "end" in node.tag:
-            self.parse_end_node(node)
-        elif "fork" in node.tag:
-            self.parse_fork_node(root, node)
-        elif "join" in node.tag:
-            self.parse_join_node(node)
-        elif "decision" in node.tag:
-            self.parse_decision_node(node)
+        parser_name = self.NODE_PARSERS.get(node.tag)
+        if parser_name:
+            with profile_utils.phase("parse_node"):
+                getattr(self, parser_name)(node)
 
     def parse_workflow(self):
-        """Parses workflow replacing invalid characters in the names of the nodes"""
-        tree = ET.parse(self.workflow_file)
-        root = tree.getroot()
-        for node in tree.iter():
-            # Strip namespaces
-            node.tag = node.tag.split("}")[1][0:]
-
-            # Change names to python syntax
-            if "name" in node.attrib:
-                node.attrib["name"] = node.attrib["name"].replace("-", "_")
-            if "to" in node.attrib:
-                node.attrib["to"] = node.attrib["to"].replace("-", "_")
-            if "error" in node.attrib:
-                node.attrib["error"] = node.attrib["error"].replace("-", "_")
-            if "start" in node.attrib:
-                node.attrib["start"] = node.attrib["start"].replace("-", "_")
-
-        logging.info("Stripped namespaces, and replaced invalid characters.")
+        """
+        Parses workflow replacing invalid characters in the names of the nodes.
 
-        for node in root:
+        The workflow is streamed: every node is parsed exactly once, in the order
+        of the workflow definition, as soon as it is read. Only a copy of the node
+        without its children is kept in the index of the nodes. Mappers must read
+        everything they need from the children of their node while it is parsed,
+        i.e. in their constructor or in `on_parse_node`.
+        """
+        self.workflow.xml_nodes = {}
+        for node in profile_utils.profile_iterator("parse_xml", iterate_workflow_nodes(self.workflow_file)):
             logging.debug(f"Parsing node: {node}")
-            self.parse_node(root, node)
+            name = node.attrib.get("name")
+            if name is not None:
+                if name in self.workflow.xml_nodes:
+                    raise utils.xml_utils.MultipleNodeFoundException(
+                        "More than one node with name {} found".format(name)
+                    )
+                self.workflow.xml_nodes[name] = ET.Element(node.tag, node.attrib)
+            self.parse_node(node)
 
-        self.create_relations()
-        self.update_trigger_rules()
+        logging.info("Stripped namespaces, and replaced invalid characters.")
+        profile_utils.memory_checkpoint("parse_nodes")
+
+        with profile_utils.phase("validate_transitions"):
+            self.validate_transitions()
+        profile_utils.memory_checkpoint("validate_transitions")
+        with profile_utils.phase("create_relations"):
+            self.create_relations()
+        profile_utils.memory_checkpoint("create_relations")
+        with profile_utils.phase("update_trigger_rules"):
+            self.update_trigger_rules()
+        profile_utils.memory_checkpoint("update_trigger_rules")
 
         for node in self.workflow.nodes.copy().values():
-            node.mapper.on_parse_finish(self.workflow)
+            with profile_utils.phase("on_parse_finish/" + type(node.mapper).__name__):
+                node.mapper.on_parse_finish(self.workflow)
+        profile_utils.memory_checkpoint("on_parse_finish")
+
+        if self.options.collapse_control_nodes:
+            with profile_utils.phase("collapse_control_nodes"):
+                collapsed = collapse_control_nodes(self.workflow)
+            logging.info(
+                f"Collapsed control nodes: removed {collapsed.removed_tasks} tasks "
+                f"and {collapsed.removed_relations} relations."
+            )
+        if self.options.reduce_relations:
+            with profile_utils.phase("reduce_relations"):
+                removed_relations = reduce_relations(self.workflow)
+            logging.info(f"Removed {removed_relations} redundant relations.")
+
+    def validate_transitions(self) -> None:
+        """
+        Checks that all the nodes referenced by the parsed nodes exist in the workflow.
+        """
+        for p_node in self.workflow.nodes.values():
+            for name in p_node.get_downstreams():
+                utils.xml_utils.get_node_by_name(self.workflow.xml_nodes, name)
+            error_name = p_node.get_error_downstream_name()
+            if error_name:
+                utils.xml_utils.get_node_by_name(self.workflow.xml_nodes, error_name)
 
     def create_relations(self) -> None:
         """
@@ -347,11 +429,11 @@ class OozieParser:
                 self.workflow.nodes[error_name].set_is_error(True)
             node.update_trigger_rule()
 
-    def get_relations(self) -> Set[Relation]:
+    def get_relations(self) -> RelationGraph:
         return self.workflow.relations
 
     def get_dependencies(self) -> Set[str]:
         return self.workflow.dependencies
 
-    def get_nodes(self) -> Dict[str, ParsedNode]:
+    def get_nodes(self) -> NodeIndex:
         return self.workflow.nodes
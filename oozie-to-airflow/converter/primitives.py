@@ -13,8 +13,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Class for Airflow relation"""
+import heapq
 from collections import OrderedDict
-from typing import Set, Optional, Dict, NamedTuple, Any
+from typing import (
+    AbstractSet,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    MutableSet,
+    NamedTuple,
+    Optional,
+    Set,
+    Type,
+)
+from xml.etree.ElementTree import Element
 
 # Pylint and flake8 does not understand forward references
 # https://www.python.org/dev/peps/pep-0484/#forward-references
@@ -29,6 +45,146 @@ class Relation(NamedTuple):
     to_task_id: str
 
 
+class RelationGraph(MutableSet[Relation]):
+    """
+    Set of relations indexed by their upstream and downstream tasks, so that the relations
+    of a task are found and removed in time proportional to their number.
+    """
+
+    def __init__(self, relations: Iterable[Relation] = ()):
+        # Dictionaries with no values are used as ordered sets
+        self._downstream: Dict[str, Dict[str, None]] = {}
+        self._upstream: Dict[str, Dict[str, None]] = {}
+        self._size = 0
+        for relation in relations:
+            self.add(relation)
+
+    def __contains__(self, relation) -> bool:
+        from_task_id, to_task_id = relation
+        return to_task_id in self._downstream.get(from_task_id, ())
+
+    def __iter__(self) -> Iterator[Relation]:
+        for from_task_id, to_task_ids in list(self._downstream.items()):
+            for to_task_id in list(to_task_ids):
+                yield Relation(from_task_id=from_task_id, to_task_id=to_task_id)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({set(self)})"
+
+    def add(self, value: Relation) -> None:
+        from_task_id, to_task_id = value
+        if value in self:
+            return
+        self._downstream.setdefault(from_task_id, {})[to_task_id] = None
+        self._upstream.setdefault(to_task_id, {})[from_task_id] = None
+        self._size += 1
+
+    def discard(self, value: Relation) -> None:
+        from_task_id, to_task_id = value
+        if value not in self:
+            return
+        self._remove_index_entry(self._downstream, from_task_id, to_task_id)
+        self._remove_index_entry(self._upstream, to_task_id, from_task_id)
+        self._size -= 1
+
+    @staticmethod
+    def _remove_index_entry(index: Dict[str, Dict[str, None]], key: str, value: str) -> None:
+        values = index[key]
+        del values[value]
+        if not values:
+            del index[key]
+
+    def get_downstream_task_ids(self, task_id: str) -> List[str]:
+        return list(self._downstream.get(task_id, ()))
+
+    def get_upstream_task_ids(self, task_id: str) -> List[str]:
+        return list(self._upstream.get(task_id, ()))
+
+    def remove_relations_from(self, task_id: str) -> None:
+        """Removes all relations whose upstream is the task"""
+        for to_task_id in self.get_downstream_task_ids(task_id):
+            self.discard(Relation(from_task_id=task_id, to_task_id=to_task_id))
+
+    def remove_relations_to(self, task_id: str, upstream_task_ids: AbstractSet[str] = None) -> None:
+        """
+        Removes the relations whose downstream is the task.
+
+        :param task_id: The downstream task.
+        :param upstream_task_ids: Remove only the relations from these tasks [defaults to all].
+        """
+        for from_task_id in self.get_upstream_task_ids(task_id):
+            if upstream_task_ids is None or from_task_id in upstream_task_ids:
+                self.discard(Relation(from_task_id=from_task_id, to_task_id=task_id))
+
+
+class NodeIndex(MutableMapping[str, "parsed_node.ParsedNode"]):
+    """
+    Parsed nodes by name, in the order in which they were added, also indexed by the class
+    of their mapper.
+    """
+
+    def __init__(self, nodes: Mapping[str, "parsed_node.ParsedNode"] = None):
+        self._nodes: Dict[str, "parsed_node.ParsedNode"] = OrderedDict()
+        self._nodes_by_mapper_class: Dict[type, Dict[str, "parsed_node.ParsedNode"]] = {}
+        # Positions in the order in which the nodes were added, to merge the nodes of many classes
+        self._positions: Dict[str, int] = {}
+        self._next_position = 0
+        self.update(nodes or {})
+
+    @staticmethod
+    def _get_mapper_class(node: "parsed_node.ParsedNode") -> type:
+        # __class__ rather than type(), so that mocks with a spec are indexed by the spec
+        return node.mapper.__class__
+
+    def __getitem__(self, name: str) -> "parsed_node.ParsedNode":
+        return self._nodes[name]
+
+    def __setitem__(self, name: str, node: "parsed_node.ParsedNode") -> None:
+        if name in self._nodes:
+            del self[name]
+        self._nodes[name] = node
+        self._positions[name] = self._next_position
+        self._next_position += 1
+        self._nodes_by_mapper_class.setdefault(self._get_mapper_class(node), {})[name] = node
+
+    def __delitem__(self, name: str) -> None:
+        node = self._nodes.pop(name)
+        del self._positions[name]
+        mapper_class = self._get_mapper_class(node)
+        nodes = self._nodes_by_mapper_class[mapper_class]
+        del nodes[name]
+        if not nodes:
+            del self._nodes_by_mapper_class[mapper_class]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self._nodes)})"
+
+    def copy(self) -> Dict[str, "parsed_node.ParsedNode"]:
+        return OrderedDict(self._nodes)
+
+    def get_nodes_by_mapper_type(self, mapper_type: Type) -> List["parsed_node.ParsedNode"]:
+        """Returns the nodes whose mapper is an instance of the type, in the order of the workflow"""
+        nodes_of_classes = [
+            nodes_of_class
+            for mapper_class, nodes_of_class in self._nodes_by_mapper_class.items()
+            if issubclass(mapper_class, mapper_type)
+        ]
+        if len(nodes_of_classes) == 1:
+            return list(nodes_of_classes[0].values())
+        # The nodes of each class are already in the order in which they were added
+        names = heapq.merge(*nodes_of_classes, key=self._positions.__getitem__)
+        return [self._nodes[name] for name in names]
+
+
 # This is a container for data, so it does not contain public methods intentionally.
 class Workflow:  # pylint: disable=too-few-public-methods
     """Class for Workflow"""
@@ -36,18 +192,20 @@ class Workflow:  # pylint: disable=too-few-public-methods
     dag_name: Optional[str]
     input_directory_path: str
     output_directory_path: str
-    relations: Set[Relation]
-    nodes: Dict[str, "parsed_node.ParsedNode"]
-    dependencies: Set[str]  # TODO: Check is set likely maintain insertion order (Python 3.6 ?)
+    xml_nodes: Dict[str, Element]
+    dependencies: Set[str]
 
     def __init__(self, input_directory_path, output_directory_path, dag_name=None) -> None:
         self.input_directory_path = input_directory_path
         self.output_directory_path = output_directory_path
         self.dag_name = dag_name
-        self.relations = set()
-        # Dictionary is ordered purely for output being somewhat ordered the
+        self.relations = RelationGraph()
+        # Nodes are ordered purely for output being somewhat ordered the
         # same as how Oozie workflow was parsed.
-        self.nodes = OrderedDict()
+        self.nodes = NodeIndex()
+        # Oozie XML nodes indexed by name, so that parsing and mappers can look
+        # them up in constant time.
+        self.xml_nodes = {}
         # These are the general dependencies required that every operator
         # requires.
         self.dependencies = {
@@ -56,9 +214,26 @@ class Workflow:  # pylint: disable=too-few-public-methods
             "from airflow.utils.trigger_rule import TriggerRule",
             "from o2a_libs.el_basic_functions import * ",
             "from o2a_libs.el_wf_functions import * ",
+            "from o2a_libs.el_operators import * ",
             "from airflow.utils import dates",
         }
 
+    @property
+    def relations(self) -> RelationGraph:
+        return self._relations
+
+    @relations.setter
+    def relations(self, relations: Iterable[Relation]) -> None:
+        self._relations = relations if isinstance(relations, RelationGraph) else RelationGraph(relations)
+
+    @property
+    def nodes(self) -> NodeIndex:
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes: Mapping[str, "parsed_node.ParsedNode"]) -> None:
+        self._nodes = nodes if isinstance(nodes, NodeIndex) else NodeIndex(nodes)
+
     def __repr__(self) -> str:
         return (
             f"Workflow(dag_name={self.dag_name}, input_directory_path={self.input_directory_path}, "
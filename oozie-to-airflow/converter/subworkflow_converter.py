@@ -13,15 +13,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Converts sub-workflows of Oozie to Airflow"""
+import io
 import json
 import textwrap
-from typing import TextIO, Dict, Type, Set
+from typing import TextIO, Dict, Mapping, Optional, Type, Set
 
+from converter.conversion_options import ConversionOptions
 from converter.oozie_converter import OozieConverter, INDENT
+from converter.output import ConversionOutput
 from converter.parsed_node import ParsedNode
 from converter.primitives import Relation
 from mappers.action_mapper import ActionMapper
 from mappers.base_mapper import BaseMapper
+from utils import el_utils
 
 
 # pylint: disable=too-few-public-methods
@@ -32,13 +36,12 @@ class OozieSubworkflowConverter(OozieConverter):
         self,
         dag_name: str,
         input_directory_path: str,
-        output_directory_path: str,
-        action_mapper: Dict[str, Type[ActionMapper]],
-        control_mapper: Dict[str, Type[BaseMapper]],
-        user: str = None,
-        start_days_ago: int = None,
-        schedule_interval: str = None,
+        output_directory_path: Optional[str],
+        action_mapper: Mapping[str, Type[ActionMapper]],
+        control_mapper: Mapping[str, Type[BaseMapper]],
         output_dag_name: str = None,
+        output: ConversionOutput = None,
+        options: ConversionOptions = ConversionOptions(),
     ):
         OozieConverter.__init__(
             self,
@@ -47,22 +50,34 @@ class OozieSubworkflowConverter(OozieConverter):
             output_directory_path=output_directory_path,
             action_mapper=action_mapper,
             control_mapper=control_mapper,
-            user=user,
-            start_days_ago=start_days_ago,
-            schedule_interval=schedule_interval,
             output_dag_name=output_dag_name,
+            output=output,
+            options=options,
         )
 
     def write_dag(
         self, depends: Set[str], file: TextIO, nodes: Dict[str, ParsedNode], relations: Set[Relation]
     ) -> None:
-        self.write_dependencies(file, depends)
-        file.write("PARAMS = " + json.dumps(self.params, indent=INDENT) + "\n\n")
+        nodes_file = io.StringIO()
+        self.write_nodes(nodes_file, nodes, indent=0)
+        nodes_source = nodes_file.getvalue()
+        task_table = (
+            self.create_task_table(nodes_source, relations, depends) if self.options.compact_dag else None
+        )
+        user_defined_macros = el_utils.uses_el_macros(nodes_source)
+        self.write_dependencies(file, self.get_dag_dependencies(depends, task_table, user_defined_macros))
+        params = self.get_dag_params(nodes_source)
+        file.write("PARAMS = " + json.dumps(dict(params), indent=INDENT, sort_keys=True) + "\n\n")
+        if task_table:
+            file.write(task_table.render_data())
         file.write("\ndef sub_dag(parent_dag_name, child_dag_name, start_date, schedule_interval):\n")
         self.write_dag_header(
-            file, self.dag_name, self.schedule_interval, self.start_days_ago, template="dag_subwf.tpl"
+            file,
+            self.dag_name,
+            self.options.schedule_interval,
+            self.options.start_days_ago,
+            template="dag_subwf.tpl",
+            user_defined_macros=user_defined_macros,
         )
-        self.write_nodes(file, nodes, indent=INDENT + 4)
-        file.write("\n\n")
-        self.write_relations(file, relations, indent=INDENT + 4)
+        self.write_tasks(file, nodes_source, relations, task_table, indent=INDENT + 4)
         file.write(textwrap.indent("\nreturn dag\n", INDENT * " "))
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Removes the relations between the tasks of the workflow implied by other relations"""
+import logging
+from collections import deque
+from typing import Dict, List, Set, Tuple
+
+from converter.primitives import Relation, Workflow
+from mappers.decision_mapper import DecisionMapper
+from utils.trigger_rule import TriggerRule
+
+
+def get_protected_relations(workflow: Workflow) -> Set[Relation]:
+    """
+    Returns the relations which the trigger rules depend on: the relations to the error
+    nodes and the branches of the decisions.
+    """
+    protected_relations = set()
+    for node in workflow.nodes.values():
+        error_name = node.get_error_downstream_name()
+        if error_name is not None and error_name in workflow.nodes:
+            protected_relations.add(
+                Relation(from_task_id=node.last_task_id, to_task_id=workflow.nodes[error_name].first_task_id)
+            )
+    for node in workflow.nodes.get_nodes_by_mapper_type(DecisionMapper):
+        protected_relations.update(
+            Relation(from_task_id=node.last_task_id, to_task_id=to_task_id)
+            for to_task_id in workflow.relations.get_downstream_task_ids(node.last_task_id)
+        )
+    return protected_relations
+
+
+def _sort_topologically(downstream_nodes: List[List[Tuple[int, Relation]]]) -> List[int]:
+    """Returns the nodes in a topological order - or fewer of them, if the graph has cycles"""
+    upstream_count = [0] * len(downstream_nodes)
+    for downstream in downstream_nodes:
+        for node_index, _ in downstream:
+            upstream_count[node_index] += 1
+    ready = deque(node_index for node_index, count in enumerate(upstream_count) if not count)
+    order = []
+    while ready:
+        node_index = ready.popleft()
+        order.append(node_index)
+        for downstream_index, _ in downstream_nodes[node_index]:
+            upstream_count[downstream_index] -= 1
+            if not upstream_count[downstream_index]:
+                ready.append(downstream_index)
+    return order
+
+
+def _find_implied_relations(
+    downstream_nodes: List[List[Tuple[int, Relation]]], order: List[int], is_all_success: List[bool]
+) -> List[Relation]:
+    """
+    Returns the relations to the all_success nodes which are also reachable from the upstream node
+    through other all_success nodes. The nodes are visited in the reverse topological order.
+    """
+    bits = [0] * len(order)
+    for position, node_index in enumerate(order):
+        bits[node_index] = 1 << position
+    # Nodes reachable from the node, through nodes with the all_success trigger rule only
+    reachable = [0] * len(order)
+    implied_relations = []
+    for node_index in reversed(order):
+        reachable_through_downstream = 0
+        for downstream_index, _ in downstream_nodes[node_index]:
+            if is_all_success[downstream_index]:
+                reachable_through_downstream |= reachable[downstream_index]
+        reachable[node_index] = reachable_through_downstream
+        for downstream_index, relation in downstream_nodes[node_index]:
+            reachable[node_index] |= bits[downstream_index]
+            if is_all_success[downstream_index] and reachable_through_downstream & bits[downstream_index]:
+                implied_relations.append(relation)
+    return implied_relations
+
+
+def reduce_relations(workflow: Workflow) -> int:
+    """
+    Removes the relation from task A to task C when C is also reachable from A through other
+    tasks. The relation is implied only if C and every task on the way run when all their
+    upstream tasks succeed - then C succeeding the other tasks means it also succeeds A.
+    The relations to tasks with other trigger rules and the protected relations are kept.
+
+    The tasks of a node are treated as a single vertex, from its first to its last task. The
+    tasks reachable from every vertex are kept as bitsets, built in the reverse topological
+    order, so the reduction takes O(V * E / word size) time.
+
+    :param workflow: Workflow after the relations and the trigger rules are created.
+    :return: Number of the removed relations.
+    """
+    nodes = list(workflow.nodes.values())
+    first_task_indexes: Dict[str, int] = {node.first_task_id: index for index, node in enumerate(nodes)}
+    last_task_indexes: Dict[str, int] = {node.last_task_id: index for index, node in enumerate(nodes)}
+    downstream_nodes: List[List[Tuple[int, Relation]]] = [[] for _ in nodes]
+    for relation in workflow.relations:
+        from_index = last_task_indexes.get(relation.from_task_id)
+        to_index = first_task_indexes.get(relation.to_task_id)
+        # Relations of unknown tasks are kept, and as they are not followed nothing relies on them
+        if from_index is not None and to_index is not None:
+            downstream_nodes[from_index].append((to_index, relation))
+
+    order = _sort_topologically(downstream_nodes)
+    if len(order) != len(nodes):
+        logging.warning("The relations between the tasks contain a cycle. They are not reduced.")
+        return 0
+
+    is_all_success = [node.mapper.trigger_rule == TriggerRule.ALL_SUCCESS for node in nodes]
+    protected_relations = get_protected_relations(workflow)
+    redundant_relations = [
+        relation
+        for relation in _find_implied_relations(downstream_nodes, order, is_all_success)
+        if relation not in protected_relations
+    ]
+    for relation in redundant_relations:
+        workflow.relations.discard(relation)
+    return len(redundant_relations)
@@ -17,3 +17,4 @@ import os
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 TPL_PATH = os.path.join(ROOT_DIR, "templates/")
+SCHEMA_PATH = os.path.join(ROOT_DIR, "schema", "all-schemas-1.0.xsd")
@@ -13,10 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Base mapper - it is a base class for all mappers actions, and logic alike"""
-from typing import Set
+from typing import Dict, Set
 from xml.etree.ElementTree import Element
 
-import airflow.utils.trigger_rule
+from utils.trigger_rule import TriggerRule
 
 
 class BaseMapper:
@@ -24,12 +24,7 @@ class BaseMapper:
 
     # pylint: disable=unused-argument
     def __init__(
-        self,
-        oozie_node: Element,
-        name: str,
-        trigger_rule=airflow.utils.trigger_rule.TriggerRule.ALL_SUCCESS,
-        params=None,
-        **kwargs,
+        self, oozie_node: Element, name: str, trigger_rule=TriggerRule.ALL_SUCCESS, params=None, **kwargs
     ):
         if params is None:
             params = {}
@@ -82,12 +77,11 @@ class BaseMapper:
         """
 
     # pylint: disable=unused-argument,no-self-use
-    def copy_extra_assets(self, input_directory_path: str, output_directory_path: str) -> None:
+    def get_extra_assets(self, input_directory_path: str) -> Dict[str, bytes]:
         """
-        Copies extra assets required by the generated DAG - such as script files, jars etc.
+        Returns extra assets required by the generated DAG - such as script files, jars etc.
 
-        :param input_directory_path: oozie workflow application directory
-        :param output_directory_path: output directory for the generated DAG and assets
-        :return: None
+        :param input_directory_path: assets directory of the oozie workflow application
+        :return: Dictionary of {'path relative to the output': content}
         """
-        return None
+        return {}
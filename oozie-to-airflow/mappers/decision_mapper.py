@@ -17,11 +17,10 @@ import collections
 from typing import Dict, Set
 from xml.etree.ElementTree import Element
 
-from airflow.utils.trigger_rule import TriggerRule
-
 from mappers.base_mapper import BaseMapper
 from utils.el_utils import convert_el_to_jinja
 from utils.template_utils import render_template
+from utils.trigger_rule import TriggerRule
 
 
 # noinspection PyAbstractClass
@@ -78,7 +77,7 @@ class DecisionMapper(BaseMapper):
         self.case_dict = collections.OrderedDict()
         for case in switch_node:
             if "case" in case.tag:
-                case_text = convert_el_to_jinja(case.text.strip(), quote=True)
+                case_text = convert_el_to_jinja(case.text.strip(), quote=True, params=self.params)
                 self.case_dict[case_text] = case.attrib["to"]
             else:  # Default return value
                 self.case_dict["default"] = case.attrib["to"]
@@ -21,17 +21,13 @@ class EndMapper(DummyMapper):
     def on_parse_finish(self, workflow):
         super().on_parse_finish(self)
         decision_node_ids = {
-            node.last_task_id for node in workflow.nodes.values() if isinstance(node.mapper, DecisionMapper)
-        }
-        upstream_task_ids = {
-            relation.from_task_id for relation in workflow.relations if relation.to_task_id == self.name
+            node.last_task_id for node in workflow.nodes.get_nodes_by_mapper_type(DecisionMapper)
         }
+        upstream_task_ids = set(workflow.relations.get_upstream_task_ids(self.name))
 
         if not decision_node_ids.intersection(upstream_task_ids):
             del workflow.nodes[self.name]
 
-        workflow.relations -= {
-            relation
-            for relation in workflow.relations
-            if relation.to_task_id == self.name and relation.from_task_id not in decision_node_ids
-        }
+        workflow.relations.remove_relations_to(
+            self.name, upstream_task_ids=upstream_task_ids - decision_node_ids
+        )
@@ -32,6 +32,4 @@ class KillMapper(BaseMapper):
         super().on_parse_finish(workflow)
         if workflow.nodes[self.name].is_error:
             del workflow.nodes[self.name]
-            workflow.relations -= {
-                relation for relation in workflow.relations if relation.to_task_id == self.name
-            }
+            workflow.relations.remove_relations_to(self.name)
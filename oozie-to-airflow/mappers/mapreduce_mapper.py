@@ -13,17 +13,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Maps Oozie pig node to Airflow's DAG"""
-from typing import Dict, Set
+from typing import Dict, Set, List, Tuple
 from xml.etree.ElementTree import Element
 
-from airflow.utils.trigger_rule import TriggerRule
-
 from converter.primitives import Relation
 from mappers.action_mapper import ActionMapper
 from mappers.prepare_mixin import PrepareMixin
 from utils import el_utils, xml_utils
 from utils.file_archive_extractors import ArchiveExtractor, FileExtractor
 from utils.template_utils import render_template
+from utils.trigger_rule import TriggerRule
 
 
 # pylint: disable=too-many-instance-attributes
@@ -54,6 +53,8 @@ class MapReduceMapper(ActionMapper, PrepareMixin):
         self.params_dict = {}
         self.file_extractor = FileExtractor(oozie_node=oozie_node, params=params)
         self.archive_extractor = ArchiveExtractor(oozie_node=oozie_node, params=params)
+        # Parsed by on_parse_node, while the subtree of the node is still in memory
+        self.prepare_paths: Tuple[List[str], List[str]] = ([], [])
         self._parse_oozie_node()
 
     def _parse_oozie_node(self):
@@ -73,8 +74,13 @@ class MapReduceMapper(ActionMapper, PrepareMixin):
                 key, value = param.split("=", 1)
                 self.params_dict[key] = value
 
+    def on_parse_node(self):
+        super().on_parse_node()
+        self.prepare_paths = self.parse_prepare_node(self.oozie_node, self.params)
+
     def convert_to_text(self) -> str:
-        prepare_command = self.get_prepare_command(self.oozie_node, self.params)
+        delete_paths, mkdir_paths = self.prepare_paths
+        prepare_command = self.format_prepare_command(delete_paths, mkdir_paths, params=self.params)
         relations = [Relation(from_task_id=self.name + "_prepare", to_task_id=self.name)]
         return render_template(
             template_name=self.template,
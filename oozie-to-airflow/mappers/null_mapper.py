@@ -16,7 +16,7 @@
 from typing import Set
 from xml.etree.ElementTree import Element
 
-from airflow.utils.trigger_rule import TriggerRule
+from utils.trigger_rule import TriggerRule
 from mappers.base_mapper import BaseMapper
 
 
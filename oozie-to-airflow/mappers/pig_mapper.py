@@ -14,17 +14,16 @@
 # limitations under the License.
 """Maps Oozie pig node to Airflow's DAG"""
 import os
-from typing import Dict, Set
+from typing import Dict, Set, List, Tuple
 from xml.etree.ElementTree import Element
 
-from airflow.utils.trigger_rule import TriggerRule
-
 from converter.primitives import Relation
 from mappers.action_mapper import ActionMapper
 from mappers.prepare_mixin import PrepareMixin
 from utils import el_utils, xml_utils
 from utils.file_archive_extractors import ArchiveExtractor, FileExtractor
 from utils.template_utils import render_template
+from utils.trigger_rule import TriggerRule
 
 
 # pylint: disable=too-many-instance-attributes
@@ -55,6 +54,8 @@ class PigMapper(ActionMapper, PrepareMixin):
         self.params_dict = {}
         self.file_extractor = FileExtractor(oozie_node=oozie_node, params=params)
         self.archive_extractor = ArchiveExtractor(oozie_node=oozie_node, params=params)
+        # Parsed by on_parse_node, while the subtree of the node is still in memory
+        self.prepare_paths: Tuple[List[str], List[str]] = ([], [])
         self._parse_oozie_node()
 
     def _parse_oozie_node(self):
@@ -78,8 +79,13 @@ class PigMapper(ActionMapper, PrepareMixin):
                 key, value = param.split("=")
                 self.params_dict[key] = value
 
+    def on_parse_node(self):
+        super().on_parse_node()
+        self.prepare_paths = self.parse_prepare_node(self.oozie_node, self.params)
+
     def convert_to_text(self) -> str:
-        prepare_command = self.get_prepare_command(self.oozie_node, self.params)
+        delete_paths, mkdir_paths = self.prepare_paths
+        prepare_command = self.format_prepare_command(delete_paths, mkdir_paths, params=self.params)
         relations = [Relation(from_task_id=self.name + "_prepare", to_task_id=self.name)]
         return render_template(
             template_name=self.template,
@@ -89,34 +95,23 @@ class PigMapper(ActionMapper, PrepareMixin):
             **self.__dict__,
         )
 
-    def _add_symlinks(self, destination_pig_file):
-        destination_pig_file.write("set mapred.create.symlink yes;\n")
+    def _get_symlinks(self) -> str:
+        symlinks = "set mapred.create.symlink yes;\n"
         if self.files:
-            destination_pig_file.write("set mapred.cache.file {};\n".format(self.hdfs_files))
+            symlinks += "set mapred.cache.file {};\n".format(self.hdfs_files)
         if self.archives:
-            destination_pig_file.write("set mapred.cache.archives {};\n".format(self.hdfs_archives))
-
-    def copy_extra_assets(self, input_directory_path: str, output_directory_path: str):
-        self._validate_paths(input_directory_path, output_directory_path)
-        source_pig_file_path = os.path.join(input_directory_path, self.script_file_name)
-        destination_pig_file_path = os.path.join(output_directory_path, self.script_file_name)
-        self._copy_pig_script_with_path_injection(destination_pig_file_path, source_pig_file_path)
+            symlinks += "set mapred.cache.archives {};\n".format(self.hdfs_archives)
+        return symlinks
 
-    def _copy_pig_script_with_path_injection(self, destination_pig_file_path, source_pig_file_path):
-        os.makedirs(os.path.dirname(destination_pig_file_path), exist_ok=True)
-        with open(destination_pig_file_path, "w") as destination_pig_file:
-            with open(source_pig_file_path, "r") as source_pig_file:
-                pig_script = source_pig_file.read()
-                if self.files or self.archives:
-                    self._add_symlinks(destination_pig_file)
-                destination_pig_file.write(pig_script)
-
-    @staticmethod
-    def _validate_paths(input_directory_path, output_directory_path):
+    def get_extra_assets(self, input_directory_path: str) -> Dict[str, bytes]:
         if not input_directory_path:
             raise Exception("The input_directory_path should be set and is {}".format(input_directory_path))
-        if not output_directory_path:
-            raise Exception("The output_directory_path should be set and is {}".format(output_directory_path))
+        source_pig_file_path = os.path.join(input_directory_path, self.script_file_name)
+        with open(source_pig_file_path, "r") as source_pig_file:
+            pig_script = source_pig_file.read()
+        if self.files or self.archives:
+            pig_script = self._get_symlinks() + pig_script
+        return {self.script_file_name: pig_script.encode()}
 
     @staticmethod
     def required_imports() -> Set[str]:
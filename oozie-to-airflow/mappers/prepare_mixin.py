@@ -28,6 +28,15 @@ class PrepareMixin:
         # However we can read from ~/data -> /home/airflow/gcs/data.
         # The easiest way to access it is using the $DAGS_FOLDER env variable.
         delete_paths, mkdir_paths = self.parse_prepare_node(oozie_node, params)
+        return self.format_prepare_command(delete_paths, mkdir_paths, params)
+
+    @staticmethod
+    def format_prepare_command(
+        delete_paths: List[str], mkdir_paths: List[str], params: Dict[str, str]
+    ) -> str:
+        """
+        Returns the command preparing the paths parsed by `parse_prepare_node`.
+        """
         if delete_paths or mkdir_paths:
             delete = " ".join(delete_paths)
             mkdir = " ".join(mkdir_paths)
@@ -13,17 +13,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Maps Shell action into Airflow's DAG"""
-from typing import Dict, Set
+from typing import Dict, Set, List, Tuple
 
 import xml.etree.ElementTree as ET
 
-from airflow.utils.trigger_rule import TriggerRule
-
 from mappers.action_mapper import ActionMapper
 from mappers.prepare_mixin import PrepareMixin
 from utils import el_utils
 
 from utils.template_utils import render_template
+from utils.trigger_rule import TriggerRule
 
 
 class ShellMapper(ActionMapper, PrepareMixin):
@@ -46,6 +45,8 @@ class ShellMapper(ActionMapper, PrepareMixin):
         self.template = template
         self.params = params
         self.trigger_rule = trigger_rule
+        # Parsed by on_parse_node, while the subtree of the node is still in memory
+        self.prepare_paths: Tuple[List[str], List[str]] = ([], [])
         self._parse_oozie_node()
 
     def _parse_oozie_node(self):
@@ -57,10 +58,15 @@ class ShellMapper(ActionMapper, PrepareMixin):
         cmd_node = self.oozie_node.find("exec")
         arg_nodes = self.oozie_node.findall("argument")
         cmd = " ".join([cmd_node.text] + [x.text for x in arg_nodes])
-        self.bash_command = el_utils.convert_el_to_jinja(cmd, quote=False)
+        self.bash_command = el_utils.convert_el_to_jinja(cmd, quote=False, params=self.params)
+
+    def on_parse_node(self):
+        super().on_parse_node()
+        self.prepare_paths = self.parse_prepare_node(self.oozie_node, self.params)
 
     def convert_to_text(self) -> str:
-        prepare_command = self.get_prepare_command(self.oozie_node, self.params)
+        delete_paths, mkdir_paths = self.prepare_paths
+        prepare_command = self.format_prepare_command(delete_paths, mkdir_paths, params=self.params)
         return render_template(
             template_name=self.template, prepare_command=prepare_command, task_id=self.name, **self.__dict__
         )
@@ -17,13 +17,11 @@ from typing import Dict, Set, List
 
 import xml.etree.ElementTree as ET
 
-from airflow.utils.trigger_rule import TriggerRule
-
-
 from mappers.action_mapper import ActionMapper
 from utils import xml_utils, el_utils
 
 from utils.template_utils import render_template
+from utils.trigger_rule import TriggerRule
 
 
 # pylint: disable=too-many-instance-attributes
@@ -89,7 +87,7 @@ class SparkMapper(ActionMapper):
         if prepare_nodes:
             # If there exists a prepare node, there will only be one, according
             # to oozie xml schema
-            self.delete_paths, self.mkdir_paths = self.parse_prepare_node(prepare_nodes[0])
+            self.delete_paths, self.mkdir_paths = self.parse_prepare_node(prepare_nodes[0], self.params)
 
         # master url, deploy mode,
         self.application = self.test_and_set(oozie_node, "jar", "''", params=self.params, quote=True)
@@ -177,7 +175,7 @@ class SparkMapper(ActionMapper):
                 self.__dict__[spark_opt[0]] = "'" + " ".join(spark_opt[1:]) + "'"
 
     @staticmethod
-    def parse_prepare_node(prepare_node: ET.Element):
+    def parse_prepare_node(prepare_node: ET.Element, params: Dict[str, str] = None):
         """
         <prepare>
             <delete path="[PATH]"/>
@@ -189,7 +187,7 @@ class SparkMapper(ActionMapper):
         delete_paths = []
         mkdir_paths = []
         for node in prepare_node:
-            node_path = el_utils.convert_el_to_jinja(node.attrib["path"], quote=False)
+            node_path = el_utils.convert_el_to_jinja(node.attrib["path"], quote=False, params=params)
             if node.tag == "delete":
                 delete_paths.append(node_path)
             else:
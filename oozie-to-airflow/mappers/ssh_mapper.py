@@ -16,12 +16,11 @@
 from typing import Dict, Set
 from xml.etree.ElementTree import Element
 
-from airflow.utils.trigger_rule import TriggerRule
-
 from mappers.action_mapper import ActionMapper
 from utils import el_utils
 
 from utils.template_utils import render_template
+from utils.trigger_rule import TriggerRule
 
 
 class SSHMapper(ActionMapper):
@@ -52,7 +51,7 @@ class SSHMapper(ActionMapper):
         if cmd_node is None or not cmd_node.text:
             raise Exception("Missing or empty command node in SSH action {}".format(self.oozie_node))
         cmd = " ".join([cmd_node.text] + [x.text if x.text else "" for x in arg_nodes])
-        self.command = el_utils.convert_el_to_jinja(cmd, quote=True)
+        self.command = el_utils.convert_el_to_jinja(cmd, quote=True, params=params)
         host = self.oozie_node.find("host")
         if host is None:
             raise Exception("Missing host node in SSH action: {}".format(self.oozie_node))
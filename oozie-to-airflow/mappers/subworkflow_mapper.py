@@ -15,17 +15,29 @@
 """Maps subworkflow of Oozie to Airflow's sub-dag"""
 import logging
 import os
-from typing import Set, Dict, Type
+from typing import Set, Dict, Mapping, Optional, Type
 from xml.etree.ElementTree import Element
 
-from airflow.utils.trigger_rule import TriggerRule
-
-from converter.subworkflow_converter import OozieSubworkflowConverter
+from converter.conversion_options import ConversionOptions
 from mappers.action_mapper import ActionMapper
 from mappers.base_mapper import BaseMapper
-from tests.utils.test_paths import EXAMPLES_PATH
 from utils import el_utils, xml_utils
 from utils.template_utils import render_template
+from utils.trigger_rule import TriggerRule
+
+
+def get_app_directory_path(app_path: str, input_directory_path: str) -> str:
+    """
+    Returns the local directory of the sub-workflow application referenced by the app-path.
+    The application is looked up next to the parent workflow application.
+
+    :param app_path: app-path of the sub-workflow node with EL variables already replaced.
+    :param input_directory_path: Directory of the parent workflow application.
+    """
+    # TODO: we should compare the app-path with the HDFS path of the parent application
+    # TODO: but for now we assume the applications are siblings, as in "examples"
+    parent_directory_path = os.path.dirname(os.path.abspath(input_directory_path))
+    return os.path.join(parent_directory_path, app_path.rstrip("/").rsplit("/", 1)[-1])
 
 
 class SubworkflowMapper(ActionMapper):
@@ -42,12 +54,14 @@ class SubworkflowMapper(ActionMapper):
         name: str,
         dag_name: str,
         input_directory_path: str,
-        output_directory_path: str,
-        action_mapper: Dict[str, Type[ActionMapper]],
-        control_mapper: Dict[str, Type[BaseMapper]],
+        output_directory_path: Optional[str],
+        action_mapper: Mapping[str, Type[ActionMapper]],
+        control_mapper: Mapping[str, Type[BaseMapper]],
         trigger_rule=TriggerRule.ALL_SUCCESS,
         params=None,
         template="subwf.tpl",
+        output=None,
+        options: ConversionOptions = ConversionOptions(),
         **kwargs,
     ):
         ActionMapper.__init__(self, oozie_node=oozie_node, name=name, trigger_rule=trigger_rule, **kwargs)
@@ -63,24 +77,26 @@ class SubworkflowMapper(ActionMapper):
         self.dag_name = dag_name
         self.action_mapper = action_mapper
         self.control_mapper = control_mapper
-        self._parse_oozie_node()
+        self._parse_oozie_node(output, options)
 
-    def _parse_oozie_node(self):
+    def _parse_oozie_node(self, output, options):
         app_path = self.oozie_node.find("app-path").text
         app_path = el_utils.replace_el_with_var(app_path, params=self.params, quote=False)
-        # TODO: hacky: we should calculate it deriving from input_directory_path and comparing app-path
-        # TODO: but for now we assume app is in "examples"
-        app_path = os.path.join(EXAMPLES_PATH, app_path.rsplit("/", 1)[1])
+        app_path = get_app_directory_path(app_path, self.input_directory_path)
         logging.info(f"Converting subworkflow from {app_path}")
         self._parse_config()
+        # Imported here, as the converter imports the mappers
+        from converter.subworkflow_converter import OozieSubworkflowConverter
+
         converter = OozieSubworkflowConverter(
             input_directory_path=app_path,
             output_directory_path=self.output_directory_path,
-            start_days_ago=0,
             action_mapper=self.action_mapper,
             control_mapper=self.control_mapper,
             dag_name=f"{self.dag_name}.{self.task_id}",
             output_dag_name="subdag_test.py",  # TODO: do not use hard-coded name for subdaag
+            output=output,
+            options=options,
         )
         converter.convert()
 
@@ -15,31 +15,298 @@
 """Main entry point for the Oozie to Airflow converter"""
 import argparse
 import logging
+import multiprocessing
 import os
 import sys
-import subprocess
-from subprocess import CalledProcessError
+import time
+from collections import Counter
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
 
-from converter.mappers import ACTION_MAP, CONTROL_MAP
-from converter.oozie_converter import OozieConverter
+from converter.conversion_options import ConversionOptions
+from converter.exceptions import WorkflowValidationException
+from converter.output import ConversionOutput
+from utils import profile_utils
 from utils.constants import CONFIGURATION_PROPERTIES, WORKFLOW_XML
 
 INDENT = 4
 
+# Number of workflows converted by a single batch worker before it is replaced with a fresh process.
+# This keeps the memory of long-running workers bounded while still amortizing the import cost.
+DEFAULT_MAX_WORKFLOWS_PER_WORKER = 50
+
+
+class ConversionResult(NamedTuple):
+    """Outcome of converting a single workflow application in batch mode"""
+
+    input_directory_path: str
+    output_directory_path: str
+    succeeded: bool
+    duration: float
+    error: Optional[str] = None
+    profile: Optional[Dict[str, Any]] = None
+    peak_rss: Optional[int] = None
+    memory_profile: Optional[Dict[str, Any]] = None
+
+
+class BatchTask(NamedTuple):
+    """Directories and DAG name of a single workflow application converted in batch mode"""
+
+    input_directory_path: str
+    output_directory_path: str
+    dag_name: str
+
+
+class ConvertedWorkflow(NamedTuple):
+    """Sources and assets generated by converting a single workflow in memory"""
+
+    input_directory_path: str
+    dag_name: str
+    dag_file_name: str
+    # Sources of all generated DAG files, including the main DAG, by file name
+    dags: Dict[str, str]
+    assets: Dict[str, bytes]
+    error: Optional[str] = None
+
+    @property
+    def dag(self) -> Optional[str]:
+        return self.dags.get(self.dag_file_name)
+
+    @property
+    def subdags(self) -> Dict[str, str]:
+        return {file_name: dag for file_name, dag in self.dags.items() if file_name != self.dag_file_name}
+
 
 # pylint: disable=missing-docstring
 def main():
     args = parse_args(sys.argv[1:])
+
+    if args.batch_input_directory_path or args.batch_list_file_path:
+        main_batch(args)
+        return
+
     input_directory_path = args.input_directory_path
     output_directory_path = args.output_directory_path
+    workflow_profile = profile_utils.Profile() if args.profile_file_path else None
+    memory_profile = profile_utils.MemoryProfile() if args.memory_profile_file_path else None
+
+    try:
+        with profile_utils.profiling(workflow_profile), profile_utils.memory_profiling(
+            memory_profile
+        ), profile_utils.phase(profile_utils.TOTAL_PHASE):
+            convert_workflow(
+                input_directory_path=input_directory_path,
+                output_directory_path=output_directory_path,
+                dag_name=args.dag_name,
+                cache_directory_path=args.cache_directory_path,
+                sync_output=args.sync_output,
+                options=get_conversion_options(args),
+            )
+    except WorkflowValidationException as ex:
+        for error in ex.errors:
+            logging.error(str(error))
+        logging.error("Workflow failed schema validation. Please correct the workflow XML and try again.")
+        exit(1)
+    if workflow_profile:
+        profile_utils.write_profile_report({input_directory_path: workflow_profile}, args.profile_file_path)
+    if memory_profile:
+        profile_utils.write_memory_profile_report(
+            {input_directory_path: memory_profile}, args.memory_profile_file_path
+        )
+
+
+def main_batch(args):
+    if args.batch_input_directory_path:
+        input_directory_paths = find_workflow_directories(args.batch_input_directory_path)
+    else:
+        input_directory_paths = read_workflow_list_file(args.batch_list_file_path)
+
+    try:
+        results = convert_batch(
+            input_directory_paths=input_directory_paths,
+            output_directory_path=args.output_directory_path,
+            processes=args.jobs,
+            max_workflows_per_worker=args.max_workflows_per_worker,
+            cache_directory_path=args.cache_directory_path,
+            sync_output=args.sync_output,
+            options=get_conversion_options(args),
+            profile=bool(args.profile_file_path),
+            memory_profile=bool(args.memory_profile_file_path),
+        )
+    except ValueError as ex:
+        logging.error(str(ex))
+        sys.exit(1)
+    print_batch_summary(results)
+    if args.profile_file_path:
+        workflow_profiles = {
+            result.input_directory_path: profile_utils.Profile.from_dict(result.profile)
+            for result in results
+            if result.profile
+        }
+        profile_utils.write_profile_report(workflow_profiles, args.profile_file_path)
+    if args.memory_profile_file_path:
+        memory_profiles = {
+            result.input_directory_path: profile_utils.MemoryProfile.from_dict(result.memory_profile)
+            for result in results
+            if result.memory_profile
+        }
+        profile_utils.write_memory_profile_report(memory_profiles, args.memory_profile_file_path)
+    if not all(result.succeeded for result in results):
+        sys.exit(1)
 
-    start_days_ago = args.start_days_ago
-    schedule_interval = args.schedule_interval
-    dag_name = args.dag_name
+
+def get_conversion_options(args) -> ConversionOptions:
+    """Returns the options of the conversion given by the command line arguments"""
+    return ConversionOptions(
+        user=args.user,
+        start_days_ago=args.start_days_ago,
+        schedule_interval=args.schedule_interval,
+        fast_format=args.fast_format,
+        prune_params=not args.all_params,
+        shared_params=args.shared_params,
+        collapse_control_nodes=args.collapse_control_nodes,
+        reduce_relations=not args.keep_redundant_relations,
+        compact_dag=args.compact_dag,
+    )
+
+
+def convert_workflow(
+    input_directory_path: str,
+    output_directory_path: str,
+    dag_name: str = None,
+    cache_directory_path: str = None,
+    sync_output: bool = False,
+    options: ConversionOptions = ConversionOptions(),
+):
+    """
+    Validates and converts a single Oozie workflow application.
+
+    :param cache_directory_path: Optional directory of the conversion cache. When the workflow,
+        its sub-workflows and the converter did not change since the previous conversion,
+        the cached output is reused.
+    :param sync_output: Replace only the output files whose content changed and delete
+        the stale ones, instead of recreating the output directory.
+    :param options: Options of the conversion.
+    :raises WorkflowValidationException: when the workflow fails schema validation.
+    """
+    # The converter is imported lazily, so that parsing the arguments stays fast
+    from converter.conversion_cache import ConversionCache
+    from converter.output import DirectoryOutput, SyncedDirectoryOutput
 
     if not dag_name:
         dag_name = os.path.basename(input_directory_path)
 
+    output: ConversionOutput = (
+        SyncedDirectoryOutput(output_directory_path)
+        if sync_output
+        else DirectoryOutput(output_directory_path)
+    )
+    cache = None
+    if cache_directory_path:
+        cache = ConversionCache(cache_directory_path)
+        with profile_utils.phase("cache_restore"):
+            cache_key = cache.get_key(
+                input_directory_path, options={"dag_name": dag_name, **options._asdict()}, user=options.user
+            )
+            restored = cache.restore(cache_key, output)
+        if restored:
+            return
+
+    os.makedirs(output_directory_path, exist_ok=True)
+    _validate_and_convert(
+        input_directory_path=input_directory_path,
+        output_directory_path=output_directory_path,
+        dag_name=dag_name,
+        output=output,
+        options=options,
+    )
+
+    if cache:
+        with profile_utils.phase("cache_store"):
+            cache.store(cache_key, output_directory_path)
+
+
+def convert_to_memory(
+    input_directory_path: str, dag_name: str = None, options: ConversionOptions = ConversionOptions()
+) -> ConvertedWorkflow:
+    """
+    Validates and converts a single Oozie workflow application without writing anything
+    to disk. The DAGs and assets are returned instead.
+
+    :param options: Options of the conversion.
+    :raises WorkflowValidationException: when the workflow fails schema validation.
+    """
+    from converter.output import MemoryOutput
+
+    if not dag_name:
+        dag_name = os.path.basename(os.path.normpath(input_directory_path))
+    output = MemoryOutput()
+    _validate_and_convert(
+        input_directory_path=input_directory_path,
+        output_directory_path=None,
+        dag_name=dag_name,
+        output=output,
+        options=options,
+    )
+    return ConvertedWorkflow(
+        input_directory_path=input_directory_path,
+        dag_name=dag_name,
+        dag_file_name=f"{dag_name}.py",
+        dags=output.dags,
+        assets=output.assets,
+    )
+
+
+def iterate_memory_conversions(
+    input_directory_paths: Iterable[str], processes: int = 0, options: ConversionOptions = ConversionOptions()
+) -> Iterator[ConvertedWorkflow]:
+    """
+    Converts many workflow applications in memory, yielding the result of each workflow
+    as soon as it is converted, in the order of the input directories. A failure of one
+    workflow does not stop conversion of the others - its result has the error set.
+
+    :param input_directory_paths: Oozie workflow application directories.
+    :param processes: Number of worker processes [defaults to converting in the current process].
+    :param options: Options of the conversion.
+    """
+    worker = partial(_convert_to_memory_task, options=options)
+    if not processes:
+        yield from map(worker, input_directory_paths)
+        return
+    with multiprocessing.Pool(processes=processes) as pool:
+        yield from pool.imap(worker, input_directory_paths)
+
+
+def _convert_to_memory_task(input_directory_path: str, **kwargs) -> ConvertedWorkflow:
+    try:
+        return convert_to_memory(input_directory_path, **kwargs)
+    except WorkflowValidationException as ex:
+        error = f"Workflow failed schema validation: {ex.errors[0]}"
+    except Exception as ex:  # pylint: disable=broad-except
+        logging.exception(f"Failed to convert workflow: {input_directory_path}")
+        error = f"{type(ex).__name__}: {ex}"
+    dag_name = os.path.basename(os.path.normpath(input_directory_path))
+    return ConvertedWorkflow(
+        input_directory_path=input_directory_path,
+        dag_name=dag_name,
+        dag_file_name=f"{dag_name}.py",
+        dags={},
+        assets={},
+        error=error,
+    )
+
+
+def _validate_and_convert(
+    input_directory_path: str,
+    output_directory_path: Optional[str],
+    dag_name: str,
+    output: ConversionOutput,
+    options: ConversionOptions,
+):
+    from converter.mappers import ACTION_MAP, CONTROL_MAP
+    from converter.oozie_converter import OozieConverter
+    from utils.workflow_validator import validate_workflow
+
     conf_path = os.path.join(input_directory_path, CONFIGURATION_PROPERTIES)
     if not os.path.isfile(conf_path):
         logging.warning(
@@ -57,33 +324,243 @@ Otherwise please provide it.
         """
         )
 
-    try:
-        subprocess.check_call(["./validate-workflows", f"{input_directory_path}/{WORKFLOW_XML}"])
-    except CalledProcessError:
-        logging.error("Workflow failed schema validation. Please correct the workflow XML and try again.")
-        exit(1)
+    with profile_utils.phase("validate_workflow"):
+        validation_result = validate_workflow(os.path.join(input_directory_path, WORKFLOW_XML))
+    profile_utils.memory_checkpoint("validate_workflow")
+    if not validation_result.is_valid:
+        raise WorkflowValidationException(validation_result.file_path, validation_result.errors)
 
-    os.makedirs(output_directory_path, exist_ok=True)
+    with profile_utils.phase("load_properties"):
+        converter = OozieConverter(
+            dag_name=dag_name,
+            input_directory_path=input_directory_path,
+            output_directory_path=output_directory_path,
+            action_mapper=ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+            output=output,
+            options=options,
+        )
+    profile_utils.memory_checkpoint("load_properties")
+    converter.recreate_output_directory()
+    converter.convert()
+    converter.output.finish()
 
-    converter = OozieConverter(
-        dag_name=dag_name,
+
+def find_workflow_directories(root_directory_path: str) -> List[str]:
+    """
+    Returns all workflow application directories (directories containing a workflow.xml file)
+    found under the root directory, in a stable order. The directories inside an application
+    are not searched.
+    """
+    workflow_directory_paths = []
+    for directory_path, directory_names, file_names in os.walk(root_directory_path):
+        if WORKFLOW_XML in file_names:
+            workflow_directory_paths.append(directory_path)
+            # The directories of an application - such as its sub-workflows - are not separate DAGs
+            directory_names.clear()
+    return sorted(workflow_directory_paths)
+
+
+def read_workflow_list_file(list_file_path: str) -> List[str]:
+    """
+    Reads workflow application directories from a file - one path per line. Empty lines
+    and lines starting with '#' are skipped. Relative paths are resolved against the
+    directory of the list file.
+    """
+    base_directory_path = os.path.dirname(os.path.abspath(list_file_path))
+    with open(list_file_path, "r") as list_file:
+        lines = [line.strip() for line in list_file]
+    return [os.path.join(base_directory_path, line) for line in lines if line and not line.startswith("#")]
+
+
+def get_batch_output_directory_path(
+    input_directory_path: str, common_directory_path: str, output_directory_path: str
+) -> str:
+    """
+    Returns the output directory of a single workflow in batch mode. The layout of the
+    input directories relative to their common parent is mirrored in the output directory.
+    """
+    return os.path.join(
+        output_directory_path, _get_batch_relative_path(input_directory_path, common_directory_path)
+    )
+
+
+def get_batch_dag_name(input_directory_path: str, common_directory_path: str) -> str:
+    """
+    Returns the name of the DAG of a single workflow in batch mode, derived from the path of the input
+    directory relative to the common parent, so that the applications with the same directory name
+    in different sub-directories get distinct names - e.g. team_a/app -> team_a_app.
+    """
+    return _get_batch_relative_path(input_directory_path, common_directory_path).replace(os.sep, "_")
+
+
+def _get_batch_relative_path(input_directory_path: str, common_directory_path: str) -> str:
+    relative_path = os.path.relpath(input_directory_path, common_directory_path)
+    if relative_path == os.curdir:
+        relative_path = os.path.basename(os.path.abspath(input_directory_path))
+    return relative_path
+
+
+def get_batch_tasks(input_directory_paths: List[str], output_directory_path: str) -> List[BatchTask]:
+    """
+    Returns the input directory, the output directory and the DAG name of every workflow converted
+    in batch mode.
+
+    :raises ValueError: when two workflows would be converted to DAGs with the same name.
+    """
+    input_directory_paths = [os.path.abspath(path) for path in input_directory_paths]
+    common_directory_path = os.path.commonpath(input_directory_paths)
+    tasks = [
+        BatchTask(
+            input_directory_path,
+            get_batch_output_directory_path(
+                input_directory_path, common_directory_path, output_directory_path
+            ),
+            get_batch_dag_name(input_directory_path, common_directory_path),
+        )
+        for input_directory_path in input_directory_paths
+    ]
+    dag_names = Counter(task.dag_name for task in tasks)
+    duplicate_dag_names = sorted(dag_name for dag_name, count in dag_names.items() if count > 1)
+    if duplicate_dag_names:
+        raise ValueError(
+            f"Many workflows would be converted to the DAGs named: {', '.join(duplicate_dag_names)}"
+        )
+    return tasks
+
+
+def convert_batch(
+    input_directory_paths: List[str],
+    output_directory_path: str,
+    processes: int = None,
+    max_workflows_per_worker: int = DEFAULT_MAX_WORKFLOWS_PER_WORKER,
+    cache_directory_path: str = None,
+    sync_output: bool = False,
+    options: ConversionOptions = ConversionOptions(),
+    profile: bool = False,
+    memory_profile: bool = False,
+) -> List[ConversionResult]:
+    """
+    Converts many workflow applications using a pool of worker processes. A failure of
+    one workflow does not stop conversion of the others.
+
+    :param input_directory_paths: Oozie workflow application directories.
+    :param output_directory_path: Root output directory. Each workflow gets its own sub-directory.
+    :param processes: Number of worker processes [defaults to the number of CPUs].
+    :param max_workflows_per_worker: Number of workflows a worker converts before it is restarted.
+    :param cache_directory_path: Optional directory of the conversion cache.
+    :param sync_output: Replace only the output files whose content changed.
+    :param options: Options of the conversion.
+    :param profile: Record the time spent in the phases of every conversion to its result.
+    :param memory_profile: Record the memory allocated in the phases of every conversion to its result.
+    :return: List of results sorted by input directory path.
+    :raises ValueError: when two workflows would be converted to DAGs with the same name.
+    """
+    if not input_directory_paths:
+        return []
+    tasks = get_batch_tasks(input_directory_paths, output_directory_path)
+    worker = partial(
+        _convert_workflow_task,
+        cache_directory_path=cache_directory_path,
+        sync_output=sync_output,
+        options=options,
+        profile=profile,
+        memory_profile=memory_profile,
+    )
+    processes = processes or os.cpu_count()
+    with multiprocessing.Pool(processes=processes, maxtasksperchild=max_workflows_per_worker) as pool:
+        results = list(pool.imap_unordered(worker, tasks))
+    return sorted(results, key=lambda result: result.input_directory_path)
+
+
+def _convert_workflow_task(
+    task: BatchTask,
+    cache_directory_path=None,
+    sync_output=False,
+    options=ConversionOptions(),
+    profile=False,
+    memory_profile=False,
+) -> ConversionResult:
+    input_directory_path, output_directory_path, dag_name = task
+    workflow_profile = profile_utils.Profile() if profile else None
+    workflow_memory_profile = profile_utils.MemoryProfile() if memory_profile else None
+    start_time = time.monotonic()
+    error = None
+    with profile_utils.profiling(workflow_profile), profile_utils.memory_profiling(
+        workflow_memory_profile
+    ), profile_utils.phase(profile_utils.TOTAL_PHASE):
+        try:
+            convert_workflow(
+                input_directory_path=input_directory_path,
+                output_directory_path=output_directory_path,
+                dag_name=dag_name,
+                cache_directory_path=cache_directory_path,
+                sync_output=sync_output,
+                options=options,
+            )
+        except WorkflowValidationException as ex:
+            error = f"Workflow failed schema validation: {ex.errors[0]}"
+        except Exception as ex:  # pylint: disable=broad-except
+            logging.exception(f"Failed to convert workflow: {input_directory_path}")
+            error = f"{type(ex).__name__}: {ex}"
+    return ConversionResult(
         input_directory_path=input_directory_path,
         output_directory_path=output_directory_path,
-        action_mapper=ACTION_MAP,
-        control_mapper=CONTROL_MAP,
-        user=args.user,
-        start_days_ago=start_days_ago,
-        schedule_interval=schedule_interval,
+        succeeded=error is None,
+        duration=time.monotonic() - start_time,
+        error=error,
+        profile=workflow_profile.to_dict() if workflow_profile else None,
+        peak_rss=profile_utils.get_peak_rss(),
+        memory_profile=workflow_memory_profile.to_dict() if workflow_memory_profile else None,
     )
-    converter.recreate_output_directory()
-    converter.convert()
+
+
+def print_batch_summary(results: List[ConversionResult], file=sys.stdout) -> None:
+    """
+    Prints per-workflow success/failure summary of a batch conversion. The peak RSS of a workflow
+    is the peak of the worker process which converted it, including the workflows converted before.
+    """
+    failed = [result for result in results if not result.succeeded]
+    print(file=file)
+    print(
+        f"Converted {len(results) - len(failed)} of {len(results)} workflows. Failed: {len(failed)}",
+        file=file,
+    )
+    peak_rss_values = [result.peak_rss for result in results if result.peak_rss is not None]
+    if peak_rss_values:
+        print(f"Peak RSS of the workers: {_format_size(max(peak_rss_values))}", file=file)
+    print(file=file)
+    for result in results:
+        status = "OK" if result.succeeded else "FAILED"
+        details = f"{result.duration:.2f}s"
+        if result.peak_rss is not None:
+            details += f", peak RSS {_format_size(result.peak_rss)}"
+        line = f"{status:<8}{result.input_directory_path} ({details})"
+        if result.error:
+            line += f": {result.error}"
+        print(line, file=file)
+
+
+def _format_size(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
 
 
 def parse_args(args):
     parser = argparse.ArgumentParser(
         description="Convert Apache Oozie workflows to Apache Airflow workflows."
     )
-    parser.add_argument("-i", "--input-directory-path", help="Path to input directory", required=True)
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument("-i", "--input-directory-path", help="Path to input directory")
+    input_group.add_argument(
+        "-b",
+        "--batch-input-directory-path",
+        help="Convert in batch mode every workflow found under this directory",
+    )
+    input_group.add_argument(
+        "-l",
+        "--batch-list-file-path",
+        help="Convert in batch mode the workflow directories listed in this file (one per line)",
+    )
     parser.add_argument("-o", "--output-directory-path", help="Desired output directory", required=True)
     parser.add_argument("-d", "--dag-name", help="Desired DAG name [defaults to input directory name]")
     parser.add_argument(
@@ -95,7 +572,86 @@ def parse_args(args):
     parser.add_argument(
         "-v", "--schedule-interval", help="Desired DAG schedule interval as number of days", default=0
     )
-    return parser.parse_args(args)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of parallel worker processes in batch mode [defaults to the number of CPUs]",
+    )
+    parser.add_argument(
+        "--max-workflows-per-worker",
+        type=int,
+        default=DEFAULT_MAX_WORKFLOWS_PER_WORKER,
+        help="Number of workflows converted by a batch worker before it is restarted to release memory",
+    )
+    parser.add_argument(
+        "--cache-directory-path",
+        help="Directory of the conversion cache. Workflows that did not change since they were "
+        "last converted with the same cache are not converted again",
+    )
+    parser.add_argument(
+        "--fast-format",
+        action="store_true",
+        help="Skip the safety checks of the code formatter. The generated code comes from trusted "
+        "templates, so this is safe and makes the conversion faster",
+    )
+    parser.add_argument(
+        "--sync-output",
+        action="store_true",
+        help="Instead of recreating the output directory, replace only the files whose content "
+        "changed and delete the stale ones, so unchanged files keep their modification time",
+    )
+    parser.add_argument(
+        "--all-params",
+        action="store_true",
+        help="Write all the properties to the PARAMS of the DAG and pass them to every task, instead "
+        "of only the ones referenced by the generated code",
+    )
+    parser.add_argument(
+        "--shared-params",
+        action="store_true",
+        help="Write the properties from configuration.properties to a separate file, loaded once per "
+        "process by all the DAGs converted with the same configuration. Each DAG keeps only its own params",
+    )
+    parser.add_argument(
+        "--collapse-control-nodes",
+        action="store_true",
+        help="Remove the tasks of the fork and join nodes which only pass the control on, connecting "
+        "their upstream tasks directly to their downstream tasks, where this does not change the behaviour",
+    )
+    parser.add_argument(
+        "--keep-redundant-relations",
+        action="store_true",
+        help="Keep the relations between tasks which are implied by other relations, instead of "
+        "removing them from the DAG",
+    )
+    parser.add_argument(
+        "--compact-dag",
+        action="store_true",
+        help="Write the tasks and the relations as tables of data, from which the task factory of o2a_libs "
+        "creates them when the DAG is loaded. The tasks which cannot be written as data are kept as code",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile_file_path",
+        metavar="PROFILE_FILE_PATH",
+        help="Record the wall and CPU time spent in the phases of the conversion, print them as a table "
+        "and save them, per workflow and in total, as JSON to this file",
+    )
+    parser.add_argument(
+        "--memory-profile",
+        dest="memory_profile_file_path",
+        metavar="MEMORY_PROFILE_FILE_PATH",
+        help="Trace the memory allocations with tracemalloc, print the memory in use and the peak at "
+        "the end of each phase and the top allocation sites, and save them as JSON to this file",
+    )
+    parsed_args = parser.parse_args(args)
+    if parsed_args.dag_name and not parsed_args.input_directory_path:
+        parser.error(
+            "the DAG names are derived from the workflow directories in batch mode, -d/--dag-name "
+            "can only be used with -i/--input-directory-path"
+        )
+    return parsed_args
 
 
 if __name__ == "__main__":
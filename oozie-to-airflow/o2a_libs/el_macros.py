@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Macros of the DAGs, making the EL functions and operators callable from their Jinja templates"""
+import inspect
+from typing import Callable, Dict
+
+from o2a_libs import el_basic_functions, el_operators, el_wf_functions
+
+EL_MACROS: Dict[str, Callable] = {
+    name: function
+    for module in (el_basic_functions, el_operators, el_wf_functions)
+    for name, function in vars(module).items()
+    if inspect.isfunction(function) and function.__module__ == module.__name__ and not name.startswith("_")
+}
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Operators of the Oozie EL, coercing their operands the way the EL does"""
+import math
+from typing import Any, Tuple, Union
+
+Number = Union[int, float]
+
+
+def el_to_number(value) -> Number:
+    """
+    Coerces the value to a number. A null or empty value is 0 and a string is a floating point
+    number if it contains '.', 'e' or 'E', otherwise an integer.
+    """
+    if value is None or value == "":
+        return 0
+    if isinstance(value, bool):
+        raise TypeError(f"Cannot coerce a boolean to a number: {value}")
+    if isinstance(value, str):
+        return float(value) if "." in value or "e" in value.lower() else int(value)
+    if isinstance(value, (int, float)):
+        return value
+    raise TypeError(f"Cannot coerce to a number: {value}")
+
+
+def el_to_boolean(value) -> bool:
+    """
+    Coerces the value to a boolean. A null or empty value is false and a string is true
+    only if it is 'true', ignoring the case.
+    """
+    if value is None or value == "":
+        return False
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.lower() == "true"
+    raise TypeError(f"Cannot coerce to a boolean: {value}")
+
+
+def el_to_string(value) -> str:
+    """Coerces the value to a string. A null value is an empty string."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+def el_is_empty(value) -> bool:
+    """Returns true for a null value, an empty string and an empty collection."""
+    if value is None:
+        return True
+    if isinstance(value, (str, list, tuple, dict, set)):
+        return not value
+    return False
+
+
+def el_not(value) -> bool:
+    return not el_to_boolean(value)
+
+
+def el_and(left, right) -> bool:
+    return el_to_boolean(left) and el_to_boolean(right)
+
+
+def el_or(left, right) -> bool:
+    return el_to_boolean(left) or el_to_boolean(right)
+
+
+def el_equals(left, right) -> bool:
+    """
+    Compares the values as numbers if either of them is a number, as booleans if either of them
+    is a boolean and as strings if either of them is a string.
+    """
+    if left is None or right is None:
+        return left is right
+    if _is_number(left) or _is_number(right):
+        return el_to_number(left) == el_to_number(right)
+    if isinstance(left, bool) or isinstance(right, bool):
+        return el_to_boolean(left) == el_to_boolean(right)
+    if isinstance(left, str) or isinstance(right, str):
+        return el_to_string(left) == el_to_string(right)
+    return bool(left == right)
+
+
+def el_not_equals(left, right) -> bool:
+    return not el_equals(left, right)
+
+
+def el_less_than(left, right) -> bool:
+    if left is None or right is None:
+        return False
+    coerced_left, coerced_right = _coerce_comparable(left, right)
+    return bool(coerced_left < coerced_right)
+
+
+def el_greater_than(left, right) -> bool:
+    if left is None or right is None:
+        return False
+    coerced_left, coerced_right = _coerce_comparable(left, right)
+    return bool(coerced_left > coerced_right)
+
+
+def el_less_or_equal(left, right) -> bool:
+    if left is None or right is None:
+        return left is right
+    coerced_left, coerced_right = _coerce_comparable(left, right)
+    return bool(coerced_left <= coerced_right)
+
+
+def el_greater_or_equal(left, right) -> bool:
+    if left is None or right is None:
+        return left is right
+    coerced_left, coerced_right = _coerce_comparable(left, right)
+    return bool(coerced_left >= coerced_right)
+
+
+def el_negate(value) -> Number:
+    return -el_to_number(value)
+
+
+def el_add(left, right) -> Number:
+    return el_to_number(left) + el_to_number(right)
+
+
+def el_subtract(left, right) -> Number:
+    return el_to_number(left) - el_to_number(right)
+
+
+def el_multiply(left, right) -> Number:
+    return el_to_number(left) * el_to_number(right)
+
+
+def el_divide(left, right) -> float:
+    """Divides the numbers as floating point ones. Unlike in the EL, dividing by zero raises an error."""
+    return el_to_number(left) / el_to_number(right)
+
+
+def el_remainder(left, right) -> Number:
+    """Returns the remainder of the division, with the sign of the dividend as in Java."""
+    dividend, divisor = el_to_number(left), el_to_number(right)
+    if isinstance(dividend, float) or isinstance(divisor, float):
+        return math.fmod(dividend, divisor)
+    remainder = abs(dividend) % abs(divisor)
+    return -remainder if dividend < 0 else remainder
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _coerce_comparable(left, right) -> Tuple[Any, Any]:
+    if _is_number(left) or _is_number(right):
+        return el_to_number(left), el_to_number(right)
+    if isinstance(left, str) or isinstance(right, str):
+        return el_to_string(left), el_to_string(right)
+    return left, right
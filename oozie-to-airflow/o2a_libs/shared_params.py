@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Params shared by the DAGs converted from the same properties"""
+import json
+import os
+import threading
+from typing import Any, Dict
+
+_SHARED_PARAMS: Dict[str, Dict[str, Any]] = {}
+_SHARED_PARAMS_LOCK = threading.Lock()
+
+
+def load_shared_params(dag_file_path: str, file_name: str) -> Dict[str, Any]:
+    """
+    Returns the params stored in the file next to the DAG file. The name of the file contains
+    the hash of its content, so each file is read once per process, no matter how many DAGs
+    use it. The returned dictionary must not be modified.
+
+    :param dag_file_path: Path of the DAG file - usually its __file__.
+    :param file_name: Name of the shared params file.
+    """
+    params = _SHARED_PARAMS.get(file_name)
+    if params is None:
+        with open(os.path.join(os.path.dirname(dag_file_path), file_name), "r") as file:
+            params = json.load(file)
+        with _SHARED_PARAMS_LOCK:
+            params = _SHARED_PARAMS.setdefault(file_name, params)
+    return params
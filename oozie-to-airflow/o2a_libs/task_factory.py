@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Creates the tasks of the DAGs converted in the compact mode from their data"""
+import importlib
+from typing import Any, Dict, Mapping, Sequence, Tuple
+
+_OPERATORS: Dict[str, type] = {}
+
+
+def get_operator(operator_path: str) -> type:
+    """
+    Returns the operator class, imported once per process.
+
+    :param operator_path: Module and name of the class, e.g. airflow.operators.bash_operator.BashOperator
+    """
+    operator = _OPERATORS.get(operator_path)
+    if operator is None:
+        module_name, class_name = operator_path.rsplit(".", 1)
+        operator = getattr(importlib.import_module(module_name), class_name)
+        _OPERATORS[operator_path] = operator
+    return operator
+
+
+def resolve_param_argument(value: Any, params: Mapping[str, Any]) -> Any:
+    """
+    Returns the value of an argument taken from the params: all the params for None,
+    a single param for its key, or a dictionary of the params for a list of keys.
+    """
+    if value is None:
+        return params
+    if isinstance(value, str):
+        return params[value]
+    return {key: params[key] for key in value}
+
+
+def create_tasks(
+    task_types: Sequence[Tuple[str, Sequence[str], Sequence[str]]],
+    tasks: Sequence[Tuple[int, Sequence[Any], Sequence[Any]]],
+    params: Mapping[str, Any],
+) -> Dict[str, Any]:
+    """
+    Creates the tasks in the current DAG context.
+
+    :param task_types: Operator path, names of the literal arguments and names of the arguments
+        taken from the params of every type of task.
+    :param tasks: Index of the task type, values of the literal arguments and values of the
+        arguments taken from the params of every task.
+    :param params: Params of the DAG.
+    :return: Created tasks by their task_id.
+    """
+    operators = [get_operator(operator_path) for operator_path, _, _ in task_types]
+    created_tasks = {}
+    for type_index, arguments, param_arguments in tasks:
+        _, argument_names, param_argument_names = task_types[type_index]
+        kwargs = dict(zip(argument_names, arguments))
+        for name, value in zip(param_argument_names, param_arguments):
+            kwargs[name] = resolve_param_argument(value, params)
+        task = operators[type_index](**kwargs)
+        created_tasks[task.task_id] = task
+    return created_tasks
+
+
+def set_relations(dag, relations: Mapping[str, Sequence[str]]) -> None:
+    """
+    Sets the downstream tasks of the tasks of the DAG.
+
+    :param dag: The DAG.
+    :param relations: Task ids of the downstream tasks by the task ids of their upstream task.
+    """
+    for upstream_task_id, downstream_task_ids in relations.items():
+        for downstream_task_id in downstream_task_ids:
+            dag.set_dependency(upstream_task_id, downstream_task_id)
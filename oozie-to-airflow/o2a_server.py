@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Long-running conversion server with an HTTP API
+
+The server keeps a pool of worker processes with the converter, the mappers, the compiled
+workflow schema and the templates loaded, so a conversion request does not pay the
+interpreter start and import costs.
+
+    GET  /health   - status of the server
+    POST /convert  - converts a workflow application. The body is either a JSON object with
+                     the "input_directory_path" and optional conversion options, or a zip/tar
+                     archive of the application with the options passed in the query string.
+                     Only applications within the --input-root directory of the server can be
+                     converted by their path.
+"""
+import argparse
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import socketserver
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from converter.conversion_options import ConversionOptions
+from converter.exceptions import WorkflowValidationException
+from o2a import DEFAULT_MAX_WORKFLOWS_PER_WORKER, convert_to_memory
+from utils.constants import WORKFLOW_XML
+
+DEFAULT_PORT = 8080
+# Number of requests waiting for a free worker before new requests are rejected
+DEFAULT_MAX_QUEUE_SIZE = 16
+DEFAULT_REQUEST_TIMEOUT = 300
+# Maximum size of an uploaded workflow application archive
+MAX_ARCHIVE_SIZE = 64 * 1024 * 1024
+
+# The server skips black's safety checks unless the request asks for them
+DEFAULT_CONVERSION_OPTIONS = ConversionOptions(fast_format=True)
+CONVERSION_OPTIONS = ("dag_name",) + ConversionOptions._fields
+FLAG_OPTIONS = tuple(
+    name for name, default in ConversionOptions()._asdict().items() if isinstance(default, bool)
+)
+ARCHIVE_OPTIONS = ("workflow_path",)
+
+
+class BadRequest(Exception):
+    """The conversion request is malformed"""
+
+
+def warm_up_worker() -> None:
+    """Loads everything a conversion needs, so that the first request of a worker is not slower"""
+    # pylint: disable=import-outside-toplevel
+    import black  # noqa: F401 pylint: disable=unused-import
+    from converter.mappers import ACTION_MAP, CONTROL_MAP
+    from definitions import TPL_PATH
+    from utils.template_utils import get_template_env
+    from utils.workflow_validator import get_schema
+
+    for registry in (ACTION_MAP, CONTROL_MAP):
+        for tag in registry:
+            registry[tag]  # pylint: disable=pointless-statement
+    get_schema()
+    template_env = get_template_env()
+    for template_name in os.listdir(TPL_PATH):
+        template_env.get_template(template_name)
+
+
+def get_asset_manifest(assets: Dict[str, bytes]) -> List[Dict[str, Any]]:
+    """Returns the path, size and SHA-256 hash of every asset"""
+    return [
+        {"path": path, "size": len(content), "sha256": hashlib.sha256(content).hexdigest()}
+        for path, content in sorted(assets.items())
+    ]
+
+
+def convert_request(
+    input_directory_path: str, options: Dict[str, Any], submitted_time: float
+) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    """
+    Converts the workflow application in a worker process.
+
+    :param input_directory_path: Oozie workflow application directory.
+    :param options: Conversion options of the request.
+    :param submitted_time: Time when the request was submitted to the pool, used to report
+        how long the request was queued.
+    :return: HTTP status and the JSON response.
+    """
+    start_time = time.time()
+    conversion_options = DEFAULT_CONVERSION_OPTIONS._replace(
+        **{name: options[name] for name in ConversionOptions._fields if name in options}
+    )
+    try:
+        converted = convert_to_memory(
+            input_directory_path=input_directory_path,
+            dag_name=options.get("dag_name"),
+            options=conversion_options,
+        )
+        status = HTTPStatus.OK
+        response: Dict[str, Any] = {
+            "dag_name": converted.dag_name,
+            "dag_file_name": converted.dag_file_name,
+            "dag": converted.dag,
+            "subdags": converted.subdags,
+            "assets": get_asset_manifest(converted.assets),
+        }
+    except WorkflowValidationException as ex:
+        status = HTTPStatus.UNPROCESSABLE_ENTITY
+        response = {
+            "error": "Workflow failed schema validation",
+            "validation_errors": [str(error) for error in ex.errors],
+        }
+    except Exception as ex:  # pylint: disable=broad-except
+        logging.exception(f"Failed to convert workflow: {input_directory_path}")
+        status = HTTPStatus.INTERNAL_SERVER_ERROR
+        response = {"error": f"{type(ex).__name__}: {ex}"}
+    response["timing"] = {"queued": start_time - submitted_time, "conversion": time.time() - start_time}
+    return status, response
+
+
+def _is_safe_member_path(directory_path: str, member_path: str) -> bool:
+    """Checks that the path, relative to the directory or absolute, points within the directory"""
+    target_path = os.path.realpath(os.path.join(directory_path, member_path))
+    return os.path.commonpath([directory_path, target_path]) == directory_path
+
+
+def extract_archive(content: bytes, directory_path: str) -> None:
+    """
+    Extracts the zip or tar (optionally compressed) archive of a workflow application.
+    Only regular files and directories are extracted, all within the directory.
+
+    :raises BadRequest: when the content is not a supported archive or escapes the directory.
+    """
+    directory_path = os.path.realpath(directory_path)
+    buffer = io.BytesIO(content)
+    if zipfile.is_zipfile(buffer):
+        try:
+            with zipfile.ZipFile(buffer) as archive:
+                for name in archive.namelist():
+                    if not _is_safe_member_path(directory_path, name):
+                        raise BadRequest(f"Archive member outside of the application: {name}")
+                archive.extractall(directory_path)
+        except zipfile.BadZipFile as ex:
+            raise BadRequest(f"Invalid zip archive: {ex}") from ex
+        return
+    buffer.seek(0)
+    try:
+        with tarfile.open(fileobj=buffer, mode="r:*") as archive:
+            members = archive.getmembers()
+            for member in members:
+                if not (member.isfile() or member.isdir()):
+                    raise BadRequest(f"Unsupported archive member: {member.name}")
+                if not _is_safe_member_path(directory_path, member.name):
+                    raise BadRequest(f"Archive member outside of the application: {member.name}")
+            archive.extractall(directory_path, members=members)
+    except tarfile.TarError as ex:
+        raise BadRequest("The request body is neither a zip nor a tar archive") from ex
+
+
+def find_application_directory(directory_path: str, workflow_path: str = None) -> str:
+    """
+    Returns the workflow application directory in the extracted archive: the given relative
+    path, the archive root or its only sub-directory containing the workflow.xml file.
+    """
+    if workflow_path:
+        application_directory_path = os.path.join(directory_path, workflow_path)
+        if not _is_safe_member_path(os.path.realpath(directory_path), workflow_path):
+            raise BadRequest(f"Workflow path outside of the archive: {workflow_path}")
+        candidates = [application_directory_path]
+    else:
+        candidates = [directory_path] + [
+            os.path.join(directory_path, name) for name in sorted(os.listdir(directory_path))
+        ]
+    for candidate in candidates:
+        if os.path.isfile(os.path.join(candidate, WORKFLOW_XML)):
+            return candidate
+    raise BadRequest(f"No {WORKFLOW_XML} found in the archive")
+
+
+def _parse_flag(name: str, value: Any) -> bool:
+    """Parses a boolean conversion option, passed as a JSON boolean or as true/false in the query string"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    raise BadRequest(f"The {name} option must be true or false")
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """Handles the HTTP requests of the conversion server"""
+
+    server: "ConversionServer"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if urlsplit(self.path).path != "/health":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {self.path}"})
+            return
+        self._send_json(
+            HTTPStatus.OK,
+            {
+                "status": "ok",
+                "workers": self.server.workers,
+                "pending_requests": self.server.pending_requests,
+            },
+        )
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Converts the workflow application of the request and responds with the DAGs"""
+        request_time = time.time()
+        url = urlsplit(self.path)
+        if url.path != "/convert":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {self.path}"})
+            return
+        extract_directory_path = None
+        try:
+            content = self._read_body()
+            if self.headers.get("Content-Type", "").split(";")[0] == "application/json":
+                input_directory_path, options = self._parse_json_request(content)
+            else:
+                options = self._parse_options(dict(parse_qsl(url.query)), ARCHIVE_OPTIONS)
+                extract_directory_path = tempfile.mkdtemp(prefix="o2a-app-")
+                extract_archive(content, extract_directory_path)
+                input_directory_path = find_application_directory(
+                    extract_directory_path, options.pop("workflow_path", None)
+                )
+            status, response = self.server.convert(input_directory_path, options)
+        except BadRequest as ex:
+            status, response = HTTPStatus.BAD_REQUEST, {"error": str(ex)}
+        except Exception as ex:  # pylint: disable=broad-except
+            logging.exception(f"Failed to handle the conversion request: {self.path}")
+            status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(ex).__name__}: {ex}"}
+        finally:
+            if extract_directory_path:
+                shutil.rmtree(extract_directory_path, ignore_errors=True)
+        response.setdefault("timing", {})["total"] = time.time() - request_time
+        self._send_json(status, response)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logging.info(f"{self.address_string()} - {format % args}")
+
+    def _read_body(self) -> bytes:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError as ex:
+            raise BadRequest("Invalid Content-Length") from ex
+        if length > MAX_ARCHIVE_SIZE:
+            raise BadRequest(f"The request body is larger than {MAX_ARCHIVE_SIZE} bytes")
+        return self.rfile.read(length)
+
+    def _parse_json_request(self, content: bytes) -> Tuple[str, Dict[str, Any]]:
+        try:
+            request = json.loads(content.decode())
+        except ValueError as ex:
+            raise BadRequest(f"Invalid JSON: {ex}") from ex
+        if not isinstance(request, dict) or not isinstance(request.get("input_directory_path"), str):
+            raise BadRequest("The input_directory_path is required")
+        input_directory_path = request.pop("input_directory_path")
+        input_root = self.server.input_root
+        if not input_root:
+            raise BadRequest("Converting directories of the server is disabled, post an archive instead")
+        if not _is_safe_member_path(input_root, input_directory_path):
+            raise BadRequest(f"The input_directory_path is outside of the input root: {input_directory_path}")
+        input_directory_path = os.path.realpath(os.path.join(input_root, input_directory_path))
+        if not os.path.isfile(os.path.join(input_directory_path, WORKFLOW_XML)):
+            raise BadRequest(f"No {WORKFLOW_XML} found in {input_directory_path}")
+        return input_directory_path, self._parse_options(request)
+
+    @staticmethod
+    def _parse_options(request: Dict[str, Any], extra_options: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        unknown_options = set(request) - set(CONVERSION_OPTIONS + extra_options)
+        if unknown_options:
+            raise BadRequest(f"Unknown options: {', '.join(sorted(unknown_options))}")
+        for name in FLAG_OPTIONS:
+            if name in request:
+                request[name] = _parse_flag(name, request[name])
+        return request
+
+    def _send_json(self, status: HTTPStatus, response: Dict[str, Any]):
+        body = json.dumps(response, indent=2).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ConversionServer(socketserver.ThreadingMixIn, HTTPServer):
+    """
+    HTTP server converting workflows in a bounded pool of warm worker processes. At most
+    `workers + max_queue_size` conversions are accepted at a time, further requests are
+    rejected with 503 Service Unavailable until a conversion finishes.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        workers: int = None,
+        input_root: str = None,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        max_workflows_per_worker: int = DEFAULT_MAX_WORKFLOWS_PER_WORKER,
+    ):
+        super().__init__(server_address, ConversionRequestHandler)
+        self.workers: int = workers or os.cpu_count() or 1
+        self.input_root = os.path.realpath(input_root) if input_root else None
+        self.request_timeout = request_timeout
+        self._slots = threading.BoundedSemaphore(self.workers + max_queue_size)
+        self._pending_requests = 0
+        self._pending_requests_lock = threading.Lock()
+        self._pool = multiprocessing.Pool(
+            processes=self.workers, initializer=warm_up_worker, maxtasksperchild=max_workflows_per_worker
+        )
+
+    @property
+    def pending_requests(self) -> int:
+        """Number of conversions running or waiting for a worker"""
+        return self._pending_requests
+
+    def convert(self, input_directory_path: str, options: Dict[str, Any]) -> Tuple[HTTPStatus, Dict]:
+        """Converts the workflow in the pool, unless too many conversions are already pending"""
+        if not self._slots.acquire(blocking=False):
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Too many pending conversions"}
+        with self._pending_requests_lock:
+            self._pending_requests += 1
+
+        # The slot is released when the conversion finishes, even if the request timed out,
+        # so an abandoned conversion still counts against the limit while it runs
+        def release(_):
+            with self._pending_requests_lock:
+                self._pending_requests -= 1
+            self._slots.release()
+
+        async_result = self._pool.apply_async(
+            convert_request,
+            (input_directory_path, options, time.time()),
+            callback=release,
+            error_callback=release,
+        )
+        try:
+            status, response = async_result.get(self.request_timeout)
+            return status, response
+        except multiprocessing.TimeoutError:
+            return HTTPStatus.GATEWAY_TIMEOUT, {"error": "Conversion timed out"}
+
+    def server_close(self):
+        super().server_close()
+        self._pool.terminate()
+        self._pool.join()
+
+
+def parse_args(args):
+    """Parses the command line arguments of the server"""
+    parser = argparse.ArgumentParser(description="Serve conversions of Apache Oozie workflows over HTTP.")
+    parser.add_argument("--host", default="localhost", help="Address to listen on [defaults to localhost]")
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="Number of worker processes [defaults to the number of CPUs]"
+    )
+    parser.add_argument(
+        "--input-root",
+        help="Directory of the server within which workflow applications can be converted by their path "
+        "[defaults to none: only uploaded archives are converted]",
+    )
+    parser.add_argument(
+        "--max-queue-size",
+        type=int,
+        default=DEFAULT_MAX_QUEUE_SIZE,
+        help="Number of requests waiting for a worker before new requests are rejected with 503",
+    )
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        default=DEFAULT_REQUEST_TIMEOUT,
+        help="Seconds after which a request is answered with 504",
+    )
+    parser.add_argument(
+        "--max-workflows-per-worker",
+        type=int,
+        default=DEFAULT_MAX_WORKFLOWS_PER_WORKER,
+        help="Number of workflows converted by a worker before it is restarted to release memory",
+    )
+    return parser.parse_args(args)
+
+
+def main(args: Optional[List[str]] = None):
+    """Serves conversions until the server is interrupted"""
+    parsed_args = parse_args(sys.argv[1:] if args is None else args)
+    logging.basicConfig(level=logging.INFO)
+    server = ConversionServer(
+        (parsed_args.host, parsed_args.port),
+        workers=parsed_args.jobs,
+        input_root=parsed_args.input_root,
+        max_queue_size=parsed_args.max_queue_size,
+        request_timeout=parsed_args.request_timeout,
+        max_workflows_per_worker=parsed_args.max_workflows_per_worker,
+    )
+    logging.info(f"Serving conversions on http://{parsed_args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,8 @@
  #}
 
 with models.DAG(
-    '{{ dag_name }}',
+    '{{ dag_name }}',{% if user_defined_macros %}
+    user_defined_macros=EL_MACROS,{% endif %}
     schedule_interval={% if schedule_interval %}datetime.timedelta(days={{ schedule_interval }}){% else %}None{% endif %},  # Change to suit your needs
     start_date=dates.days_ago({{ start_days_ago }})  # Change to suit your needs
 ) as dag:
@@ -15,7 +15,8 @@
  #}
 
     with models.DAG(
-        '{0}.{1}'.format(parent_dag_name, child_dag_name),
+        '{0}.{1}'.format(parent_dag_name, child_dag_name),{% if user_defined_macros %}
+        user_defined_macros=EL_MACROS,{% endif %}
         schedule_interval=schedule_interval,  # Change to suit your needs
         start_date=start_date  # Change to suit your needs
     ) as dag:
@@ -13,6 +13,7 @@
   See the License for the specific language governing permissions and
   limitations under the License.
  #}
-{% for relation in relations %}
-{{ relation.from_task_id }}.set_downstream({{ relation.to_task_id }})
+{% for statement in relations | group_relations %}
+{% for task_ids in statement %}{% if not loop.first %} >> {% endif %}{% if task_ids | length > 1 %}[{{ task_ids | join(", ") }}]{% else %}{{ task_ids[0] }}{% endif %}{% endfor %}
+
 {% endfor %}
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for collapsing of the control nodes"""
+import unittest
+from unittest import mock
+from xml.etree.ElementTree import Element
+
+from converter.control_nodes import CollapsedControlNodes, collapse_control_nodes
+from converter.parsed_node import ParsedNode
+from converter.primitives import Relation, Workflow
+from mappers.decision_mapper import DecisionMapper
+from mappers.dummy_mapper import DummyMapper
+from utils.trigger_rule import TriggerRule
+
+
+class CollapseControlNodesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.workflow = Workflow(input_directory_path="in", output_directory_path="out")
+
+    def add_node(self, name, tag="action", trigger_rule=TriggerRule.ALL_SUCCESS):
+        mapper = DummyMapper(oozie_node=Element(tag), name=name, trigger_rule=trigger_rule)
+        self.workflow.nodes[name] = ParsedNode(mapper)
+
+    def add_relations(self, *task_ids):
+        for from_task_id, to_task_id in task_ids:
+            self.workflow.relations.add(Relation(from_task_id=from_task_id, to_task_id=to_task_id))
+
+    def test_should_collapse_fork_and_join(self):
+        for name in ["first", "task_a", "task_b", "last"]:
+            self.add_node(name)
+        self.add_node("fork", tag="fork")
+        self.add_node("join", tag="join")
+        self.add_relations(
+            ("first", "fork"),
+            ("fork", "task_a"),
+            ("fork", "task_b"),
+            ("task_a", "join"),
+            ("task_b", "join"),
+            ("join", "last"),
+        )
+
+        collapsed = collapse_control_nodes(self.workflow)
+
+        self.assertEqual(CollapsedControlNodes(removed_tasks=2, removed_relations=2), collapsed)
+        self.assertEqual(["first", "task_a", "task_b", "last"], list(self.workflow.nodes))
+        self.assertEqual(
+            {
+                Relation(from_task_id="first", to_task_id="task_a"),
+                Relation(from_task_id="first", to_task_id="task_b"),
+                Relation(from_task_id="task_a", to_task_id="last"),
+                Relation(from_task_id="task_b", to_task_id="last"),
+            },
+            self.workflow.relations,
+        )
+
+    def test_should_collapse_root_fork(self):
+        self.add_node("fork", tag="fork")
+        self.add_node("task_a")
+        self.add_node("task_b")
+        self.add_relations(("fork", "task_a"), ("fork", "task_b"))
+
+        collapsed = collapse_control_nodes(self.workflow)
+
+        self.assertEqual(CollapsedControlNodes(removed_tasks=1, removed_relations=2), collapsed)
+        self.assertEqual(set(), self.workflow.relations)
+
+    def test_should_collapse_join_followed_by_fork(self):
+        for name in ["task_a", "task_b", "task_c", "task_d"]:
+            self.add_node(name)
+        self.add_node("join", tag="join")
+        self.add_node("fork", tag="fork")
+        self.add_relations(
+            ("task_a", "join"), ("task_b", "join"), ("join", "fork"), ("fork", "task_c"), ("fork", "task_d")
+        )
+
+        collapsed = collapse_control_nodes(self.workflow)
+
+        # Only one of them can be collapsed without adding relations
+        self.assertEqual(1, collapsed.removed_tasks)
+        self.assertEqual(4, len(self.workflow.relations))
+
+    def test_should_not_collapse_leaf(self):
+        self.add_node("task_a")
+        self.add_node("task_b")
+        self.add_node("join", tag="join")
+        self.add_relations(("task_a", "join"), ("task_b", "join"))
+
+        collapsed = collapse_control_nodes(self.workflow)
+
+        self.assertEqual(CollapsedControlNodes(removed_tasks=0, removed_relations=0), collapsed)
+        self.assertIn("join", self.workflow.nodes)
+
+    def test_should_not_collapse_unknown_action(self):
+        self.add_node("first")
+        self.add_node("unknown", tag="email")
+        self.add_node("last")
+        self.add_relations(("first", "unknown"), ("unknown", "last"))
+
+        collapsed = collapse_control_nodes(self.workflow)
+
+        self.assertEqual(0, collapsed.removed_tasks)
+
+    def test_should_not_collapse_with_other_trigger_rule(self):
+        self.add_node("first")
+        self.add_node("join", tag="join")
+        self.add_node("error_handler", trigger_rule=TriggerRule.DUMMY)
+        self.add_relations(("first", "join"), ("join", "error_handler"))
+
+        collapsed = collapse_control_nodes(self.workflow)
+
+        self.assertEqual(0, collapsed.removed_tasks)
+
+    def test_should_not_collapse_node_following_decision(self):
+        decision_mapper = mock.Mock(spec=DecisionMapper, first_task_id="decision", last_task_id="decision")
+        decision_mapper.name = "decision"
+        self.workflow.nodes["decision"] = ParsedNode(decision_mapper)
+        self.add_node("fork", tag="fork")
+        self.add_node("task_a")
+        self.add_node("task_b")
+        self.add_relations(("decision", "fork"), ("fork", "task_a"), ("fork", "task_b"))
+
+        collapsed = collapse_control_nodes(self.workflow)
+
+        self.assertEqual(0, collapsed.removed_tasks)
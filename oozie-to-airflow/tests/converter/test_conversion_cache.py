@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests conversion cache"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from converter import conversion_cache
+from converter.conversion_cache import ConversionCache
+from converter.output import DirectoryOutput, SyncedDirectoryOutput
+
+WORKFLOW_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<workflow-app xmlns="uri:oozie:workflow:1.0" name="{name}">
+    <start to="{start}"/>
+    {action}
+    <end name="end"/>
+</workflow-app>
+"""
+
+SUBWORKFLOW_ACTION = """<action name="subwf">
+        <sub-workflow>
+            <app-path>${{nameNode}}/apps/{child}</app-path>
+        </sub-workflow>
+        <ok to="end"/>
+        <error to="end"/>
+    </action>"""
+
+
+class TestConversionCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.root = self.temp_directory.name
+        self.parent_path = self._create_app("parent", action=SUBWORKFLOW_ACTION.format(child="child"))
+        self.child_path = self._create_app("child")
+
+    def tearDown(self):
+        self.temp_directory.cleanup()
+
+    def _create_app(self, name, action=""):
+        app_path = os.path.join(self.root, name)
+        os.makedirs(app_path)
+        self._write(
+            os.path.join(app_path, "workflow.xml"),
+            WORKFLOW_TEMPLATE.format(name=name, start="subwf" if action else "end", action=action),
+        )
+        self._write(os.path.join(app_path, "job.properties"), "nameNode=hdfs://\n")
+        return app_path
+
+    @staticmethod
+    def _write(path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(content)
+
+    def _get_key(self, path=None, options=None):
+        return ConversionCache.get_key(path or self.parent_path, options or {"dag_name": "dag"}, user="user")
+
+    def test_key_is_stable(self):
+        self.assertEqual(self._get_key(), self._get_key())
+
+    def test_key_depends_on_options(self):
+        self.assertNotEqual(
+            self._get_key(options={"dag_name": "a"}), self._get_key(options={"dag_name": "b"})
+        )
+
+    def test_key_depends_on_properties(self):
+        key = self._get_key()
+        self._write(os.path.join(self.parent_path, "configuration.properties"), "dataproc_cluster=cluster\n")
+        self.assertNotEqual(key, self._get_key())
+
+    def test_key_depends_on_assets(self):
+        key = self._get_key()
+        self._write(os.path.join(self.parent_path, "assets", "script.pig"), "A = LOAD 'x';\n")
+        self.assertNotEqual(key, self._get_key())
+
+    def test_child_change_invalidates_parent(self):
+        parent_key = self._get_key()
+        child_key = self._get_key(path=self.child_path)
+        self._write(os.path.join(self.child_path, "job.properties"), "nameNode=hdfs://other\n")
+        self.assertNotEqual(parent_key, self._get_key())
+        self.assertNotEqual(child_key, self._get_key(path=self.child_path))
+
+    def test_parent_change_does_not_invalidate_child(self):
+        child_key = self._get_key(path=self.child_path)
+        self._write(os.path.join(self.parent_path, "job.properties"), "nameNode=hdfs://other\n")
+        self.assertEqual(child_key, self._get_key(path=self.child_path))
+
+    def test_cyclic_subworkflows(self):
+        self._write(
+            os.path.join(self.child_path, "workflow.xml"),
+            WORKFLOW_TEMPLATE.format(
+                name="child", start="subwf", action=SUBWORKFLOW_ACTION.format(child="parent")
+            ),
+        )
+        self.assertEqual(self._get_key(), self._get_key())
+
+    def test_subworkflows_are_resolved_with_user(self):
+        with mock.patch(
+            "converter.conversion_cache.find_subworkflow_app_paths",
+            wraps=conversion_cache.find_subworkflow_app_paths,
+        ) as find_mock:
+            self._get_key()
+
+        self.assertEqual(
+            [mock.call(self.parent_path, "user"), mock.call(self.child_path, "user")],
+            find_mock.call_args_list,
+        )
+
+    @mock.patch.dict(os.environ)
+    def test_key_without_user_environment_variable(self):
+        os.environ.pop("USER", None)
+        self.assertEqual(
+            ConversionCache.get_key(self.parent_path, {}), ConversionCache.get_key(self.parent_path, {})
+        )
+
+    @mock.patch("converter.conversion_cache._hash_directory")
+    def test_converter_fingerprint_is_computed_once(self, hash_directory_mock):
+        conversion_cache.get_converter_fingerprint.cache_clear()
+        self.addCleanup(conversion_cache.get_converter_fingerprint.cache_clear)
+        self._get_key()
+        calls = hash_directory_mock.call_count
+        self._get_key()
+        self.assertEqual(calls, hash_directory_mock.call_count)
+
+    @mock.patch("converter.conversion_cache._hash_file")
+    def test_converter_fingerprint_includes_the_entry_points_and_libraries(self, hash_file_mock):
+        conversion_cache.get_converter_fingerprint.cache_clear()
+        self.addCleanup(conversion_cache.get_converter_fingerprint.cache_clear)
+
+        conversion_cache.get_converter_fingerprint()
+
+        hashed_paths = {
+            os.path.relpath(call[0][1], conversion_cache.ROOT_DIR) for call in hash_file_mock.call_args_list
+        }
+        self.assertTrue(
+            {"o2a.py", "definitions.py", os.path.join("o2a_libs", "task_factory.py")} <= hashed_paths
+        )
+
+    def test_store_and_restore(self):
+        cache = ConversionCache(os.path.join(self.root, "cache"))
+        output_path = os.path.join(self.root, "output")
+        self._write(os.path.join(output_path, "dag.py"), "dag")
+        self._write(os.path.join(output_path, "script.pig"), "pig")
+        key = self._get_key()
+
+        self.assertFalse(cache.restore(key, DirectoryOutput(output_path)))
+        entry_path = cache.store(key, output_path)
+        self._write(os.path.join(output_path, "stale.py"), "stale")
+
+        self.assertTrue(cache.restore(key, DirectoryOutput(output_path)))
+        self.assertEqual(["dag.py", "script.pig"], sorted(os.listdir(output_path)))
+        # No temporary directories are left next to the entry
+        self.assertEqual([key], os.listdir(os.path.dirname(entry_path)))
+
+    def test_restore_to_synced_output(self):
+        cache = ConversionCache(os.path.join(self.root, "cache"))
+        output_path = os.path.join(self.root, "output")
+        self._write(os.path.join(output_path, "dag.py"), "dag")
+        key = self._get_key()
+        cache.store(key, output_path)
+        os.utime(os.path.join(output_path, "dag.py"), (1000000000, 1000000000))
+        self._write(os.path.join(output_path, "stale.py"), "stale")
+
+        self.assertTrue(cache.restore(key, SyncedDirectoryOutput(output_path)))
+        self.assertEqual(["dag.py"], os.listdir(output_path))
+        self.assertEqual(1000000000, os.stat(os.path.join(output_path, "dag.py")).st_mtime)
+
+    def test_store_is_idempotent(self):
+        cache = ConversionCache(os.path.join(self.root, "cache"))
+        output_path = os.path.join(self.root, "output")
+        self._write(os.path.join(output_path, "dag.py"), "dag")
+        key = self._get_key()
+
+        self.assertEqual(cache.store(key, output_path), cache.store(key, output_path))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests mapper registry"""
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from converter import mappers
+from converter.mappers import MapperRegistry
+from definitions import ROOT_DIR
+from mappers.dummy_mapper import DummyMapper
+from mappers.shell_mapper import ShellMapper
+
+CONVERT_SHELL_AND_FS_EXAMPLES = """
+import sys
+from converter.mappers import ACTION_MAP, CONTROL_MAP
+from converter.parser import OozieParser
+from tests.utils.test_paths import EXAMPLES_PATH
+
+for name in ("shell", "fs"):
+    parser = OozieParser(
+        input_directory_path=f"{EXAMPLES_PATH}/{name}",
+        output_directory_path="/tmp",
+        params={"nameNode": "hdfs://", "user.name": "user"},
+        action_mapper=ACTION_MAP,
+        control_mapper=CONTROL_MAP,
+    )
+    parser.parse_workflow()
+print(" ".join(sys.modules))
+"""
+
+
+class TestMapperRegistry(unittest.TestCase):
+    def setUp(self):
+        iter_entry_points_patcher = mock.patch("converter.mappers._iter_entry_points", return_value=[])
+        self.iter_entry_points_mock = iter_entry_points_patcher.start()
+        self.addCleanup(iter_entry_points_patcher.stop)
+
+    def test_get_mapper(self):
+        registry = MapperRegistry({"shell": "mappers.shell_mapper:ShellMapper"})
+
+        self.assertIn("shell", registry)
+        self.assertNotIn("pig", registry)
+        self.assertIs(ShellMapper, registry["shell"])
+        self.assertEqual(["shell"], list(registry))
+        with self.assertRaises(KeyError):
+            registry["pig"]  # pylint: disable=pointless-statement
+
+    def test_entry_points(self):
+        self.iter_entry_points_mock.return_value = [
+            ("my-action", "mappers.dummy_mapper:DummyMapper"),
+            ("shell", "mappers.dummy_mapper:DummyMapper"),
+        ]
+        registry = MapperRegistry({"shell": "mappers.shell_mapper:ShellMapper"}, entry_point_group="group")
+
+        self.assertIs(DummyMapper, registry["my-action"])
+        self.assertIs(DummyMapper, registry["shell"])
+        self.assertEqual(2, len(registry))
+        self.iter_entry_points_mock.assert_called_once_with("group")
+
+    def test_built_in_mappers_are_importable(self):
+        for registry in (mappers.ACTION_MAP, mappers.CONTROL_MAP):
+            for tag in registry:
+                self.assertTrue(callable(registry[tag]))
+
+    def test_only_used_mappers_are_imported(self):
+        output = subprocess.check_output([sys.executable, "-c", CONVERT_SHELL_AND_FS_EXAMPLES], cwd=ROOT_DIR)
+        modules = set(output.decode().split())
+
+        self.assertIn("mappers.shell_mapper", modules)
+        self.assertIn("mappers.fs_mapper", modules)
+        for module in ("spark_mapper", "pig_mapper", "ssh_mapper", "subworkflow_mapper", "mapreduce_mapper"):
+            self.assertNotIn(f"mappers.{module}", modules)
+        self.assertNotIn("converter.subworkflow_converter", modules)
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests the conversion server"""
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import unittest
+import zipfile
+from unittest import mock
+from typing import Any, Dict, Tuple
+from urllib import request
+from urllib.error import HTTPError
+
+import o2a_server
+from tests.utils.test_paths import EXAMPLES_PATH
+
+EXAMPLE_FS_PATH = os.path.join(EXAMPLES_PATH, "fs")
+
+
+def _zip_directory(directory_path: str, prefix: str = "") -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for file_name in os.listdir(directory_path):
+            archive.write(os.path.join(directory_path, file_name), prefix + file_name)
+    return buffer.getvalue()
+
+
+class TestArchives(unittest.TestCase):
+    def setUp(self):
+        self.directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory_path)
+
+    def test_extract_zip_archive(self):
+        o2a_server.extract_archive(_zip_directory(EXAMPLE_FS_PATH, "fs/"), self.directory_path)
+
+        self.assertEqual(
+            os.path.join(self.directory_path, "fs"),
+            o2a_server.find_application_directory(self.directory_path),
+        )
+
+    def test_extract_tar_archive(self):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            archive.add(os.path.join(EXAMPLE_FS_PATH, "workflow.xml"), "workflow.xml")
+
+        o2a_server.extract_archive(buffer.getvalue(), self.directory_path)
+
+        self.assertEqual(self.directory_path, o2a_server.find_application_directory(self.directory_path))
+
+    def test_extract_archive_outside_of_directory(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("../workflow.xml", "<workflow-app/>")
+
+        with self.assertRaisesRegex(o2a_server.BadRequest, "outside of the application"):
+            o2a_server.extract_archive(buffer.getvalue(), self.directory_path)
+
+    def test_extract_archive_invalid(self):
+        with self.assertRaisesRegex(o2a_server.BadRequest, "neither a zip nor a tar"):
+            o2a_server.extract_archive(b"workflow", self.directory_path)
+
+    def test_extract_zip_archive_corrupt(self):
+        content = bytearray(_zip_directory(EXAMPLE_FS_PATH))
+        # Corrupts the compressed data of the first member, the central directory stays readable
+        content[40:60] = bytes(20)
+
+        with self.assertRaisesRegex(o2a_server.BadRequest, "Invalid zip archive"):
+            o2a_server.extract_archive(bytes(content), self.directory_path)
+
+    def test_find_application_directory_without_workflow(self):
+        with self.assertRaisesRegex(o2a_server.BadRequest, "No workflow.xml"):
+            o2a_server.find_application_directory(self.directory_path)
+
+    def test_get_asset_manifest(self):
+        self.assertEqual(
+            [
+                {
+                    "path": "assets/script.pig",
+                    "size": 1,
+                    "sha256": "559aead08264d5795d3909718cdd05abd49572e84fe55590eef31a88a08fdffd",
+                }
+            ],
+            o2a_server.get_asset_manifest({"assets/script.pig": b"A"}),
+        )
+
+
+class TestConversionServer(unittest.TestCase):
+    server: o2a_server.ConversionServer
+    server_thread: threading.Thread
+    input_root: str
+    url: str
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("USER", "root")
+        cls.input_root = tempfile.mkdtemp()
+        shutil.copytree(EXAMPLE_FS_PATH, os.path.join(cls.input_root, "fs"))
+        cls.server = o2a_server.ConversionServer(
+            ("localhost", 0), workers=1, input_root=cls.input_root, max_queue_size=1
+        )
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever)
+        cls.server_thread.start()
+        cls.url = f"http://localhost:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server_thread.join()
+        cls.server.server_close()
+        shutil.rmtree(cls.input_root)
+
+    def _request(
+        self, path: str, data: bytes = None, content_type: str = "application/json"
+    ) -> Tuple[int, Dict[str, Any]]:
+        http_request = request.Request(self.url + path, data=data, headers={"Content-Type": content_type})
+        try:
+            with request.urlopen(http_request) as response:
+                return response.status, json.loads(response.read().decode())
+        except HTTPError as ex:
+            return ex.code, json.loads(ex.read().decode())
+
+    def _convert(self, **options):
+        return self._request("/convert", json.dumps(options).encode())
+
+    def test_health(self):
+        status, response = self._request("/health")
+
+        self.assertEqual(200, status)
+        self.assertEqual({"status": "ok", "workers": 1, "pending_requests": 0}, response)
+
+    def test_convert_directory(self):
+        status, response = self._convert(input_directory_path="fs", dag_name="test_dag")
+
+        self.assertEqual(200, status, response)
+        self.assertEqual("test_dag.py", response["dag_file_name"])
+        self.assertIn('models.DAG(\n    "test_dag"', response["dag"])
+        self.assertEqual([], response["assets"])
+        self.assertEqual({}, response["subdags"])
+        self.assertEqual({"queued", "conversion", "total"}, set(response["timing"]))
+
+    def test_convert_directory_by_absolute_path(self):
+        status, response = self._convert(input_directory_path=os.path.join(self.input_root, "fs"))
+
+        self.assertEqual(200, status, response)
+        self.assertEqual("fs.py", response["dag_file_name"])
+
+    def test_convert_directory_outside_of_input_root(self):
+        for input_directory_path in (EXAMPLE_FS_PATH, "../fs", "/"):
+            status, response = self._convert(input_directory_path=input_directory_path)
+
+            self.assertEqual(400, status, response)
+            self.assertIn("outside of the input root", response["error"])
+
+    def test_convert_directory_without_input_root(self):
+        with mock.patch.object(self.server, "input_root", None):
+            status, response = self._convert(input_directory_path="fs")
+
+        self.assertEqual(400, status, response)
+        self.assertIn("post an archive instead", response["error"])
+
+    def test_convert_directory_with_conversion_options(self):
+        status, response = self._convert(input_directory_path="fs", compact_dag=True, fast_format=False)
+
+        self.assertEqual(200, status, response)
+        self.assertIn("task_factory.set_relations(dag, RELATIONS)", response["dag"])
+
+    def test_convert_archive_with_conversion_options(self):
+        status, response = self._request(
+            "/convert?compact_dag=true", _zip_directory(EXAMPLE_FS_PATH), "application/zip"
+        )
+
+        self.assertEqual(200, status, response)
+        self.assertIn("task_factory.set_relations(dag, RELATIONS)", response["dag"])
+
+    def test_convert_archive(self):
+        status, response = self._request(
+            "/convert?dag_name=archived", _zip_directory(EXAMPLE_FS_PATH), "application/zip"
+        )
+
+        self.assertEqual(200, status, response)
+        self.assertEqual("archived.py", response["dag_file_name"])
+
+    def test_convert_invalid_workflow(self):
+        directory_path = tempfile.mkdtemp(dir=self.input_root)
+        self.addCleanup(shutil.rmtree, directory_path)
+        with open(os.path.join(directory_path, "workflow.xml"), "w") as file:
+            file.write("<workflow-app/>")
+
+        status, response = self._convert(input_directory_path=os.path.basename(directory_path))
+
+        self.assertEqual(422, status)
+        self.assertTrue(response["validation_errors"])
+
+    def test_convert_bad_request(self):
+        for options in (
+            {},
+            {"input_directory_path": "missing"},
+            {"input_directory_path": "fs", "x": 1},
+            {"input_directory_path": "fs", "output_directory_path": "/tmp"},
+            {"input_directory_path": "fs", "compact_dag": "yes"},
+        ):
+            status, response = self._convert(**options)
+
+            self.assertEqual(400, status, response)
+
+    def test_convert_unexpected_error(self):
+        with mock.patch.object(self.server, "convert", side_effect=OSError("Disk full")):
+            status, response = self._convert(input_directory_path="fs")
+
+        self.assertEqual(500, status)
+        self.assertEqual("OSError: Disk full", response["error"])
+        self.assertIn("total", response["timing"])
+
+    def test_convert_when_queue_is_full(self):
+        # One worker and one queued request are allowed
+        for _ in range(2):
+            self.server._slots.acquire()  # pylint: disable=protected-access
+        try:
+            status, response = self._convert(input_directory_path="fs")
+        finally:
+            for _ in range(2):
+                self.server._slots.release()  # pylint: disable=protected-access
+
+        self.assertEqual(503, status)
+        self.assertEqual("Too many pending conversions", response["error"])
+
+    def test_parse_args(self):
+        args = o2a_server.parse_args(
+            ["-p", "9000", "-j", "2", "--input-root", "/srv/workflows", "--max-queue-size", "4"]
+        )
+
+        self.assertEqual(
+            (9000, 2, "/srv/workflows", 4), (args.port, args.jobs, args.input_root, args.max_queue_size)
+        )
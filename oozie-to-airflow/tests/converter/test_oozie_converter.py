@@ -14,20 +14,33 @@
 # limitations under the License.
 """Tests Oozie Converter"""
 
+import contextlib
 import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
+from unittest import mock
 from xml.etree.ElementTree import Element
 
 import jinja2
 
 import o2a
+from converter.conversion_options import ConversionOptions
+from converter.exceptions import WorkflowValidationException
 from converter.oozie_converter import OozieConverter
 from converter.mappers import CONTROL_MAP, ACTION_MAP
+from converter.output import DirectoryOutput, MemoryOutput
 from converter.parsed_node import ParsedNode
 from converter.primitives import Relation
-from definitions import TPL_PATH
+from definitions import ROOT_DIR, TPL_PATH
 from mappers import dummy_mapper
-from tests.utils.test_paths import EXAMPLE_DEMO_PATH
+from tests.utils.test_paths import EXAMPLE_DEMO_PATH, EXAMPLES_PATH
+from utils import profile_utils
+from utils.workflow_validator import ValidationError
 
 
 def remove_all_whitespaces(expected):
@@ -44,6 +57,20 @@ class TestOozieConverter(unittest.TestCase):
             control_mapper=CONTROL_MAP,
         )
 
+    def test_output_defaults_to_output_directory(self):
+        self.assertIsInstance(self.converter.output, DirectoryOutput)
+        self.assertEqual("/tmp", self.converter.output.directory_path)
+
+    def test_output_or_output_directory_required(self):
+        with self.assertRaises(ValueError):
+            OozieConverter(
+                dag_name="test_dag",
+                input_directory_path=EXAMPLE_DEMO_PATH,
+                output_directory_path=None,
+                action_mapper=ACTION_MAP,
+                control_mapper=CONTROL_MAP,
+            )
+
     def test_parse_args_input_output_file(self):
         input_dir = "/tmp/does.not.exist/"
         output_dir = "/tmp/out/"
@@ -68,10 +95,80 @@ class TestOozieConverter(unittest.TestCase):
 
         self.assertEqual(node.mapper.convert_to_text(), file.read())
 
+    @staticmethod
+    def _create_node(source: str) -> ParsedNode:
+        mapper = mock.Mock(convert_to_text=mock.Mock(return_value=source))
+        mapper.name = "task1"
+        mapper.get_extra_assets.return_value = {}
+        return ParsedNode(mapper)
+
+    def test_write_nodes_projects_task_params(self):
+        self.converter.params = {"a": "1", "b": "2"}
+        nodes = {"task1": self._create_node('op(params=PARAMS, command="{{ params.a }}")\n')}
+
+        file = io.StringIO()
+        self.converter.write_nodes(file=file, nodes=nodes, indent=0)
+
+        self.assertEqual('op(params={"a": PARAMS["a"]}, command="{{ params.a }}")\n', file.getvalue())
+
+    def test_write_dag_prunes_params(self):
+        self.converter.params = {"a": "1", "b": "2"}
+        nodes = {"task1": self._create_node('op(cluster=PARAMS["a"])\n')}
+
+        file = io.StringIO()
+        self.converter.write_dag(set(), file, nodes, set())
+
+        self.assertIn('PARAMS = {\n    "a": "1"\n}', file.getvalue())
+
+    def test_write_dag_keeps_all_params(self):
+        self.converter.params = {"a": "1", "b": "2"}
+        self.converter.options = ConversionOptions(prune_params=False)
+        nodes = {"task1": self._create_node('op(params=PARAMS, cluster=PARAMS["a"])\n')}
+
+        file = io.StringIO()
+        self.converter.write_dag(set(), file, nodes, set())
+
+        self.assertIn('PARAMS = {\n    "a": "1",\n    "b": "2"\n}', file.getvalue())
+        self.assertIn("op(params=PARAMS,", file.getvalue())
+
+    def test_write_dag_registers_el_macros(self):
+        nodes = {"task1": self._create_node("op(command='{{ el_add(params.a, 1) }}')\n")}
+
+        file = io.StringIO()
+        self.converter.write_dag(set(), file, nodes, set())
+
+        self.assertIn("from o2a_libs.el_macros import EL_MACROS\n", file.getvalue())
+        self.assertIn("    'test_dag',\n    user_defined_macros=EL_MACROS,\n", file.getvalue())
+
+    def test_write_dag_without_el_macros(self):
+        nodes = {"task1": self._create_node("op(command='{{ params.a }}')\n")}
+
+        file = io.StringIO()
+        self.converter.write_dag(set(), file, nodes, set())
+
+        self.assertNotIn("EL_MACROS", file.getvalue())
+
+    def test_write_dag_compact(self):
+        self.converter.options = ConversionOptions(compact_dag=True)
+        nodes = {"task1": self._create_node("task1 = operators.Operator(task_id='task1')\n")}
+        relations = {Relation(from_task_id="task1", to_task_id="task2")}
+
+        file = io.StringIO()
+        self.converter.write_dag({"from airflow import operators"}, file, nodes, relations)
+
+        content = file.getvalue()
+        self.assertIn("from o2a_libs import task_factory\n", content)
+        self.assertIn("TASK_TYPES = [('airflow.operators.Operator', ('task_id',), ())]\n", content)
+        self.assertIn("TASKS = [(0, ('task1',), ())]\n", content)
+        self.assertIn("RELATIONS = {'task1': ['task2']}\n", content)
+        self.assertIn("    task_factory.create_tasks(TASK_TYPES, TASKS, PARAMS)\n", content)
+        self.assertIn("    task_factory.set_relations(dag, RELATIONS)\n", content)
+        self.assertNotIn("operators.Operator(", content)
+
     def test_write_relations(self):
         relations = [
-            Relation(from_task_id="task1", to_task_id="task2"),
             Relation(from_task_id="task2", to_task_id="task3"),
+            Relation(from_task_id="task1", to_task_id="task2"),
         ]
 
         file = io.StringIO()
@@ -79,18 +176,31 @@ class TestOozieConverter(unittest.TestCase):
         file.seek(0)
 
         content = file.read()
-        self.assertIn("task1.set_downstream(task2)", content)
-        self.assertIn("task2.set_downstream(task3)", content)
+        self.assertIn("task1 >> task2 >> task3", content)
+
+    def test_write_relations_fan_out_and_fan_in(self):
+        relations = [
+            Relation(from_task_id="fork", to_task_id="task1"),
+            Relation(from_task_id="fork", to_task_id="task2"),
+            Relation(from_task_id="task1", to_task_id="join"),
+            Relation(from_task_id="task2", to_task_id="join"),
+        ]
+
+        file = io.StringIO()
+        OozieConverter.write_relations(file, relations, indent=0)
+        file.seek(0)
+
+        content = file.read()
+        self.assertLess(content.index("fork >> [task1, task2]"), content.index("[task1, task2] >> join"))
 
     def test_write_dependencies(self):
-        depends = ["import airflow", "from jaws import thriller"]
+        depends = {"import airflow", "from jaws import thriller"}
 
         file = io.StringIO()
         OozieConverter.write_dependencies(file, depends)
         file.seek(0)
 
-        expected = "\n".join(depends) + "\n\n"
-        self.assertEqual(expected, file.read())
+        self.assertEqual("from jaws import thriller\nimport airflow\n\n", file.read())
 
     def test_write_dag_header(self):
         dag_name = "dag_name"
@@ -109,6 +219,86 @@ class TestOozieConverter(unittest.TestCase):
 
         self.assertEqual(expected, file.read())
 
+    @mock.patch("converter.oozie_converter.format_source", side_effect=lambda source, fast: source.upper())
+    def test_create_dag_file(self, format_source_mock):
+        self.converter.options = ConversionOptions(fast_format=True)
+        with tempfile.TemporaryDirectory() as output_directory_path:
+            self.converter.output = DirectoryOutput(output_directory_path)
+            with mock.patch.object(
+                self.converter, "write_dag", side_effect=lambda _, file, *args: file.write("x = 1\n")
+            ):
+                self.converter.create_dag_file(nodes={}, depends=set(), relations=set())
+
+            with open(os.path.join(output_directory_path, "test_dag.py")) as file:
+                self.assertEqual("X = 1\n", file.read())
+        format_source_mock.assert_called_once_with("x = 1\n", fast=True)
+
+    @mock.patch("converter.oozie_converter.format_source", side_effect=lambda source, fast: source)
+    def test_create_dag_file_in_memory(self, _):
+        self.converter.output = MemoryOutput()
+        with mock.patch.object(
+            self.converter, "write_dag", side_effect=lambda _, file, *args: file.write("x = 1\n")
+        ):
+            self.converter.create_dag_file(nodes={}, depends=set(), relations=set())
+
+        self.assertEqual({"test_dag.py": "x = 1\n"}, self.converter.output.dags)
+
+    def test_write_params_with_shared_params(self):
+        file = io.StringIO()
+        OozieConverter.write_params(file, {"b": "2", "a": "1"}, shared_params_file_name="o2a_params_1.json")
+
+        self.assertEqual(
+            'PARAMS = {**load_shared_params(__file__, "o2a_params_1.json"), "a": "1", "b": "2"}\n\n',
+            file.getvalue(),
+        )
+
+    def test_write_dag_params_with_shared_params(self):
+        self.converter.output = MemoryOutput()
+        self.converter.options = ConversionOptions(shared_params=True)
+        self.converter.params = {"a": "1", "b": "2", "list": "x,y"}
+        file = io.StringIO()
+        self.converter.write_dag_params(
+            file, 'PARAMS["a"], PARAMS["b"], PARAMS["list"]', shared_params={"a": "1", "list": "x,y"}
+        )
+
+        (file_name, content), = self.converter.output.assets.items()
+        self.assertRegex(file_name, r"^o2a_params_[0-9a-f]{16}\.json$")
+        self.assertEqual({"a": "1", "list": ["x", "y"]}, json.loads(content.decode()))
+        self.assertIn(f'**load_shared_params(__file__, "{file_name}"), "b": "2"}}', file.getvalue())
+
+    def test_get_shared_params(self):
+        with tempfile.TemporaryDirectory() as input_directory_path:
+            with open(os.path.join(input_directory_path, "job.properties"), "w") as file:
+                file.write("examplesRoot=examples\ngcp_region=us\n")
+            with open(os.path.join(input_directory_path, "configuration.properties"), "w") as file:
+                file.write(
+                    "dataproc_cluster=cluster\n"
+                    "gcp_region=europe\n"
+                    "gcp_zone=${gcp_region}-a\n"
+                    "home=/user/${user.name}\n"
+                    "root=${examplesRoot}\n"
+                )
+            converter = OozieConverter(
+                dag_name="test_dag",
+                input_directory_path=input_directory_path,
+                output_directory_path="/tmp",
+                action_mapper=ACTION_MAP,
+                control_mapper=CONTROL_MAP,
+                options=ConversionOptions(user="user"),
+            )
+
+            shared_params = converter.get_shared_params()
+
+        self.assertEqual(
+            {"dataproc_cluster": "cluster", "gcp_region": "europe", "gcp_zone": "europe-a"}, shared_params
+        )
+
+    def test_get_dag_dependencies_with_shared_params(self):
+        self.assertEqual(
+            {"import os", "from o2a_libs.shared_params import load_shared_params"},
+            OozieConverter.get_dag_dependencies({"import os"}, None, False, shared_params=True),
+        )
+
     def test_write_params_list(self):
         expected = """
         PARAMS = {
@@ -127,3 +317,446 @@ class TestOozieConverter(unittest.TestCase):
         file.seek(0)
 
         self.assertEqual(remove_all_whitespaces(expected), remove_all_whitespaces(file.read()))
+
+
+class TestBatchConversion(unittest.TestCase):
+    def test_parse_args_batch_input_directory(self):
+        args = o2a.parse_args(["-b", "/tmp/apps/", "-o", "/tmp/out/", "-j", "3"])
+        self.assertEqual(args.batch_input_directory_path, "/tmp/apps/")
+        self.assertIsNone(args.input_directory_path)
+        self.assertEqual(args.jobs, 3)
+
+    def test_parse_args_batch_and_single_input_are_exclusive(self):
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            o2a.parse_args(["-i", "/tmp/app/", "-b", "/tmp/apps/", "-o", "/tmp/out/"])
+
+    def test_find_workflow_directories(self):
+        with tempfile.TemporaryDirectory() as root:
+            for app in ["b_app", "a_app", os.path.join("nested", "c_app"), os.path.join("a_app", "subwf")]:
+                os.makedirs(os.path.join(root, app))
+                open(os.path.join(root, app, "workflow.xml"), "w").close()
+            os.makedirs(os.path.join(root, "not_an_app"))
+
+            found = o2a.find_workflow_directories(root)
+
+        self.assertEqual(
+            [os.path.join(root, app) for app in ["a_app", "b_app", os.path.join("nested", "c_app")]], found
+        )
+
+    def test_read_workflow_list_file(self):
+        with tempfile.TemporaryDirectory() as root:
+            list_file_path = os.path.join(root, "workflows.txt")
+            with open(list_file_path, "w") as list_file:
+                list_file.write("# comment\napp1\n\n/absolute/app2\n")
+
+            found = o2a.read_workflow_list_file(list_file_path)
+
+        self.assertEqual([os.path.join(root, "app1"), "/absolute/app2"], found)
+
+    def test_get_batch_output_directory_path(self):
+        self.assertEqual(
+            "/out/nested/app", o2a.get_batch_output_directory_path("/in/nested/app", "/in", "/out")
+        )
+        self.assertEqual("/out/app", o2a.get_batch_output_directory_path("/in/app", "/in/app", "/out"))
+
+    def test_get_batch_dag_name(self):
+        self.assertEqual("team_a_app", o2a.get_batch_dag_name("/in/team_a/app", "/in"))
+        self.assertEqual("app", o2a.get_batch_dag_name("/in/app", "/in/app"))
+
+    def test_convert_batch_fails_on_duplicate_dag_names(self):
+        with self.assertRaises(ValueError):
+            o2a.convert_batch(input_directory_paths=["/in/a_b", "/in/a/b"], output_directory_path="/out")
+
+    @mock.patch("o2a.convert_workflow")
+    def test_convert_workflow_task_failure_is_reported(self, convert_workflow_mock):
+        convert_workflow_mock.side_effect = KeyError("dataproc_cluster")
+
+        with self.assertLogs(level="ERROR"):
+            result = o2a._convert_workflow_task(  # pylint: disable=protected-access
+                ("/in/app", "/out/app", "app")
+            )
+
+        self.assertFalse(result.succeeded)
+        self.assertEqual("KeyError: 'dataproc_cluster'", result.error)
+        self.assertEqual("/out/app", result.output_directory_path)
+
+    @mock.patch("o2a.convert_workflow")
+    def test_convert_workflow_task_validation_failure_is_reported(self, convert_workflow_mock):
+        error = ValidationError(
+            "/in/app/workflow.xml", 4, 0, "Element 'bogus': This element is not expected."
+        )
+        convert_workflow_mock.side_effect = WorkflowValidationException("/in/app/workflow.xml", [error])
+
+        result = o2a._convert_workflow_task(  # pylint: disable=protected-access
+            ("/in/app", "/out/app", "app")
+        )
+
+        self.assertFalse(result.succeeded)
+        self.assertEqual(
+            "Workflow failed schema validation: /in/app/workflow.xml:4:0: Element 'bogus': "
+            "This element is not expected.",
+            result.error,
+        )
+
+    @mock.patch("o2a.convert_workflow")
+    def test_convert_workflow_task_success(self, convert_workflow_mock):
+        result = o2a._convert_workflow_task(  # pylint: disable=protected-access
+            ("/in/app", "/out/app", "app")
+        )
+
+        self.assertTrue(result.succeeded)
+        self.assertIsNone(result.error)
+        convert_workflow_mock.assert_called_once_with(
+            input_directory_path="/in/app",
+            output_directory_path="/out/app",
+            dag_name="app",
+            cache_directory_path=None,
+            sync_output=False,
+            options=ConversionOptions(),
+        )
+
+    @mock.patch("o2a._validate_and_convert")
+    @mock.patch("converter.conversion_cache.ConversionCache.get_key", return_value="key")
+    def test_convert_workflow_cache_key_includes_options(self, get_key_mock, _):
+        with tempfile.TemporaryDirectory() as root:
+            o2a.convert_workflow(
+                EXAMPLE_DEMO_PATH,
+                os.path.join(root, "output"),
+                cache_directory_path=os.path.join(root, "cache"),
+                options=ConversionOptions(fast_format=True, compact_dag=True),
+            )
+
+        options = get_key_mock.call_args[1]["options"]
+        self.assertTrue(options["fast_format"])
+        self.assertTrue(options["compact_dag"])
+
+    @mock.patch("o2a.convert_workflow")
+    def test_convert_workflow_task_records_profile(self, convert_workflow_mock):
+        def convert_workflow(**_):
+            with profile_utils.phase("parse_workflow"):
+                pass
+
+        convert_workflow_mock.side_effect = convert_workflow
+
+        result = o2a._convert_workflow_task(  # pylint: disable=protected-access
+            ("/in/app", "/out/app", "app"), profile=True
+        )
+
+        self.assertEqual({profile_utils.TOTAL_PHASE, "parse_workflow"}, set(result.profile["phases"]))
+
+    @mock.patch("o2a.convert_workflow")
+    def test_convert_workflow_task_records_memory_profile(self, convert_workflow_mock):
+        convert_workflow_mock.side_effect = lambda **_: profile_utils.memory_checkpoint("parse_workflow")
+
+        result = o2a._convert_workflow_task(  # pylint: disable=protected-access
+            ("/in/app", "/out/app", "app"), memory_profile=True
+        )
+
+        self.assertEqual(
+            ["parse_workflow"], [checkpoint["phase"] for checkpoint in result.memory_profile["checkpoints"]]
+        )
+        self.assertIsNone(result.profile)
+        self.assertGreater(result.peak_rss, 0)
+
+    def test_parse_args_profile(self):
+        args = o2a.parse_args(["-b", "/tmp/in", "-o", "/tmp/out", "--profile", "/tmp/profile.json"])
+
+        self.assertEqual("/tmp/profile.json", args.profile_file_path)
+
+    def test_parse_args_rejects_dag_name_in_batch_mode(self):
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            o2a.parse_args(["-b", "/tmp/in", "-o", "/tmp/out", "-d", "dag"])
+
+    def test_main_batch_exits_on_duplicate_dag_names(self):
+        args = o2a.parse_args(["-l", "/tmp/list", "-o", "/tmp/out"])
+
+        with mock.patch("o2a.read_workflow_list_file", return_value=["/in/a_b", "/in/a/b"]), self.assertLogs(
+            level="ERROR"
+        ) as logs, self.assertRaises(SystemExit) as context:
+            o2a.main_batch(args)
+
+        self.assertEqual(1, context.exception.code)
+        self.assertIn("Many workflows would be converted to the DAGs named: a_b", logs.output[0])
+
+    def test_get_batch_tasks(self):
+        self.assertEqual(
+            [("/in/a/app", "/out/a/app", "a_app"), ("/in/b/app", "/out/b/app", "b_app")],
+            o2a.get_batch_tasks(["/in/a/app", "/in/b/app"], "/out"),
+        )
+
+    def test_parse_args_memory_profile(self):
+        args = o2a.parse_args(["-i", "/tmp/in", "-o", "/tmp/out", "--memory-profile", "/tmp/memory.json"])
+
+        self.assertEqual("/tmp/memory.json", args.memory_profile_file_path)
+
+    def test_convert_batch_continues_after_failure(self):
+        with tempfile.TemporaryDirectory() as output_directory_path:
+            results = o2a.convert_batch(
+                input_directory_paths=[EXAMPLE_DEMO_PATH, "/tmp/does.not.exist"],
+                output_directory_path=output_directory_path,
+                processes=2,
+                options=ConversionOptions(user="user"),
+            )
+
+        self.assertEqual(2, len(results))
+        self.assertEqual(
+            [False],
+            [result.succeeded for result in results if "does.not.exist" in result.input_directory_path],
+        )
+
+    def test_print_batch_summary(self):
+        results = [
+            o2a.ConversionResult("/in/app1", "/out/app1", succeeded=True, duration=1.0),
+            o2a.ConversionResult("/in/app2", "/out/app2", succeeded=False, duration=0.5, error="Boom"),
+        ]
+        file = io.StringIO()
+
+        o2a.print_batch_summary(results, file=file)
+
+        content = file.getvalue()
+        self.assertIn("Converted 1 of 2 workflows. Failed: 1", content)
+        self.assertIn("OK      /in/app1 (1.00s)", content)
+        self.assertIn("FAILED  /in/app2 (0.50s): Boom", content)
+
+    def test_print_batch_summary_with_peak_rss(self):
+        results = [
+            o2a.ConversionResult(
+                "/in/app1", "/out/app1", succeeded=True, duration=1.0, peak_rss=50 * 1024 * 1024
+            ),
+            o2a.ConversionResult(
+                "/in/app2", "/out/app2", succeeded=True, duration=1.0, peak_rss=80 * 1024 * 1024
+            ),
+        ]
+        file = io.StringIO()
+
+        o2a.print_batch_summary(results, file=file)
+
+        content = file.getvalue()
+        self.assertIn("Peak RSS of the workers: 80.0 MB", content)
+        self.assertIn("OK      /in/app1 (1.00s, peak RSS 50.0 MB)", content)
+
+
+class TestMemoryConversion(unittest.TestCase):
+    def setUp(self):
+        self.directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory_path)
+        for name in ("pig", "subwf"):
+            shutil.copytree(
+                os.path.join(EXAMPLES_PATH, name),
+                os.path.join(self.directory_path, name),
+                ignore=shutil.ignore_patterns("configuration.properties"),
+            )
+            shutil.copy(
+                os.path.join(self.directory_path, name, "configuration.template.properties"),
+                os.path.join(self.directory_path, name, "configuration.properties"),
+            )
+        self.files = sorted(
+            os.path.join(path, file_name)
+            for path, _, file_names in os.walk(self.directory_path)
+            for file_name in file_names
+        )
+
+    def _assert_nothing_written(self):
+        files = sorted(
+            os.path.join(path, file_name)
+            for path, _, file_names in os.walk(self.directory_path)
+            for file_name in file_names
+        )
+        self.assertEqual(self.files, files)
+
+    def test_convert_to_memory(self):
+        converted = o2a.convert_to_memory(
+            os.path.join(self.directory_path, "pig"), options=ConversionOptions(user="user")
+        )
+
+        self.assertEqual("pig.py", converted.dag_file_name)
+        self.assertIn("dataproc_operator.DataProcPigOperator", converted.dag)
+        self.assertEqual({}, converted.subdags)
+        self.assertEqual(["id.pig"], list(converted.assets))
+        with open(os.path.join(EXAMPLES_PATH, "pig", "assets", "id.pig"), "rb") as file:
+            self.assertTrue(converted.assets["id.pig"].endswith(file.read()))
+        self._assert_nothing_written()
+
+    def test_convert_to_memory_prunes_params(self):
+        pig_path = os.path.join(self.directory_path, "pig")
+
+        pruned = o2a.convert_to_memory(pig_path, options=ConversionOptions(user="user"))
+        not_pruned = o2a.convert_to_memory(
+            pig_path, options=ConversionOptions(user="user", prune_params=False)
+        )
+
+        self.assertNotIn('"oozie.wf.application.path"', pruned.dag)
+        self.assertIn('"oozie.wf.application.path"', not_pruned.dag)
+        self.assertIn('"dataproc_cluster"', pruned.dag)
+
+    def test_convert_to_memory_with_shared_params(self):
+        converted = o2a.convert_to_memory(
+            os.path.join(self.directory_path, "pig"),
+            options=ConversionOptions(user="user", shared_params=True),
+        )
+
+        shared_params_file_names = [path for path in converted.assets if path.startswith("o2a_params_")]
+        self.assertEqual(1, len(shared_params_file_names))
+        self.assertIn(f'load_shared_params(__file__, "{shared_params_file_names[0]}")', converted.dag)
+        self.assertNotIn('"dataproc_cluster":', converted.dag)
+
+    def test_convert_to_memory_profile(self):
+        with profile_utils.profiling(profile_utils.Profile()) as profile:
+            o2a.convert_to_memory(
+                os.path.join(self.directory_path, "pig"), options=ConversionOptions(user="user")
+            )
+
+        for phase in (
+            "validate_workflow",
+            "parse_xml",
+            "el_resolution",
+            "on_parse_node/PigMapper",
+            "convert_to_text/PigMapper",
+            "create_relations",
+            "update_trigger_rules",
+            "render_template",
+            "format_source",
+            "copy_assets",
+        ):
+            self.assertIn(phase, profile.phases)
+        self.assertEqual(1, profile.get_mapper_counts()["PigMapper"])
+
+    def test_convert_to_memory_memory_profile(self):
+        with profile_utils.memory_profiling(profile_utils.MemoryProfile()) as profile:
+            o2a.convert_to_memory(
+                os.path.join(self.directory_path, "pig"), options=ConversionOptions(user="user")
+            )
+
+        self.assertEqual(
+            [
+                "validate_workflow",
+                "load_properties",
+                "parse_nodes",
+                "validate_transitions",
+                "create_relations",
+                "update_trigger_rules",
+                "on_parse_finish",
+                "write_dag",
+                "format_source",
+                "write_output",
+            ],
+            [checkpoint.phase for checkpoint in profile.checkpoints],
+        )
+
+    def test_convert_to_memory_subworkflow(self):
+        converted = o2a.convert_to_memory(
+            os.path.join(self.directory_path, "subwf"),
+            dag_name="test_dag",
+            options=ConversionOptions(user="user"),
+        )
+
+        self.assertIn("SubDagOperator", converted.dag)
+        self.assertEqual(["subdag_test.py"], list(converted.subdags))
+        self.assertIn("def sub_dag(", converted.subdags["subdag_test.py"])
+        self._assert_nothing_written()
+
+    def test_iterate_memory_conversions(self):
+        input_directory_paths = [
+            os.path.join(self.directory_path, "subwf"),
+            "/tmp/does.not.exist",
+            os.path.join(self.directory_path, "pig"),
+        ]
+
+        results = list(
+            o2a.iterate_memory_conversions(input_directory_paths, options=ConversionOptions(user="user"))
+        )
+
+        self.assertEqual(input_directory_paths, [result.input_directory_path for result in results])
+        self.assertEqual([True, False, True], [result.error is None for result in results])
+        self.assertIn("Workflow failed schema validation", results[1].error)
+        self._assert_nothing_written()
+
+
+class TestSyncOutput(unittest.TestCase):
+    def test_unchanged_files_keep_modification_time(self):
+        with tempfile.TemporaryDirectory() as output_directory_path:
+            input_directory_path = os.path.join(EXAMPLES_PATH, "fs")
+            o2a.convert_workflow(
+                input_directory_path,
+                output_directory_path,
+                sync_output=True,
+                options=ConversionOptions(user="user"),
+            )
+            dag_file_path = os.path.join(output_directory_path, "fs.py")
+            os.utime(dag_file_path, (1000000000, 1000000000))
+            open(os.path.join(output_directory_path, "stale.py"), "w").close()
+
+            o2a.convert_workflow(
+                input_directory_path,
+                output_directory_path,
+                sync_output=True,
+                options=ConversionOptions(user="user"),
+            )
+
+            self.assertEqual(1000000000, os.stat(dag_file_path).st_mtime)
+            self.assertEqual(["fs.py"], os.listdir(output_directory_path))
+
+
+class TestDeterministicOutput(unittest.TestCase):
+    @staticmethod
+    def _convert_examples(input_directory_path: str, output_directory_path: str, hash_seed: str):
+        subprocess.check_call(
+            [sys.executable, "o2a.py", "-b", input_directory_path, "-o", output_directory_path],
+            cwd=ROOT_DIR,
+            env=dict(os.environ, PYTHONHASHSEED=hash_seed, USER="user"),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        files = {}
+        for path, _, file_names in os.walk(output_directory_path):
+            for file_name in file_names:
+                with open(os.path.join(path, file_name), "rb") as file:
+                    files[os.path.relpath(os.path.join(path, file_name), output_directory_path)] = file.read()
+        return files
+
+    def test_examples_output_is_identical(self):
+        with tempfile.TemporaryDirectory() as directory_path:
+            input_directory_path = os.path.join(directory_path, "examples")
+            shutil.copytree(
+                EXAMPLES_PATH, input_directory_path, ignore=shutil.ignore_patterns("configuration.properties")
+            )
+            example_names = sorted(
+                name for name in os.listdir(input_directory_path) if not name.startswith(".")
+            )
+            for name in example_names:
+                template_path = os.path.join(input_directory_path, name, "configuration.template.properties")
+                if os.path.isfile(template_path):
+                    shutil.copy(
+                        template_path, os.path.join(input_directory_path, name, "configuration.properties")
+                    )
+
+            first_files = self._convert_examples(input_directory_path, os.path.join(directory_path, "1"), "1")
+            second_files = self._convert_examples(
+                input_directory_path, os.path.join(directory_path, "2"), "2"
+            )
+
+        self.assertEqual(
+            [os.path.join(name, f"{name}.py") for name in example_names],
+            sorted(path for path in first_files if path.endswith(".py") and "subdag" not in path),
+        )
+        self.assertEqual(first_files, second_files)
+
+
+class TestImports(unittest.TestCase):
+    @staticmethod
+    def _get_imported_modules(statement):
+        output = subprocess.check_output(
+            [sys.executable, "-c", f"import sys; {statement}; print(' '.join(sys.modules))"], cwd=ROOT_DIR
+        )
+        return set(output.decode().split())
+
+    def test_o2a_does_not_import_converter(self):
+        modules = self._get_imported_modules("import o2a")
+
+        self.assertFalse({"airflow", "black", "jinja2", "converter.oozie_converter"} & modules)
+
+    def test_converter_does_not_import_airflow(self):
+        modules = self._get_imported_modules("import converter.oozie_converter, converter.mappers")
+
+        self.assertIn("converter.oozie_converter", modules)
+        self.assertFalse({"airflow", "black", "jinja2"} & modules)
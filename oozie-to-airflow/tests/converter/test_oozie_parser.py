@@ -13,7 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests oozie parser"""
+import io
 from os import path
+import tempfile
 import typing
 import unittest
 from unittest import mock
@@ -23,11 +25,13 @@ from parameterized import parameterized
 
 from converter import parser
 from converter import parsed_node
+from converter.conversion_options import ConversionOptions
 from converter.mappers import ACTION_MAP, CONTROL_MAP
 from converter.primitives import Relation
 from mappers import dummy_mapper, pig_mapper
 from mappers import ssh_mapper
 from tests.utils.test_paths import EXAMPLE_DEMO_PATH, EXAMPLES_PATH
+from utils import xml_utils
 
 
 class TestOozieParser(unittest.TestCase):
@@ -96,19 +100,103 @@ class TestOozieParser(unittest.TestCase):
         )
         root = ET.fromstring(root_string)
         fork = root.find("fork")
-        node1, node2 = root.findall("action")[0:2]
-        self.parser.parse_fork_node(root, fork)
+        self.parser.parse_fork_node(fork)
         node = self.parser.workflow.nodes[node_name]
-        self.assertIn("task1", node.get_downstreams())
-        self.assertIn("task2", node.get_downstreams())
+        self.assertEqual(["task1", "task2"], node.get_downstreams())
         self.assertIn(node_name, self.parser.workflow.nodes)
-        parse_node_mock.assert_any_call(root, node1)
-        parse_node_mock.assert_any_call(root, node2)
+        # The paths are parsed on their own, not by the fork
+        parse_node_mock.assert_not_called()
         for depend in node.mapper.required_imports():
             self.assertIn(depend, self.parser.workflow.dependencies)
 
         on_parse_node_mock.assert_called_once_with()
 
+    def _parse_workflow_string(self, workflow_string):
+        with tempfile.NamedTemporaryFile("w", suffix=".xml") as workflow_file:
+            workflow_file.write(workflow_string)
+            workflow_file.flush()
+            self.parser.workflow_file = workflow_file.name
+            self.parser.parse_workflow()
+
+    @mock.patch("mappers.base_mapper.BaseMapper.on_parse_finish", wraps=None)
+    def test_parse_workflow_missing_fork_path(self, _):
+        # language=XML
+        workflow_string = """
+<workflow-app xmlns="uri:oozie:workflow:1.0" name="missing">
+    <start to="fork" />
+    <fork name="fork">
+        <path start="missing_task" />
+    </fork>
+    <join name="join" to="end_node" />
+    <end name="end_node" />
+</workflow-app>
+"""
+        with self.assertRaises(xml_utils.NoNodeFoundException):
+            self._parse_workflow_string(workflow_string)
+
+    @mock.patch("mappers.base_mapper.BaseMapper.on_parse_finish", wraps=None)
+    def test_parse_workflow_indexes_nodes_without_children(self, _):
+        # language=XML
+        workflow_string = """
+<workflow-app xmlns="uri:oozie:workflow:1.0" name="indexed">
+    <start to="end-node" />
+    <kill name="fail-node">
+        <message>Failed</message>
+    </kill>
+    <end name="end-node" />
+</workflow-app>
+"""
+        self._parse_workflow_string(workflow_string)
+
+        self.assertEqual(["fail_node", "end_node"], list(self.parser.workflow.xml_nodes))
+        kill_node = self.parser.workflow.xml_nodes["fail_node"]
+        self.assertEqual("kill", kill_node.tag)
+        self.assertEqual(0, len(kill_node))
+        # The children of the parsed nodes are released
+        self.assertEqual(0, len(self.parser.workflow.nodes["fail_node"].mapper.oozie_node))
+
+    def test_parse_workflow_duplicated_node_names(self):
+        # language=XML
+        workflow_string = """
+<workflow-app xmlns="uri:oozie:workflow:1.0" name="duplicated">
+    <start to="task_1" />
+    <kill name="task_1" />
+    <kill name="task-1" />
+    <end name="end_node" />
+</workflow-app>
+"""
+        with self.assertRaises(xml_utils.MultipleNodeFoundException):
+            self._parse_workflow_string(workflow_string)
+
+    def test_iterate_workflow_nodes(self):
+        # language=XML
+        workflow_string = """
+<workflow-app xmlns="uri:oozie:workflow:1.0" name="streamed-workflow">
+    <start to="first-action" />
+    <action name="first-action">
+        <shell xmlns="uri:oozie:shell-action:1.0"><exec>echo</exec></shell>
+        <ok to="end-node" />
+        <error to="end-node" />
+    </action>
+    <end name="end-node" />
+</workflow-app>
+"""
+        nodes = []
+        children = []
+        for node in parser.iterate_workflow_nodes(io.StringIO(workflow_string)):
+            nodes.append(node)
+            children.append([(child.tag, child.attrib, [item.tag for item in child]) for child in node])
+
+        self.assertEqual(["start", "action", "end"], [node.tag for node in nodes])
+        self.assertEqual({"to": "first_action"}, nodes[0].attrib)
+        self.assertEqual({"name": "first_action"}, nodes[1].attrib)
+        self.assertEqual(
+            [("shell", {}, ["exec"]), ("ok", {"to": "end_node"}, []), ("error", {"to": "end_node"}, [])],
+            children[1],
+        )
+        # Subtrees are released once the consumer is done with the node
+        self.assertEqual([0, 0, 0], [len(node) for node in nodes])
+
     @mock.patch("mappers.dummy_mapper.DummyMapper.on_parse_node", wraps=None)
     def test_parse_join_node(self, on_parse_node_mock):
         node_name = "join_name"
@@ -157,10 +245,8 @@ class TestOozieParser(unittest.TestCase):
         on_parse_node_mock.assert_called_once_with()
 
     @mock.patch("mappers.start_mapper.StartMapper.on_parse_node", wraps=None)
-    @mock.patch("uuid.uuid4")
-    def test_parse_start_node(self, uuid_mock, on_parse_node_mock):
-        uuid_mock.return_value = "1234"
-        node_name = "start_node_1234"
+    def test_parse_start_node(self, on_parse_node_mock):
+        node_name = "start_node_8da1"
         end_name = "end_name"
         # language=XML
         start_node_str = "<start to='{end_name}'/>".format(end_name=end_name)
@@ -273,51 +359,59 @@ class TestOozieParser(unittest.TestCase):
     def test_parse_node_action(self, action_mock):
         root = ET.Element("root")
         action = ET.SubElement(root, "action", attrib={"name": "test_name"})
-        self.parser.parse_node(root, action)
+        self.parser.parse_node(action)
         action_mock.assert_called_once_with(action)
 
     @mock.patch("converter.parser.OozieParser.parse_start_node")
     def test_parse_node_start(self, start_mock):
         root = ET.Element("root")
         start = ET.SubElement(root, "start", attrib={"name": "test_name"})
-        self.parser.parse_node(root, start)
+        self.parser.parse_node(start)
         start_mock.assert_called_once_with(start)
 
     @mock.patch("converter.parser.OozieParser.parse_kill_node")
     def test_parse_node_kill(self, kill_mock):
         root = ET.Element("root")
         kill = ET.SubElement(root, "kill", attrib={"name": "test_name"})
-        self.parser.parse_node(root, kill)
+        self.parser.parse_node(kill)
         kill_mock.assert_called_once_with(kill)
 
     @mock.patch("converter.parser.OozieParser.parse_end_node")
     def test_parse_node_end(self, end_mock):
         root = ET.Element("root")
         end = ET.SubElement(root, "end", attrib={"name": "test_name"})
-        self.parser.parse_node(root, end)
+        self.parser.parse_node(end)
         end_mock.assert_called_once_with(end)
 
     @mock.patch("converter.parser.OozieParser.parse_fork_node")
     def test_parse_node_fork(self, fork_mock):
         root = ET.Element("root")
         fork = ET.SubElement(root, "fork", attrib={"name": "test_name"})
-        self.parser.parse_node(root, fork)
-        fork_mock.assert_called_once_with(root, fork)
+        self.parser.parse_node(fork)
+        fork_mock.assert_called_once_with(fork)
 
     @mock.patch("converter.parser.OozieParser.parse_join_node")
     def test_parse_node_join(self, join_mock):
         root = ET.Element("root")
         join = ET.SubElement(root, "join", attrib={"name": "test_name"})
-        self.parser.parse_node(root, join)
+        self.parser.parse_node(join)
         join_mock.assert_called_once_with(join)
 
     @mock.patch("converter.parser.OozieParser.parse_decision_node")
     def test_parse_node_decision(self, decision_mock):
         root = ET.Element("root")
         decision = ET.SubElement(root, "decision", attrib={"name": "test_name"})
-        self.parser.parse_node(root, decision)
+        self.parser.parse_node(decision)
         decision_mock.assert_called_once_with(decision)
 
+    @parameterized.expand([("credentials",), ("global",), ("parameters",), ("start_credentials",)])
+    @mock.patch("converter.parser.OozieParser.parse_start_node")
+    def test_parse_node_ignored(self, tag, start_mock):
+        node = ET.Element(tag, attrib={"name": "test_name"})
+        self.parser.parse_node(node)
+        start_mock.assert_not_called()
+        self.assertEqual({}, self.parser.workflow.nodes)
+
     def test_create_relations(self):
         oozie_node = ET.Element("dummy")
         op1 = parsed_node.ParsedNode(dummy_mapper.DummyMapper(oozie_node=oozie_node, name="task1"))
@@ -509,8 +603,7 @@ class TestOozieExamples(unittest.TestCase):
         name_func=lambda func, num, p: f"{func.__name__}_{num}_{p.args[0].name}",
     )
     @mock.patch("mappers.base_mapper.BaseMapper.on_parse_finish", wraps=None)
-    @mock.patch("uuid.uuid4", return_value="1234")
-    def test_parse_workflow_examples(self, case: WorkflowTestCase, _, on_parse_finish_mock):
+    def test_parse_workflow_examples(self, case: WorkflowTestCase, on_parse_finish_mock):
         current_parser = parser.OozieParser(
             input_directory_path=path.join(EXAMPLES_PATH, case.name),
             output_directory_path="/tmp",
@@ -522,3 +615,26 @@ class TestOozieExamples(unittest.TestCase):
         self.assertEqual(case.node_names, set(current_parser.workflow.nodes.keys()))
         self.assertEqual(case.relations, current_parser.workflow.relations)
         on_parse_finish_mock.assert_called()
+
+    def test_parse_workflow_collapse_control_nodes(self):
+        current_parser = parser.OozieParser(
+            input_directory_path=EXAMPLE_DEMO_PATH,
+            output_directory_path="/tmp",
+            params={"nameNode": "hdfs://"},
+            action_mapper=ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+            options=ConversionOptions(collapse_control_nodes=True),
+        )
+        current_parser.parse_workflow()
+        self.assertNotIn("fork_node", current_parser.workflow.nodes)
+        self.assertNotIn("join_node", current_parser.workflow.nodes)
+        self.assertEqual(
+            {
+                Relation(from_task_id="decision_node", to_task_id="end"),
+                Relation(from_task_id="decision_node", to_task_id="hdfs_node"),
+                Relation(from_task_id="pig_node", to_task_id="decision_node"),
+                Relation(from_task_id="shell_node", to_task_id="decision_node"),
+                Relation(from_task_id="subworkflow_node", to_task_id="decision_node"),
+            },
+            current_parser.workflow.relations,
+        )
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests conversion outputs"""
+import os
+import tempfile
+import unittest
+
+from converter.output import DirectoryOutput, MemoryOutput, SyncedDirectoryOutput
+
+OLD_TIME = 1000000000
+
+
+class TestDirectoryOutput(unittest.TestCase):
+    def test_write(self):
+        with tempfile.TemporaryDirectory() as directory_path:
+            output = DirectoryOutput(os.path.join(directory_path, "output"))
+            output.reset()
+            output.write_dag("dag.py", "x = 1\n")
+            output.write_asset("scripts/id.pig", b"A")
+
+            with open(os.path.join(directory_path, "output", "dag.py")) as file:
+                self.assertEqual("x = 1\n", file.read())
+            with open(os.path.join(directory_path, "output", "scripts", "id.pig"), "rb") as file:
+                self.assertEqual(b"A", file.read())
+
+    def test_reset(self):
+        with tempfile.TemporaryDirectory() as directory_path:
+            output = DirectoryOutput(directory_path)
+            output.write_dag("dag.py", "x = 1\n")
+
+            output.reset()
+
+            self.assertEqual([], os.listdir(directory_path))
+
+
+class TestMemoryOutput(unittest.TestCase):
+    def test_write_and_reset(self):
+        output = MemoryOutput()
+        output.write_dag("dag.py", "x = 1\n")
+        output.write_asset("scripts/id.pig", b"A")
+
+        self.assertEqual({"dag.py": "x = 1\n"}, output.dags)
+        self.assertEqual({"scripts/id.pig": b"A"}, output.assets)
+
+        output.reset()
+
+        self.assertEqual(({}, {}), (output.dags, output.assets))
+
+
+class TestSyncedDirectoryOutput(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.directory_path = self.temporary_directory.name
+        for path, content in (("dag.py", "x = 1\n"), ("stale.py", "x = 2\n"), ("scripts/stale.pig", "B")):
+            file_path = os.path.join(self.directory_path, path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w") as file:
+                file.write(content)
+            os.utime(file_path, (OLD_TIME, OLD_TIME))
+
+    def _get_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(path, file_name), self.directory_path)
+            for path, _, file_names in os.walk(self.directory_path)
+            for file_name in file_names
+        )
+
+    def test_unchanged_file_is_not_replaced(self):
+        output = SyncedDirectoryOutput(self.directory_path)
+        output.reset()
+        output.write_dag("dag.py", "x = 1\n")
+
+        self.assertEqual(OLD_TIME, os.stat(os.path.join(self.directory_path, "dag.py")).st_mtime)
+
+    def test_changed_file_is_replaced(self):
+        output = SyncedDirectoryOutput(self.directory_path)
+        output.reset()
+        output.write_dag("dag.py", "x = 3\n")
+        output.write_asset("scripts/id.pig", b"A")
+
+        with open(os.path.join(self.directory_path, "dag.py")) as file:
+            self.assertEqual("x = 3\n", file.read())
+        self.assertNotEqual(OLD_TIME, os.stat(os.path.join(self.directory_path, "dag.py")).st_mtime)
+        self.assertEqual(["dag.py", "scripts/id.pig", "scripts/stale.pig", "stale.py"], self._get_files())
+
+    def test_finish_removes_stale_files(self):
+        output = SyncedDirectoryOutput(self.directory_path)
+        output.reset()
+        output.write_dag("dag.py", "x = 1\n")
+
+        output.finish()
+
+        self.assertEqual(["dag.py"], self._get_files())
+        self.assertFalse(os.path.exists(os.path.join(self.directory_path, "scripts")))
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the workflow primitives"""
+import unittest
+from unittest import mock
+
+from converter.parsed_node import ParsedNode
+from converter.primitives import NodeIndex, Relation, RelationGraph, Workflow
+from mappers.base_mapper import BaseMapper
+from mappers.decision_mapper import DecisionMapper
+from mappers.dummy_mapper import DummyMapper
+from mappers.end_mapper import EndMapper
+
+
+class RelationGraphTestCase(unittest.TestCase):
+    def setUp(self):
+        self.relations = RelationGraph(
+            [
+                Relation(from_task_id="start", to_task_id="task_a"),
+                Relation(from_task_id="start", to_task_id="task_b"),
+                Relation(from_task_id="task_a", to_task_id="end"),
+                Relation(from_task_id="task_b", to_task_id="end"),
+            ]
+        )
+
+    def test_should_behave_like_set(self):
+        self.relations.add(Relation(from_task_id="start", to_task_id="task_a"))
+
+        self.assertEqual(4, len(self.relations))
+        self.assertIn(Relation(from_task_id="task_a", to_task_id="end"), self.relations)
+        self.assertNotIn(Relation(from_task_id="end", to_task_id="task_a"), self.relations)
+        self.assertEqual(
+            {
+                Relation(from_task_id="start", to_task_id="task_a"),
+                Relation(from_task_id="start", to_task_id="task_b"),
+                Relation(from_task_id="task_a", to_task_id="end"),
+                Relation(from_task_id="task_b", to_task_id="end"),
+            },
+            self.relations,
+        )
+
+    def test_should_index_tasks(self):
+        self.assertEqual(["task_a", "task_b"], self.relations.get_downstream_task_ids("start"))
+        self.assertEqual(["task_a", "task_b"], self.relations.get_upstream_task_ids("end"))
+        self.assertEqual([], self.relations.get_upstream_task_ids("start"))
+        self.assertEqual([], self.relations.get_downstream_task_ids("unknown"))
+
+    def test_discard_should_update_indexes(self):
+        self.relations.discard(Relation(from_task_id="task_a", to_task_id="end"))
+        self.relations.discard(Relation(from_task_id="task_a", to_task_id="end"))
+
+        self.assertEqual(3, len(self.relations))
+        self.assertEqual(["task_b"], self.relations.get_upstream_task_ids("end"))
+        self.assertEqual([], self.relations.get_downstream_task_ids("task_a"))
+
+    def test_remove_relations_from(self):
+        self.relations.remove_relations_from("start")
+
+        self.assertEqual(
+            {
+                Relation(from_task_id="task_a", to_task_id="end"),
+                Relation(from_task_id="task_b", to_task_id="end"),
+            },
+            self.relations,
+        )
+        self.assertEqual([], self.relations.get_upstream_task_ids("task_a"))
+
+    def test_remove_relations_to(self):
+        self.relations.remove_relations_to("end")
+
+        self.assertEqual(
+            {
+                Relation(from_task_id="start", to_task_id="task_a"),
+                Relation(from_task_id="start", to_task_id="task_b"),
+            },
+            self.relations,
+        )
+        self.assertEqual([], self.relations.get_downstream_task_ids("task_b"))
+
+    def test_remove_relations_to_from_upstream_tasks(self):
+        self.relations.remove_relations_to("end", upstream_task_ids={"task_b"})
+
+        self.assertEqual(3, len(self.relations))
+        self.assertEqual(["task_a"], self.relations.get_upstream_task_ids("end"))
+
+
+class NodeIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.decision_node = ParsedNode(mock.Mock(spec=DecisionMapper))
+        self.dummy_node = ParsedNode(mock.Mock(spec=DummyMapper))
+        self.end_node = ParsedNode(mock.Mock(spec=EndMapper))
+        self.nodes = NodeIndex()
+        self.nodes["end"] = self.end_node
+        self.nodes["decision"] = self.decision_node
+        self.nodes["dummy"] = self.dummy_node
+
+    def test_should_keep_order(self):
+        self.assertEqual(["end", "decision", "dummy"], list(self.nodes))
+        self.assertEqual(["end", "decision", "dummy"], list(self.nodes.copy()))
+
+    def test_get_nodes_by_mapper_type(self):
+        self.assertEqual([self.decision_node], self.nodes.get_nodes_by_mapper_type(DecisionMapper))
+        self.assertEqual([self.end_node, self.dummy_node], self.nodes.get_nodes_by_mapper_type(DummyMapper))
+        self.assertEqual(
+            [self.end_node, self.decision_node, self.dummy_node],
+            self.nodes.get_nodes_by_mapper_type(BaseMapper),
+        )
+
+    def test_get_nodes_by_mapper_type_after_change(self):
+        del self.nodes["decision"]
+        self.nodes["dummy"] = self.decision_node
+
+        self.assertEqual([self.decision_node], self.nodes.get_nodes_by_mapper_type(DecisionMapper))
+        self.assertEqual([self.end_node], self.nodes.get_nodes_by_mapper_type(DummyMapper))
+
+    def test_get_nodes_by_mapper_type_keeps_order_of_readded_nodes(self):
+        del self.nodes["end"]
+        self.nodes["end"] = self.end_node
+
+        self.assertEqual(
+            [self.decision_node, self.dummy_node, self.end_node],
+            self.nodes.get_nodes_by_mapper_type(BaseMapper),
+        )
+        self.assertEqual([self.dummy_node, self.end_node], self.nodes.get_nodes_by_mapper_type(DummyMapper))
+
+
+class WorkflowTestCase(unittest.TestCase):
+    def test_should_index_assigned_relations_and_nodes(self):
+        workflow = Workflow(input_directory_path="in", output_directory_path="out")
+        node = ParsedNode(mock.Mock(spec=DecisionMapper))
+
+        workflow.relations = {Relation(from_task_id="a", to_task_id="b")}
+        workflow.nodes = {"a": node}
+
+        self.assertEqual(["a"], workflow.relations.get_upstream_task_ids("b"))
+        self.assertEqual([node], workflow.nodes.get_nodes_by_mapper_type(DecisionMapper))
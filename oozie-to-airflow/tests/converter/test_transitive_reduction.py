@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the transitive reduction of the relations"""
+import unittest
+from unittest import mock
+from xml.etree.ElementTree import Element
+
+from converter.parsed_node import ParsedNode
+from converter.primitives import Relation, Workflow
+from converter.transitive_reduction import reduce_relations
+from mappers.decision_mapper import DecisionMapper
+from mappers.dummy_mapper import DummyMapper
+from utils.trigger_rule import TriggerRule
+
+
+class ReduceRelationsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.workflow = Workflow(input_directory_path="in", output_directory_path="out")
+
+    def add_node(self, name, trigger_rule=TriggerRule.ALL_SUCCESS):
+        mapper = DummyMapper(oozie_node=Element("action"), name=name, trigger_rule=trigger_rule)
+        self.workflow.nodes[name] = ParsedNode(mapper)
+        return self.workflow.nodes[name]
+
+    def add_relations(self, *task_ids):
+        for from_task_id, to_task_id in task_ids:
+            self.workflow.relations.add(Relation(from_task_id=from_task_id, to_task_id=to_task_id))
+
+    def test_should_remove_implied_relations(self):
+        for name in ["task_a", "task_b", "task_c", "task_d"]:
+            self.add_node(name)
+        self.add_relations(
+            ("task_a", "task_b"),
+            ("task_b", "task_c"),
+            ("task_c", "task_d"),
+            ("task_a", "task_c"),
+            ("task_a", "task_d"),
+        )
+
+        self.assertEqual(2, reduce_relations(self.workflow))
+        self.assertEqual(
+            {
+                Relation(from_task_id="task_a", to_task_id="task_b"),
+                Relation(from_task_id="task_b", to_task_id="task_c"),
+                Relation(from_task_id="task_c", to_task_id="task_d"),
+            },
+            self.workflow.relations,
+        )
+
+    def test_should_follow_tasks_of_node(self):
+        self.add_node("task_a")
+        multi_task_node = self.add_node("task_b")
+        multi_task_node.mapper = mock.Mock(
+            first_task_id="task_b_prepare", last_task_id="task_b", trigger_rule=TriggerRule.ALL_SUCCESS
+        )
+        self.add_node("task_c")
+        self.add_relations(("task_a", "task_b_prepare"), ("task_b", "task_c"), ("task_a", "task_c"))
+
+        self.assertEqual(1, reduce_relations(self.workflow))
+        self.assertNotIn(Relation(from_task_id="task_a", to_task_id="task_c"), self.workflow.relations)
+
+    def test_should_keep_relations_to_other_trigger_rules(self):
+        self.add_node("task_a")
+        self.add_node("task_b")
+        self.add_node("task_c", trigger_rule=TriggerRule.ONE_SUCCESS)
+        self.add_relations(("task_a", "task_b"), ("task_b", "task_c"), ("task_a", "task_c"))
+
+        self.assertEqual(0, reduce_relations(self.workflow))
+        self.assertEqual(3, len(self.workflow.relations))
+
+    def test_should_keep_relations_implied_through_other_trigger_rules(self):
+        self.add_node("task_a")
+        self.add_node("task_b", trigger_rule=TriggerRule.DUMMY)
+        self.add_node("task_c")
+        self.add_relations(("task_a", "task_b"), ("task_b", "task_c"), ("task_a", "task_c"))
+
+        self.assertEqual(0, reduce_relations(self.workflow))
+
+    def test_should_keep_error_relations(self):
+        node = self.add_node("task_a")
+        node.set_error_node_name("task_c")
+        self.add_node("task_b")
+        self.add_node("task_c")
+        self.add_relations(("task_a", "task_b"), ("task_b", "task_c"), ("task_a", "task_c"))
+
+        self.assertEqual(0, reduce_relations(self.workflow))
+
+    def test_should_keep_decision_branches(self):
+        decision_mapper = mock.Mock(
+            spec=DecisionMapper,
+            first_task_id="decision",
+            last_task_id="decision",
+            trigger_rule=TriggerRule.ALL_SUCCESS,
+        )
+        decision_mapper.name = "decision"
+        self.workflow.nodes["decision"] = ParsedNode(decision_mapper)
+        self.add_node("task_b")
+        self.add_node("end")
+        self.add_relations(("decision", "task_b"), ("task_b", "end"), ("decision", "end"))
+
+        self.assertEqual(0, reduce_relations(self.workflow))
+
+    def test_should_keep_relations_with_cycle(self):
+        self.add_node("task_a")
+        self.add_node("task_b")
+        self.add_node("task_c")
+        self.add_relations(
+            ("task_a", "task_b"), ("task_b", "task_c"), ("task_a", "task_c"), ("task_c", "task_a")
+        )
+
+        self.assertEqual(0, reduce_relations(self.workflow))
+
+    def test_should_reduce_large_graph(self):
+        node_count = 10000
+        for index in range(node_count):
+            self.add_node(f"task_{index}")
+        for index in range(node_count - 1):
+            self.add_relations((f"task_{index}", f"task_{index + 1}"))
+        for index in range(node_count - 2):
+            self.add_relations((f"task_{index}", f"task_{index + 2}"))
+
+        self.assertEqual(node_count - 2, reduce_relations(self.workflow))
+        self.assertEqual(node_count - 1, len(self.workflow.relations))
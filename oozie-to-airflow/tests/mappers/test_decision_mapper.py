@@ -43,8 +43,15 @@ class TestDecisionMapper(unittest.TestCase):
         self.assertEqual("test_id", mapper.name)
         self.assertEqual(TriggerRule.DUMMY, mapper.trigger_rule)
         self.assertEqual(self.decision_node, mapper.oozie_node)
-        # test conversion from Oozie EL to Jinja
-        self.assertEqual("first_not_null('', '')", next(iter(mapper.case_dict)))
+        # test conversion from Oozie EL to Jinja, known expressions are evaluated
+        self.assertEqual("''", next(iter(mapper.case_dict)))
+
+    def test_create_mapper_with_runtime_expression(self):
+        self.decision_node[0][0].text = "${firstNotNull(runtime, prefix)}"
+        mapper = decision_mapper.DecisionMapper(
+            oozie_node=self.decision_node, name="test_id", params={"prefix": "b"}
+        )
+        self.assertEqual("first_not_null(PARAMS[\"runtime\"], 'b')", next(iter(mapper.case_dict)))
 
     def test_convert_to_text(self):
         # TODO
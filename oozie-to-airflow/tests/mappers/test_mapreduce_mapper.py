@@ -142,6 +142,7 @@ class TestMapReduceMapper(unittest.TestCase):
             },
         )
         # Throws a syntax error if doesn't parse correctly
+        mapper.on_parse_node()
         ast.parse(mapper.convert_to_text())
 
     # pylint: disable=no-self-use
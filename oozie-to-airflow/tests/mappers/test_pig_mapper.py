@@ -112,6 +112,7 @@ class TestPigMapper(unittest.TestCase):
             params={"dataproc_cluster": "my-cluster", "gcp_region": "europe-west3", "nameNode": "hdfs://"},
         )
         # Throws a syntax error if doesn't parse correctly
+        mapper.on_parse_node()
         ast.parse(mapper.convert_to_text())
 
     # pylint: disable=no-self-use
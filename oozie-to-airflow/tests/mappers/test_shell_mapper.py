@@ -100,6 +100,13 @@ class TestShellMapper(unittest.TestCase):
             },
         )
         # Throws a syntax error if doesn't parse correctly
+        mapper.on_parse_node()
+        ast.parse(mapper.convert_to_text())
+
+    def test_convert_to_text_before_on_parse_node(self):
+        mapper = shell_mapper.ShellMapper(oozie_node=self.shell_node, name="test_id")
+
+        self.assertEqual(([], []), mapper.prepare_paths)
         ast.parse(mapper.convert_to_text())
 
     # pylint: disable=no-self-use
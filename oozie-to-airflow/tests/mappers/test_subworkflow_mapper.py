@@ -26,6 +26,14 @@ from mappers import subworkflow_mapper
 from tests.utils.test_paths import EXAMPLE_SUBWORKFLOW_PATH
 
 
+class TestGetAppDirectoryPath(TestCase):
+    def test_sibling_application(self):
+        self.assertEqual(
+            "/apps/child",
+            subworkflow_mapper.get_app_directory_path("hdfs:///user/root/apps/child/", "/apps/parent"),
+        )
+
+
 class TestSubworkflowMapper(TestCase):
 
     subworkflow_params = {
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests the operators of the EL"""
+import unittest
+
+from parameterized import parameterized
+
+from o2a_libs import el_operators
+from o2a_libs.el_macros import EL_MACROS
+
+
+class TestElOperators(unittest.TestCase):
+    @parameterized.expand([(None, 0), ("", 0), ("12", 12), ("1.5", 1.5), ("1e3", 1000.0), (7, 7)])
+    def test_el_to_number(self, value, expected):
+        self.assertEqual(expected, el_operators.el_to_number(value))
+
+    @parameterized.expand([(True,), ("abc",), ([],)])
+    def test_el_to_number_invalid(self, value):
+        with self.assertRaises((TypeError, ValueError)):
+            el_operators.el_to_number(value)
+
+    @parameterized.expand([(None, False), ("", False), ("TRUE", True), ("yes", False), (True, True)])
+    def test_el_to_boolean(self, value, expected):
+        self.assertEqual(expected, el_operators.el_to_boolean(value))
+
+    @parameterized.expand([(None, True), ("", True), ([], True), ("0", False), ("false", False), (0, False)])
+    def test_el_is_empty(self, value, expected):
+        self.assertEqual(expected, el_operators.el_is_empty(value))
+
+    @parameterized.expand(
+        [
+            ("1", 1, True),
+            ("1.0", 1, True),
+            ("true", True, True),
+            ("TRUE", True, True),
+            ("a", "a", True),
+            (True, "a", False),
+            (None, None, True),
+            (None, "", False),
+            ("1", "1.0", False),
+        ]
+    )
+    def test_el_equals(self, left, right, expected):
+        self.assertEqual(expected, el_operators.el_equals(left, right))
+        self.assertEqual(not expected, el_operators.el_not_equals(left, right))
+
+    @parameterized.expand(
+        [
+            (el_operators.el_less_than, "9", 10, True),
+            (el_operators.el_less_than, "9", "10", False),
+            (el_operators.el_less_than, None, 1, False),
+            (el_operators.el_greater_than, "2.5", 2, True),
+            (el_operators.el_less_or_equal, None, None, True),
+            (el_operators.el_greater_or_equal, "b", "a", True),
+        ]
+    )
+    def test_comparison(self, operation, left, right, expected):
+        self.assertEqual(expected, operation(left, right))
+
+    @parameterized.expand(
+        [
+            (el_operators.el_add, "1", 2, 3),
+            (el_operators.el_add, "1.5", None, 1.5),
+            (el_operators.el_subtract, "1", "3", -2),
+            (el_operators.el_multiply, "4", "0.5", 2.0),
+            (el_operators.el_divide, "6", 4, 1.5),
+            (el_operators.el_remainder, "-7", 2, -1),
+            (el_operators.el_remainder, 7, "-2", 1),
+            (el_operators.el_remainder, "-7.5", 2, -1.5),
+        ]
+    )
+    def test_arithmetic(self, operation, left, right, expected):
+        self.assertEqual(expected, operation(left, right))
+
+    def test_el_negate(self):
+        self.assertEqual(-3, el_operators.el_negate("3"))
+
+    def test_el_macros(self):
+        self.assertIs(el_operators.el_add, EL_MACROS["el_add"])
+        self.assertIn("concat", EL_MACROS)
+        self.assertIn("wf_id", EL_MACROS)
+        self.assertNotIn("_is_number", EL_MACROS)
+        self.assertNotIn("math", EL_MACROS)
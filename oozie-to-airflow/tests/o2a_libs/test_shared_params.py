@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests loading of the shared params"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from o2a_libs import shared_params
+
+
+class TestSharedParams(unittest.TestCase):
+    def setUp(self):
+        self.directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory_path)
+        with open(os.path.join(self.directory_path, "o2a_params_1.json"), "w") as file:
+            file.write('{"a": "1", "list": ["x", "y"]}')
+
+    @mock.patch.dict(shared_params._SHARED_PARAMS, clear=True)  # pylint: disable=protected-access
+    def test_load_shared_params(self):
+        params = shared_params.load_shared_params(
+            os.path.join(self.directory_path, "dag.py"), "o2a_params_1.json"
+        )
+
+        self.assertEqual({"a": "1", "list": ["x", "y"]}, params)
+
+    @mock.patch.dict(shared_params._SHARED_PARAMS, clear=True)  # pylint: disable=protected-access
+    def test_load_shared_params_reads_file_once(self):
+        dag_file_path = os.path.join(self.directory_path, "dag.py")
+        params = shared_params.load_shared_params(dag_file_path, "o2a_params_1.json")
+        os.remove(os.path.join(self.directory_path, "o2a_params_1.json"))
+
+        self.assertIs(params, shared_params.load_shared_params("/other/dag.py", "o2a_params_1.json"))
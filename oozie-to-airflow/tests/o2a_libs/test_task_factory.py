@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests the task factory of the compact DAGs"""
+import unittest
+from unittest import mock
+
+from parameterized import parameterized
+
+from o2a_libs import task_factory
+
+FAKE_OPERATOR_PATH = f"{__name__}.FakeOperator"
+
+
+# pylint: disable=too-few-public-methods
+# Stands in for the operator classes, which only get instantiated
+class FakeOperator:
+    def __init__(self, task_id, **kwargs):
+        self.task_id = task_id
+        self.kwargs = kwargs
+
+
+class TestTaskFactory(unittest.TestCase):
+    @mock.patch.dict(task_factory._OPERATORS, clear=True)  # pylint: disable=protected-access
+    def test_get_operator(self):
+        self.assertIs(FakeOperator, task_factory.get_operator(FAKE_OPERATOR_PATH))
+        self.assertIn(FAKE_OPERATOR_PATH, task_factory._OPERATORS)  # pylint: disable=protected-access
+
+    @parameterized.expand([(None, {"a": "1", "b": "2"}), ("a", "1"), (["b"], {"b": "2"}), ([], {})])
+    def test_resolve_param_argument(self, value, expected):
+        self.assertEqual(expected, task_factory.resolve_param_argument(value, {"a": "1", "b": "2"}))
+
+    def test_create_tasks(self):
+        task_types = [
+            (FAKE_OPERATOR_PATH, ("task_id", "command"), ()),
+            (FAKE_OPERATOR_PATH, ("task_id",), ("cluster", "params")),
+        ]
+        tasks = [(0, ("task_a", "ls"), ()), (1, ("task_b",), ("cluster", None))]
+        params = {"cluster": "cluster-o2a"}
+
+        created_tasks = task_factory.create_tasks(task_types, tasks, params)
+
+        self.assertEqual(["task_a", "task_b"], list(created_tasks))
+        self.assertEqual({"command": "ls"}, created_tasks["task_a"].kwargs)
+        self.assertEqual({"cluster": "cluster-o2a", "params": params}, created_tasks["task_b"].kwargs)
+
+    def test_set_relations(self):
+        dag = mock.Mock()
+
+        task_factory.set_relations(dag, {"task_a": ["task_b", "task_c"], "task_b": ["task_c"]})
+
+        self.assertEqual(
+            [mock.call("task_a", "task_b"), mock.call("task_a", "task_c"), mock.call("task_b", "task_c")],
+            dag.set_dependency.call_args_list,
+        )
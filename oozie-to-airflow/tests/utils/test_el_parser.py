@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests EL parser"""
+import unittest
+from unittest import mock
+
+from parameterized import parameterized
+
+from converter.exceptions import ELParserException
+from utils import el_parser
+from utils.el_parser import (
+    BinaryOperation,
+    Conditional,
+    Expression,
+    FunctionCall,
+    Index,
+    Literal,
+    UnaryOperation,
+    Variable,
+)
+
+
+class TestElParser(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ("hostname", Variable("hostname")),
+            ("mapred.job.queue.name", Variable("mapred.job.queue.name")),
+            ("'a\\'b'", Literal("a'b", "'a\\'b'")),
+            ("10", Literal(10, "10")),
+            ("true", Literal(True, "true")),
+            ("wf:id()", FunctionCall("wf:id", ())),
+            (
+                "concat(trim(a), wf:id())",
+                FunctionCall("concat", (FunctionCall("trim", (Variable("a"),)), FunctionCall("wf:id", ()))),
+            ),
+            ("10 * GB", BinaryOperation("*", Literal(10, "10"), Variable("GB"))),
+            (
+                "1 + 2 * 3",
+                BinaryOperation("+", Literal(1, "1"), BinaryOperation("*", Literal(2, "2"), Literal(3, "3"))),
+            ),
+            (
+                "a lt 1 || not b",
+                BinaryOperation(
+                    "or",
+                    BinaryOperation("<", Variable("a"), Literal(1, "1")),
+                    UnaryOperation("not", Variable("b")),
+                ),
+            ),
+            ("a ? b : c", Conditional(Variable("a"), Variable("b"), Variable("c"))),
+            ("a ? b:c", Conditional(Variable("a"), Variable("b"), Variable("c"))),
+            ("a ? b:wf:id()", Conditional(Variable("a"), Variable("b"), FunctionCall("wf:id", ()))),
+            (
+                "hadoop:counters('job')[RECORDS]",
+                Index(FunctionCall("hadoop:counters", (Literal("job", "'job'"),)), Variable("RECORDS")),
+            ),
+        ]
+    )
+    def test_parse_expression(self, source, expected):
+        self.assertEqual(expected, el_parser.parse_expression(source))
+
+    @parameterized.expand([("concat(",), ("a b",), ("'unterminated",), ("a } b",), ("",)])
+    def test_parse_expression_invalid(self, source):
+        with self.assertRaises(ELParserException):
+            el_parser.parse_expression(source)
+
+    def test_parse_template(self):
+        parts = el_parser.parse_template("/user/${user.name}/${concat('}', x)}")
+
+        self.assertEqual(
+            (
+                "/user/",
+                Expression("${user.name}", Variable("user.name")),
+                "/",
+                Expression("${concat('}', x)}", FunctionCall("concat", (Literal("}", "'}'"), Variable("x")))),
+            ),
+            parts,
+        )
+
+    def test_parse_template_keeps_invalid_expressions(self):
+        self.assertEqual(("echo ", "${", "VAR:-x}"), el_parser.parse_template("echo ${VAR:-x}"))
+
+    @mock.patch("utils.el_parser._parse_template")
+    def test_parse_template_without_expressions(self, parse_template_mock):
+        self.assertEqual(("no_el_here",), el_parser.parse_template("no_el_here"))
+        parse_template_mock.assert_not_called()
+
+    def test_parse_template_is_cached(self):
+        self.assertIs(el_parser.parse_template("${a}${b}"), el_parser.parse_template("${a}${b}"))
+
+    @parameterized.expand(
+        [
+            ("concat(a, 'b')", Literal("3b", "'3b'")),
+            ("a * 2 + 1", Literal(7, "7")),
+            ("a / 0", BinaryOperation("/", Literal("3", "'3'"), Literal(0, "0"))),
+            ("not empty a && true", Literal(True, "True")),
+            ("unknown ? a : 1", Conditional(Variable("unknown"), Literal("3", "'3'"), Literal(1, "1"))),
+            ("a eq '3' ? 1 : unknown", Literal(1, "1")),
+            ("a lt 10", Literal(True, "True")),
+            ("a lt '10'", Literal(False, "False")),
+            ("a % -2", Literal(1, "1")),
+            ("-a % 2", Literal(-1, "-1")),
+            ("a == 3", Literal(True, "True")),
+            ("a != 3.0", Literal(False, "False")),
+            ("a == 1", Literal(False, "False")),
+            ("a == true", Literal(False, "False")),
+            ("a == null", Literal(False, "False")),
+            (
+                "a == 'x' + 1",
+                BinaryOperation(
+                    "==", Literal("3", "'3'"), BinaryOperation("+", Literal("x", "'x'"), Literal(1, "1"))
+                ),
+            ),
+            ("concat(a, wf:id())", FunctionCall("concat", (Literal("3", "'3'"), FunctionCall("wf:id", ())))),
+        ]
+    )
+    def test_fold(self, source, expected):
+        functions = {"concat": lambda left, right: left + right}
+
+        self.assertEqual(expected, el_parser.fold(el_parser.parse_expression(source), functions, {"a": "3"}))
+
+    @parameterized.expand(
+        [
+            (
+                "empty a ? concat(b, 'c') : -d[0]",
+                "parse_template(v_b, 'c') if el_is_empty(v_a) else el_negate(v_d[0])",
+            ),
+            ("a gt 1 && b", "el_greater_than(v_a, 1) and el_to_boolean(v_b)"),
+            ("(a || b) && !c", "(el_to_boolean(v_a) or el_to_boolean(v_b)) and el_not(v_c)"),
+            ("a ? b + 1 : c == d", "el_add(v_b, 1) if el_to_boolean(v_a) else el_equals(v_c, v_d)"),
+        ]
+    )
+    def test_to_code(self, source, expected):
+        node = el_parser.parse_expression(source)
+
+        code = el_parser.to_code(node, {"concat": el_parser.parse_template}, lambda name: f"v_{name}")
+
+        self.assertEqual(expected, code)
+
+    def test_to_code_unsupported_function(self):
+        node = el_parser.parse_expression("wf:id()")
+
+        with self.assertRaises(KeyError):
+            el_parser.to_code(node, {"wf:id": None}, str)
@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests EL utils"""
+import os
 import unittest
 import unittest.mock
 
@@ -96,11 +97,22 @@ class TestELUtils(unittest.TestCase):
 
     def test_parse_el_func_fail(self):
         el_func_map = {}
-        el_func = '${concat("abc, "def")}'
+        el_func = '${concat("abc", "def")}'
 
         with self.assertRaises(KeyError):
             el_utils.parse_el_func(el_func, el_func_map)
 
+    def test_parse_el_func_malformed(self):
+        el_func = '${concat("abc, "def")}'
+
+        self.assertIsNone(el_utils.parse_el_func(el_func))
+
+    def test_parse_el_func_nested(self):
+        el_func = "${concat(trim(a), firstNotNull(b, 'c'))}"
+        expected = 'concat(trim(PARAMS["a"]), first_not_null(PARAMS["b"], \'c\'))'
+
+        self.assertEqual(expected, el_utils.parse_el_func(el_func))
+
     def test_convert_el_to_jinja_var_no_quote(self):
         el_function = "${hostname}"
         expected = "{{ params.hostname }}"
@@ -121,6 +133,53 @@ class TestELUtils(unittest.TestCase):
         expected = 'concat("ab", "de")'
         self.assertEqual(expected, el_utils.convert_el_to_jinja(el_function, quote=True))
 
+    @parameterized.expand(
+        [
+            ("${10 * GB}", "el_multiply(10, 1073741824)"),
+            ("${a gt 1 && empty b}", 'el_greater_than(PARAMS["a"], 1) and el_is_empty(PARAMS["b"])'),
+            ("${a eq 'x' ? b : c}", 'PARAMS["b"] if el_equals(PARAMS["a"], \'x\') else PARAMS["c"]'),
+            ("${(a + 1) * 2}", 'el_multiply(el_add(PARAMS["a"], 1), 2)'),
+        ]
+    )
+    def test_convert_el_to_jinja_expression(self, el_function, expected):
+        self.assertEqual(expected, el_utils.convert_el_to_jinja(el_function))
+
+    def test_convert_el_to_jinja_mixed(self):
+        el_function = "ls ${dir}/${concat(a, 'b')}"
+        expected = "'ls {{ params.dir }}/{{ concat(params.a, 'b') }}'"
+        self.assertEqual(expected, el_utils.convert_el_to_jinja(el_function, quote=True))
+
+    @parameterized.expand(
+        [
+            ("bash_command='ls {{ params.dir }}/{{ concat(params.a, 'b') }}'", True),
+            ("bash_command='{{ el_add(params.a, 1) }}'", True),
+            ("bash_command=concat(PARAMS['a'], 'b')", False),
+            ("bash_command='{{ params.dir }}/{{ macros.ds_add(ds, 1) }}'", False),
+        ]
+    )
+    def test_uses_el_macros(self, source, expected):
+        self.assertEqual(expected, el_utils.uses_el_macros(source))
+
+    def test_convert_el_to_jinja_unsupported_function(self):
+        el_function = "${fs:fileSize(dir) gt 10 * GB}"
+        self.assertEqual("'" + el_function + "'", el_utils.convert_el_to_jinja(el_function, quote=True))
+
+    @parameterized.expand(
+        [
+            ("${concat(trim(' a '), b)}", "'ab'"),
+            ("${nameNode}/user/${user.name}", "'hdfs://localhost/user/root'"),
+            ("${size gt 10 * GB}", "False"),
+            ("${size + 1}", "11"),
+            ("${firstNotNull(missing, b)}", "first_not_null(PARAMS[\"missing\"], 'b')"),
+            ("${concat(b, timestamp())}", "concat('b', timestamp())"),
+            ("/${b}/${wf:id()}", "'/b/${wf:id()}'"),
+            ("${size gt 1 ? concat(b, 'c') : b}", "'bc'"),
+        ]
+    )
+    def test_convert_el_to_jinja_with_params(self, el_function, expected):
+        params = {"nameNode": "hdfs://localhost", "user.name": "root", "b": "b", "size": "10"}
+        self.assertEqual(expected, el_utils.convert_el_to_jinja(el_function, quote=True, params=params))
+
     def test_convert_el_to_jinja_no_change_no_quote(self):
         el_function = "no_el_here"
         expected = "no_el_here"
@@ -146,6 +205,17 @@ class TestELUtils(unittest.TestCase):
         expected = {"test": "answer", "key": "value"}
         self.assertEqual(expected, el_utils.parse_els(prop_file.name, params))
 
+    def test_parse_els_file_forward_reference(self):
+        import tempfile
+
+        prop_file = tempfile.NamedTemporaryFile("w", delete=False)
+        prop_file.write("command=ssh ${host}\n" "host=${user.name}@google.com")
+        prop_file.close()
+
+        params = {"user.name": "user"}
+        expected = {"user.name": "user", "command": "ssh user@google.com", "host": "user@google.com"}
+        self.assertEqual(expected, el_utils.parse_els(prop_file.name, params))
+
     def test_parse_els_file_list(self):
         # Should remain unchanged, as the conversion from a comma-separated string to a List will
         # occur before writing to file.
@@ -159,6 +229,26 @@ class TestELUtils(unittest.TestCase):
         expected = {"test": "answer", "key": "value,value2"}
         self.assertEqual(expected, el_utils.parse_els(prop_file.name, params))
 
+    @unittest.mock.patch.dict(el_utils._WORKFLOW_PARAMS_CACHE, clear=True)  # pylint: disable=protected-access
+    def test_load_workflow_params(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as app_path:
+            with open(os.path.join(app_path, "job.properties"), "w") as prop_file:
+                prop_file.write("host=${user.name}@google.com\ncommand=ssh ${host}")
+            with open(os.path.join(app_path, "configuration.properties"), "w") as prop_file:
+                prop_file.write("host=other")
+
+            params = el_utils.load_workflow_params(app_path, user="user")
+
+            self.assertEqual({"user.name": "user", "host": "other", "command": "ssh other"}, dict(params))
+            self.assertIs(params, el_utils.load_workflow_params(app_path, user="user"))
+            self.assertEqual("admin", el_utils.load_workflow_params(app_path, user="admin")["user.name"])
+
+            with open(os.path.join(app_path, "configuration.properties"), "w") as prop_file:
+                prop_file.write("host=changed")
+            self.assertEqual("ssh changed", el_utils.load_workflow_params(app_path, user="user")["command"])
+
     @parameterized.expand(
         [
             ("${nameNode}/examples/output-data/demo/pig-node", "/examples/output-data/demo/pig-node"),
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests format utils"""
+import unittest
+from unittest import mock
+
+from parameterized import parameterized
+
+from utils import format_utils
+
+
+class TestFormatUtils(unittest.TestCase):
+    def setUp(self):
+        format_utils.FORMATTED_SOURCES_CACHE.clear()
+        self.addCleanup(format_utils.FORMATTED_SOURCES_CACHE.clear)
+
+    @parameterized.expand([(False,), (True,)])
+    def test_format_source(self, fast):
+        formatted_source = format_utils.format_source("x  =  {'a':1}\n", fast=fast)
+
+        self.assertEqual('x = {"a": 1}\n', formatted_source)
+
+    def test_format_source_nothing_changed(self):
+        self.assertEqual('x = {"a": 1}\n', format_utils.format_source('x = {"a": 1}\n'))
+
+    @mock.patch("black.format_file_contents", return_value="x = 1\n")
+    def test_format_source_is_cached(self, format_file_contents_mock):
+        format_utils.format_source("x  =  1\n")
+        format_utils.format_source("x  =  1\n")
+
+        format_file_contents_mock.assert_called_once()
+
+    @mock.patch("black.format_file_contents", return_value="x = 1\n")
+    @mock.patch("utils.format_utils.FORMATTED_SOURCES_CACHE_SIZE", 2)
+    def test_format_source_cache_is_bounded(self, _):
+        for i in range(5):
+            format_utils.format_source(f"x  =  {i}\n")
+
+        self.assertEqual(2, len(format_utils.FORMATTED_SOURCES_CACHE))
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests params utils"""
+import unittest
+
+from parameterized import parameterized
+
+from utils import params_utils
+
+PARAMS = {"a": "1", "b": "2", "user.name": "user", "user": "x"}
+
+
+class TestParamsUtils(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ('x = PARAMS["a"]', {"a"}),
+            ("x = PARAMS['a'] + PARAMS[ 'b' ]", {"a", "b"}),
+            ('x = PARAMS["missing"]', set()),
+            ('cmd = "{{ params.a }}"', {"a"}),
+            ('cmd = "{{ params.user.name }}"', {"user", "user.name"}),
+            ("cmd = \"{{ params['user.name'] }}\"", {"user.name"}),
+            ('cmd = "{{ params.missing }}"', set()),
+            ("x = 1", set()),
+        ]
+    )
+    def test_find_referenced_params(self, source, expected_keys):
+        self.assertEqual(expected_keys, params_utils.find_referenced_params(source, PARAMS))
+
+    def test_find_jinja_references_ignores_python_references(self):
+        self.assertEqual(set(), params_utils.find_jinja_references('x = PARAMS["a"]', PARAMS))
+
+    def test_prune_params(self):
+        self.assertEqual(
+            {"a": "1", "b": "2"}, params_utils.prune_params('PARAMS["b"], "{{ params.a }}"', PARAMS)
+        )
+
+    def test_project_task_params(self):
+        source = 'op(params=PARAMS, cmd="{{ params.b }} {{ params.a }}", x=PARAMS["user"])'
+
+        self.assertEqual(
+            'op(params={"a": PARAMS["a"], "b": PARAMS["b"]}, cmd="{{ params.b }} {{ params.a }}", '
+            'x=PARAMS["user"])',
+            params_utils.project_task_params(source, PARAMS),
+        )
+
+    def test_project_task_params_without_references(self):
+        self.assertEqual("op(params={})", params_utils.project_task_params("op(params=PARAMS)", PARAMS))
+
+    def test_project_task_params_without_params_argument(self):
+        source = 'op(cmd="{{ params.a }}")'
+
+        self.assertIs(source, params_utils.project_task_params(source, PARAMS))
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests profile utils"""
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from utils import profile_utils
+from utils.profile_utils import PhaseStats, Profile
+
+
+@profile_utils.profiled("factorial")
+def _factorial(number: int) -> int:
+    return 1 if number <= 1 else number * _factorial(number - 1)
+
+
+class TestProfile(unittest.TestCase):
+    def test_phase(self):
+        with profile_utils.profiling(Profile()) as profile:
+            for _ in range(2):
+                with profile_utils.phase("outer"), profile_utils.phase("inner"):
+                    pass
+
+        self.assertEqual({"outer", "inner"}, set(profile.phases))
+        self.assertEqual(2, profile.phases["outer"].count)
+        self.assertGreaterEqual(profile.phases["outer"].wall_time, profile.phases["inner"].wall_time)
+
+    def test_phase_without_profile(self):
+        with profile_utils.phase("phase"):
+            pass
+
+        with profile_utils.profiling(None):
+            self.assertEqual(6, _factorial(3))
+
+    def test_recursive_phase_is_recorded_once(self):
+        with profile_utils.profiling(Profile()) as profile:
+            self.assertEqual(6, _factorial(3))
+
+        self.assertEqual(1, profile.phases["factorial"].count)
+
+    def test_profile_iterator(self):
+        with profile_utils.profiling(Profile()) as profile:
+            items = list(profile_utils.profile_iterator("read", iter([1, 2])))
+
+        self.assertEqual([1, 2], items)
+        self.assertEqual(3, profile.phases["read"].count)
+
+    def test_merge_and_serialize(self):
+        profile = Profile()
+        profile.add("on_parse_node/PigMapper", PhaseStats(2, 1.0, 0.5))
+        other = Profile()
+        other.add("on_parse_node/PigMapper", PhaseStats(1, 0.5, 0.25))
+        other.add("format_source", PhaseStats(1, 2.0, 2.0))
+
+        profile.merge(other)
+        profile_dict = Profile.from_dict(json.loads(json.dumps(profile.to_dict()))).to_dict()
+
+        self.assertEqual({"PigMapper": 3}, profile_dict["mapper_counts"])
+        self.assertEqual(
+            {"count": 3, "wall_time": 1.5, "cpu_time": 0.75},
+            profile_dict["phases"]["on_parse_node/PigMapper"],
+        )
+
+    def test_format_table(self):
+        profile = Profile()
+        profile.add(profile_utils.TOTAL_PHASE, PhaseStats(1, 4.0, 3.0))
+        profile.add("format_source", PhaseStats(1, 1.0, 1.0))
+
+        lines = profile.format_table().splitlines()
+
+        self.assertEqual(3, len(lines))
+        self.assertTrue(lines[1].startswith(profile_utils.TOTAL_PHASE))
+        self.assertTrue(lines[2].startswith("format_source"))
+        self.assertTrue(lines[2].endswith("25.0%"))
+
+    def test_write_profile_report(self):
+        profiles = {}
+        for path, wall_time in (("/fast", 1.0), ("/slow", 3.0)):
+            profiles[path] = Profile()
+            profiles[path].add(profile_utils.TOTAL_PHASE, PhaseStats(1, wall_time, wall_time))
+        output = io.StringIO()
+        with tempfile.TemporaryDirectory() as directory_path:
+            profile_file_path = os.path.join(directory_path, "profile.json")
+            profile_utils.write_profile_report(profiles, profile_file_path, file=output)
+            with open(profile_file_path) as file:
+                report = json.load(file)
+
+        self.assertEqual(4.0, report["total"]["phases"][profile_utils.TOTAL_PHASE]["wall_time"])
+        self.assertEqual(["/fast", "/slow"], list(report["workflows"]))
+        self.assertLess(output.getvalue().index("/slow"), output.getvalue().index("/fast"))
+
+
+class TestMemoryProfile(unittest.TestCase):
+    def test_memory_profiling(self):
+        with profile_utils.memory_profiling(profile_utils.MemoryProfile()) as profile:
+            data = [bytearray(1024) for _ in range(1024)]
+            profile_utils.memory_checkpoint("allocate")
+            del data
+            profile_utils.memory_checkpoint("release")
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(["allocate", "release"], [checkpoint.phase for checkpoint in profile.checkpoints])
+        allocate = profile.checkpoints[0]
+        self.assertGreater(allocate.current, 1024 * 1024)
+        self.assertGreater(allocate.current, profile.checkpoints[1].current)
+        self.assertIn(__file__, allocate.top_allocation_sites[0].location)
+        self.assertGreaterEqual(profile.peak, allocate.current)
+
+    def test_memory_checkpoint_without_profile(self):
+        with profile_utils.memory_profiling(None) as profile:
+            profile_utils.memory_checkpoint("phase")
+
+        self.assertIsNone(profile)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_serialize(self):
+        profile = profile_utils.MemoryProfile()
+        profile.checkpoints.append(
+            profile_utils.MemoryCheckpoint("phase", 1, 2, [profile_utils.AllocationSite("a.py:1", 1, 1)])
+        )
+
+        restored = profile_utils.MemoryProfile.from_dict(json.loads(json.dumps(profile.to_dict())))
+
+        self.assertEqual(profile.checkpoints, restored.checkpoints)
+        self.assertIn("a.py:1", restored.format_table())
+
+    def test_write_memory_profile_report(self):
+        profiles = {}
+        for path, peak in (("/small", 1), ("/big", 2)):
+            profiles[path] = profile_utils.MemoryProfile()
+            profiles[path].checkpoints.append(profile_utils.MemoryCheckpoint("phase", peak, peak, []))
+        output = io.StringIO()
+        with tempfile.TemporaryDirectory() as directory_path:
+            profile_file_path = os.path.join(directory_path, "memory.json")
+            profile_utils.write_memory_profile_report(profiles, profile_file_path, file=output)
+            with open(profile_file_path) as file:
+                report = json.load(file)
+
+        self.assertEqual(2, report["workflows"]["/big"]["peak"])
+        self.assertIn("highest peak: /big", output.getvalue())
+
+    def test_get_peak_rss(self):
+        self.assertGreater(profile_utils.get_peak_rss(), 1024 * 1024)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests properties utils"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from parameterized import parameterized
+
+from converter.exceptions import ParseException
+from utils import properties_utils
+from utils.properties_utils import Properties
+
+
+class TestParseProperties(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ("key=value", {"key": "value"}),
+            ("key = value ", {"key": "value "}),
+            ("key:value", {"key": "value"}),
+            ("key value", {"key": "value"}),
+            ("  key=value", {"key": "value"}),
+            ("key=", {"key": ""}),
+            ("key", {"key": ""}),
+            ("# comment\n! comment\n\n   \nkey=value", {"key": "value"}),
+            ("key=a,\\\n    b,\\\n    c", {"key": "a,b,c"}),
+            ("key=ends with backslash\\\\", {"key": "ends with backslash\\"}),
+            ("a\\=b\\ c=d", {"a=b c": "d"}),
+            ("key=\\t\\u0041\\x", {"key": "\tAx"}),
+            ("key=value=with=equals", {"key": "value=with=equals"}),
+            ("key=first\nkey=second", {"key": "second"}),
+        ]
+    )
+    def test_parse_properties(self, text, expected):
+        self.assertEqual(expected, properties_utils.parse_properties(text))
+
+
+class TestLoadPropertiesFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_directory.cleanup)
+        self.properties_file = os.path.join(self.temp_directory.name, "job.properties")
+
+    def _write(self, content, mtime):
+        with open(self.properties_file, "w") as file:
+            file.write(content)
+        os.utime(self.properties_file, (mtime, mtime))
+
+    def test_file_is_parsed_once(self):
+        self._write("key=value", mtime=1000)
+        with mock.patch(
+            "utils.properties_utils.parse_properties", wraps=properties_utils.parse_properties
+        ) as parse_properties_mock:
+            first = properties_utils.load_properties_file(self.properties_file)
+            second = properties_utils.load_properties_file(self.properties_file)
+
+        self.assertIs(first, second)
+        parse_properties_mock.assert_called_once()
+
+    def test_changed_file_is_parsed_again(self):
+        self._write("key=value", mtime=1000)
+        properties_utils.load_properties_file(self.properties_file)
+        self._write("key=other", mtime=2000)
+
+        self.assertEqual({"key": "other"}, properties_utils.load_properties_file(self.properties_file))
+
+
+class TestProperties(unittest.TestCase):
+    def test_forward_reference(self):
+        properties = Properties({"command": "ssh ${host}", "host": "user@google.com"})
+
+        self.assertEqual("ssh user@google.com", properties["command"])
+
+    def test_nested_references(self):
+        properties = Properties({"a": "${b}/${c}", "b": "${c}-b", "c": "c"})
+
+        self.assertEqual("c-b/c", properties["a"])
+
+    def test_unknown_reference_is_kept(self):
+        properties = Properties({"a": "${unknown}/${concat(b, c)}"})
+
+        self.assertEqual("${unknown}/${concat(b, c)}", properties["a"])
+
+    def test_cycle(self):
+        properties = Properties({"a": "${b}", "b": "${c}", "c": "${a}", "d": "d"})
+
+        self.assertEqual("d", properties["d"])
+        with self.assertRaisesRegex(ParseException, "a -> b -> c -> a"):
+            properties["a"]  # pylint: disable=pointless-statement
+
+    def test_unused_keys_are_not_resolved(self):
+        with mock.patch(
+            "utils.el_parser.parse_template", wraps=properties_utils.el_parser.parse_template
+        ) as m:
+            properties = Properties({"a": "${b}", "b": "b", "unused": "${b}"})
+            self.assertEqual("b", properties["a"])
+
+        self.assertEqual(2, m.call_count)
+
+    def test_layers(self):
+        base = Properties({"user.name": "root", "path": "/user/${user.name}/${dir}", "dir": "base"})
+        child = base.new_child({"dir": "child", "extra": "${path}"})
+
+        self.assertEqual(["user.name", "path", "dir", "extra"], list(child))
+        self.assertEqual("/user/root/child", child["extra"])
+        self.assertEqual("/user/root/base", base["path"])
+        self.assertEqual("root", child["user.name"])
+
+    def test_child_reuses_values_resolved_by_parent(self):
+        base = Properties({"a": "${b}", "b": "b"})
+        base["a"]  # pylint: disable=pointless-statement
+        child = base.new_child({"c": "c"})
+
+        with mock.patch("utils.el_parser.parse_template") as parse_template_mock:
+            self.assertEqual("b", child["a"])
+
+        parse_template_mock.assert_not_called()
+
+    def test_equals_dict(self):
+        properties = Properties({"a": "x"}).new_child({"b": "${a}"})
+
+        self.assertEqual({"a": "x", "b": "x"}, properties)
+        self.assertEqual(2, len(properties))
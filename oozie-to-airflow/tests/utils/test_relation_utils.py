@@ -17,6 +17,7 @@ import unittest
 
 from converter.primitives import Task, Relation
 from mappers import fs_mapper
+from utils.relation_utils import group_relations, sort_relations
 
 
 # pylint: disable=invalid-name
@@ -46,3 +47,108 @@ class chainTestCase(unittest.TestCase):
                 Relation(from_task_id="task_3", to_task_id="task_4"),
             ],
         )
+
+
+class SortRelationsTestCase(unittest.TestCase):
+    def test_topological_then_lexical(self):
+        relations = [
+            Relation(from_task_id="b", to_task_id="join"),
+            Relation(from_task_id="fork", to_task_id="b"),
+            Relation(from_task_id="join", to_task_id="end"),
+            Relation(from_task_id="fork", to_task_id="a"),
+            Relation(from_task_id="a", to_task_id="join"),
+            Relation(from_task_id="start", to_task_id="fork"),
+        ]
+
+        self.assertEqual(
+            [
+                Relation(from_task_id="start", to_task_id="fork"),
+                Relation(from_task_id="fork", to_task_id="a"),
+                Relation(from_task_id="fork", to_task_id="b"),
+                Relation(from_task_id="a", to_task_id="join"),
+                Relation(from_task_id="b", to_task_id="join"),
+                Relation(from_task_id="join", to_task_id="end"),
+            ],
+            sort_relations(relations),
+        )
+
+    def test_cycle(self):
+        relations = [
+            Relation(from_task_id="b", to_task_id="a"),
+            Relation(from_task_id="a", to_task_id="b"),
+            Relation(from_task_id="start", to_task_id="b"),
+        ]
+
+        self.assertEqual(
+            [
+                Relation(from_task_id="start", to_task_id="b"),
+                Relation(from_task_id="a", to_task_id="b"),
+                Relation(from_task_id="b", to_task_id="a"),
+            ],
+            sort_relations(relations),
+        )
+
+
+class GroupRelationsTestCase(unittest.TestCase):
+    @staticmethod
+    def create_relations(*task_ids):
+        return [
+            Relation(from_task_id=from_task_id, to_task_id=to_task_id)
+            for from_task_id, to_task_id in task_ids
+        ]
+
+    def test_empty(self):
+        self.assertEqual([], group_relations([]))
+
+    def test_chain(self):
+        relations = self.create_relations(("a", "b"), ("b", "c"), ("c", "d"))
+
+        self.assertEqual([[["a"], ["b"], ["c"], ["d"]]], group_relations(relations))
+
+    def test_fork_and_join(self):
+        relations = self.create_relations(
+            ("start", "fork"),
+            ("fork", "a"),
+            ("fork", "b"),
+            ("a", "a_2"),
+            ("a_2", "join"),
+            ("b", "join"),
+            ("join", "end"),
+        )
+
+        self.assertEqual(
+            [[["start"], ["fork"], ["a", "b"]], [["a"], ["a_2"]], [["a_2", "b"], ["join"], ["end"]]],
+            group_relations(relations),
+        )
+
+    def test_fan_out_to_fan_in(self):
+        relations = self.create_relations(("a", "c"), ("a", "d"), ("b", "c"), ("b", "d"))
+
+        self.assertEqual([[["a"], ["c", "d"]], [["b"], ["c", "d"]]], group_relations(relations))
+
+    def test_mixed_fan_in(self):
+        relations = self.create_relations(("a", "c"), ("a", "d"), ("b", "c"))
+
+        self.assertEqual([[["a"], ["c", "d"]], [["b"], ["c"]]], group_relations(relations))
+
+    def test_cycle(self):
+        relations = self.create_relations(("a", "b"), ("b", "a"))
+
+        self.assertEqual([[["a"], ["b"], ["a"]]], group_relations(relations))
+
+    def test_should_group_each_relation_once(self):
+        relations = set(
+            self.create_relations(
+                ("a", "b"), ("a", "c"), ("b", "d"), ("c", "d"), ("d", "e"), ("e", "f"), ("e", "g"), ("x", "g")
+            )
+        )
+
+        grouped_relations = [
+            Relation(from_task_id=from_task_id, to_task_id=to_task_id)
+            for statement in group_relations(sort_relations(relations))
+            for from_stage, to_stage in zip(statement, statement[1:])
+            for from_task_id in from_stage
+            for to_task_id in to_stage
+        ]
+        self.assertEqual(len(relations), len(grouped_relations))
+        self.assertEqual(relations, set(grouped_relations))
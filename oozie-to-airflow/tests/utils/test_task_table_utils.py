@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the conversion of the tasks to data"""
+import ast
+import unittest
+
+from parameterized import parameterized
+
+from converter.primitives import Relation
+from utils import task_table_utils
+from utils.task_table_utils import TaskRow, TaskTable, TaskType
+
+IMPORTS = {
+    "from airflow.operators import bash_operator",
+    "from airflow.operators.subdag_operator import SubDagOperator",
+    "import datetime",
+    "import os.path",
+    "import shlex as quoting",
+}
+
+
+class TaskTableUtilsTestCase(unittest.TestCase):
+    def test_get_import_aliases(self):
+        self.assertEqual(
+            {
+                "bash_operator": "airflow.operators.bash_operator",
+                "SubDagOperator": "airflow.operators.subdag_operator.SubDagOperator",
+                "datetime": "datetime",
+                "os": "os",
+                "quoting": "shlex",
+            },
+            task_table_utils.get_import_aliases(IMPORTS),
+        )
+
+    @parameterized.expand(
+        [
+            ("PARAMS", None),
+            ("PARAMS['a']", "a"),
+            ("{'a': PARAMS['a'], 'b': PARAMS['b']}", ["a", "b"]),
+            ("{'a': PARAMS['b']}", task_table_utils._NOT_CONVERTIBLE),  # pylint: disable=protected-access
+            ("{**PARAMS}", task_table_utils._NOT_CONVERTIBLE),  # pylint: disable=protected-access
+            ("OTHER['a']", task_table_utils._NOT_CONVERTIBLE),  # pylint: disable=protected-access
+            ("PARAMS['a'] + 'b'", task_table_utils._NOT_CONVERTIBLE),  # pylint: disable=protected-access
+            ("PARAMS[{[]: 'a'}]", task_table_utils._NOT_CONVERTIBLE),  # pylint: disable=protected-access
+        ]
+    )
+    def test_convert_param_argument(self, source, expected):
+        node = ast.parse(source, mode="eval").body
+        self.assertEqual(expected, task_table_utils.convert_param_argument(node))
+
+    @parameterized.expand(
+        [
+            ("a >> b", [("a", "b")]),
+            ("a >> [b, c] >> d", [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")]),
+            ("a.set_downstream(b)", [("a", "b")]),
+            ("a.set_downstream([b, c])", [("a", "b"), ("a", "c")]),
+            ("a >> b()", None),
+            ("a.set_upstream(b)", None),
+            ("a.set_downstream(b, c)", None),
+            ("a.b.set_downstream(c)", None),
+            ("a = b", None),
+        ]
+    )
+    def test_parse_relations(self, source, expected):
+        relations = task_table_utils.parse_relations(ast.parse(source).body[0])
+        if expected is None:
+            self.assertIsNone(relations)
+        else:
+            self.assertEqual(
+                [
+                    Relation(from_task_id=from_task_id, to_task_id=to_task_id)
+                    for from_task_id, to_task_id in expected
+                ],
+                relations,
+            )
+
+
+class TaskTableTestCase(unittest.TestCase):
+    def setUp(self):
+        self.task_table = TaskTable(task_table_utils.get_import_aliases(IMPORTS))
+
+    def test_add_source_converts_tasks(self):
+        self.task_table.add_source(
+            "task_a = bash_operator.BashOperator(task_id='task_a', bash_command='ls', params=PARAMS)\n"
+            "task_b = bash_operator.BashOperator(task_id='task_b', bash_command='pwd', params=PARAMS)\n"
+            "task_c = SubDagOperator(task_id='task_c', retries=2, conn_id=PARAMS['conn_id'])\n"
+            "task_a >> task_b\n"
+        )
+
+        self.assertEqual(
+            {
+                TaskType(
+                    "airflow.operators.bash_operator.BashOperator", ("task_id", "bash_command"), ("params",)
+                ): 0,
+                TaskType(
+                    "airflow.operators.subdag_operator.SubDagOperator", ("task_id", "retries"), ("conn_id",)
+                ): 1,
+            },
+            self.task_table.task_types,
+        )
+        self.assertEqual(
+            [
+                TaskRow(0, ("task_a", "ls"), (None,)),
+                TaskRow(0, ("task_b", "pwd"), (None,)),
+                TaskRow(1, ("task_c", 2), ("conn_id",)),
+            ],
+            self.task_table.tasks,
+        )
+        self.assertEqual({Relation(from_task_id="task_a", to_task_id="task_b")}, self.task_table.relations)
+        self.assertEqual("", self.task_table.get_code())
+
+    @parameterized.expand(
+        [
+            ("task_a = bash_operator.BashOperator(task_id='task_a', bash_command='ls'.upper())\n",),
+            ("task_a = bash_operator.BashOperator(task_id='other')\n",),
+            ("task_a = unknown.Operator(task_id='task_a')\n",),
+            ("task_a = bash_operator.BashOperator('task_a')\n",),
+            ("task_a = bash_operator.BashOperator(**{'task_id': 'task_a'})\n",),
+            ("def task_a_decision():\n    return 'task_b'\n",),
+        ]
+    )
+    def test_add_source_keeps_code(self, source):
+        self.task_table.add_source(source)
+
+        self.assertEqual([], self.task_table.tasks)
+        self.assertEqual(source, self.task_table.get_code())
+
+    def test_render_body_binds_referenced_tasks(self):
+        self.task_table.add_source(
+            "task_a = bash_operator.BashOperator(task_id='task_a', bash_command='ls')\n"
+            "\n"
+            "@decorator\n"
+            "def callback():\n"
+            "    return task_a.task_id\n"
+            "\n"
+            "task_b = bash_operator.BashOperator(task_id='task_b', bash_command=callback())\n"
+        )
+
+        self.assertEqual(
+            "\n"
+            "o2a_tasks = task_factory.create_tasks(TASK_TYPES, TASKS, PARAMS)\n"
+            "task_a = o2a_tasks['task_a']\n"
+            "@decorator\n"
+            "def callback():\n"
+            "    return task_a.task_id\n"
+            "\n"
+            "task_b = bash_operator.BashOperator(task_id='task_b', bash_command=callback())\n"
+            "\n"
+            "task_factory.set_relations(dag, RELATIONS)\n",
+            self.task_table.render_body(),
+        )
+
+    def test_render_data(self):
+        self.task_table.add_source(
+            "task_a = bash_operator.BashOperator(task_id='task_a', bash_command='ls')\n"
+            "task_b = bash_operator.BashOperator(task_id='task_b', bash_command='pwd')\n"
+        )
+        self.task_table.add_relations(
+            [
+                Relation(from_task_id="task_a", to_task_id="task_c"),
+                Relation(from_task_id="task_a", to_task_id="task_b"),
+            ]
+        )
+
+        data = {}
+        exec(self.task_table.render_data(), data)  # pylint: disable=exec-used
+
+        self.assertEqual(
+            [("airflow.operators.bash_operator.BashOperator", ("task_id", "bash_command"), ())],
+            data["TASK_TYPES"],
+        )
+        self.assertEqual([(0, ("task_a", "ls"), ()), (0, ("task_b", "pwd"), ())], data["TASKS"])
+        self.assertEqual({"task_a": ["task_b", "task_c"]}, data["RELATIONS"])
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests trigger rule"""
+import unittest
+
+from airflow.utils import trigger_rule as airflow_trigger_rule
+from parameterized import parameterized
+
+from utils.trigger_rule import TriggerRule
+
+
+class TestTriggerRule(unittest.TestCase):
+    @parameterized.expand([(name,) for name in vars(TriggerRule) if name.isupper()])
+    def test_matches_airflow(self, name):
+        self.assertEqual(getattr(airflow_trigger_rule.TriggerRule, name), getattr(TriggerRule, name))
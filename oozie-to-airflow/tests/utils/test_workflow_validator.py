@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests workflow validator"""
+import contextlib
+import glob
+import io
+import os
+import tempfile
+import unittest
+
+from tests.utils.test_paths import EXAMPLES_PATH
+from utils import workflow_validator
+
+INVALID_WORKFLOW = """<?xml version="1.0" encoding="UTF-8"?>
+<workflow-app xmlns="uri:oozie:workflow:1.0" name="invalid">
+    <start to="end"/>
+    <bogus/>
+    <end name="end"/>
+</workflow-app>
+"""
+
+MALFORMED_WORKFLOW = """<?xml version="1.0" encoding="UTF-8"?>
+<workflow-app xmlns="uri:oozie:workflow:1.0" name="malformed">
+    <start to="end">
+</workflow-app>
+"""
+
+
+class TestWorkflowValidator(unittest.TestCase):
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_directory.cleanup)
+
+    def _write(self, content):
+        file_path = os.path.join(
+            self.temp_directory.name, f"workflow_{len(os.listdir(self.temp_directory.name))}.xml"
+        )
+        with open(file_path, "w") as file:
+            file.write(content)
+        return file_path
+
+    def test_examples_are_valid(self):
+        file_paths = sorted(glob.glob(os.path.join(EXAMPLES_PATH, "*", "workflow.xml")))
+
+        results = workflow_validator.validate_workflows(file_paths)
+
+        self.assertEqual(file_paths, [result.file_path for result in results])
+        self.assertEqual([[]] * len(file_paths), [result.errors for result in results])
+
+    def test_invalid_workflow(self):
+        file_path = self._write(INVALID_WORKFLOW)
+
+        result = workflow_validator.validate_workflow(file_path)
+
+        self.assertFalse(result.is_valid)
+        self.assertEqual(1, len(result.errors))
+        self.assertEqual(file_path, result.errors[0].file_path)
+        self.assertEqual(4, result.errors[0].line)
+        self.assertIn("bogus", result.errors[0].message)
+        self.assertTrue(str(result.errors[0]).startswith(f"{file_path}:4:"))
+
+    def test_malformed_workflow(self):
+        file_path = self._write(MALFORMED_WORKFLOW)
+
+        result = workflow_validator.validate_workflow(file_path)
+
+        self.assertFalse(result.is_valid)
+        self.assertEqual(4, result.errors[0].line)
+
+    def test_missing_workflow(self):
+        file_path = os.path.join(self.temp_directory.name, "missing.xml")
+
+        result = workflow_validator.validate_workflow(file_path)
+
+        self.assertFalse(result.is_valid)
+        self.assertEqual(0, result.errors[0].line)
+
+    def test_schema_is_compiled_once_per_thread(self):
+        self.assertIs(workflow_validator.get_schema(), workflow_validator.get_schema())
+
+    def test_validate_many_workflows_concurrently(self):
+        file_paths = [self._write(INVALID_WORKFLOW if i % 2 else MALFORMED_WORKFLOW) for i in range(20)]
+
+        results = workflow_validator.validate_workflows(file_paths, max_workers=4)
+
+        self.assertEqual(file_paths, [result.file_path for result in results])
+        for result in results:
+            self.assertEqual([result.file_path], list({error.file_path for error in result.errors}))
+
+    def test_main(self):
+        valid_file_path = os.path.join(EXAMPLES_PATH, "demo", "workflow.xml")
+        invalid_file_path = self._write(INVALID_WORKFLOW)
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            return_code = workflow_validator.main([valid_file_path, invalid_file_path])
+
+        self.assertEqual(1, return_code)
+        self.assertIn(f"{valid_file_path} validates", output.getvalue())
+        self.assertIn(f"{invalid_file_path}:4:", output.getvalue())
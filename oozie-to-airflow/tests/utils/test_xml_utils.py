@@ -47,6 +47,36 @@ class TestELUtils(unittest.TestCase):
         with self.assertRaises(xml_utils.MultipleNodeFoundException):
             xml_utils.find_node_by_name(element_tree.getroot(), "test_attrib")
 
+    def test_index_nodes_by_name(self):
+        doc = ET.Element("outer")
+        node1 = ET.SubElement(doc, "inner_tag", attrib={"name": "name1"})
+        node2 = ET.SubElement(doc, "other_inner_tag", attrib={"name": "name2"})
+        ET.SubElement(doc, "no_name_tag")
+        ET.SubElement(node1, "in_inner_tag", attrib={"name": "out_of_scope"})
+
+        index = xml_utils.index_nodes_by_name(doc)
+
+        self.assertEqual({"name1": node1, "name2": node2}, index)
+
+    def test_index_nodes_by_name_multiple(self):
+        doc = ET.Element("outer")
+        ET.SubElement(doc, "inner_tag", attrib={"name": "test_attrib"})
+        ET.SubElement(doc, "other_inner_tag", attrib={"name": "test_attrib"})
+
+        with self.assertRaises(xml_utils.MultipleNodeFoundException):
+            xml_utils.index_nodes_by_name(doc)
+
+    def test_get_node_by_name(self):
+        doc = ET.Element("outer")
+        node = ET.SubElement(doc, "inner_tag", attrib={"name": "test_attrib"})
+        index = xml_utils.index_nodes_by_name(doc)
+
+        self.assertEqual(node, xml_utils.get_node_by_name(index, "test_attrib"))
+
+    def test_get_node_by_name_not_found(self):
+        with self.assertRaises(xml_utils.NoNodeFoundException):
+            xml_utils.get_node_by_name({}, "test_attrib")
+
     def test_find_nodes_by_tag(self):
         doc = ET.Element("outer")
         node = ET.SubElement(doc, "tag1")
@@ -0,0 +1,530 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tokenizer and parser of the Oozie EL expressions"""
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from converter.exceptions import ELParserException
+from o2a_libs import el_operators
+
+# Maximum number of distinct strings whose parsed form is kept in memory
+TEMPLATE_CACHE_SIZE = 4096
+
+# The namespaced name of a function, e.g. wf:id, is matched only when followed by "(", so that
+# the colon of a conditional, e.g. ${condition ? a:b}, is not taken for a namespace separator
+TOKEN_MATCH = re.compile(
+    r"""
+    \s*(?:
+        (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+        |(?P<number>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+        |(?P<name>[A-Za-z_$][\w$]*(?::[A-Za-z_$][\w$]*(?=\s*\())?)
+        |(?P<operator>==|!=|<=|>=|&&|\|\||[-+*/%<>!?:()\[\],.}])
+    )
+    """,
+    re.VERBOSE,
+)
+
+STRING_ESCAPE_MATCH = re.compile(r"\\(.)")
+
+# Keywords of the EL mapped to the operators used by the generated Python/Jinja code
+KEYWORD_OPERATORS = {
+    "and": "and",
+    "or": "or",
+    "not": "not",
+    "empty": "empty",
+    "eq": "==",
+    "ne": "!=",
+    "lt": "<",
+    "gt": ">",
+    "le": "<=",
+    "ge": ">=",
+    "div": "/",
+    "mod": "%",
+}
+
+SYMBOL_OPERATORS = {"&&": "and", "||": "or", "!": "not"}
+
+KEYWORD_LITERALS = {"true": True, "false": False, "null": None}
+
+BINARY_OPERATORS_BY_PRECEDENCE = [
+    {"or"},
+    {"and"},
+    {"==", "!="},
+    {"<", ">", "<=", ">="},
+    {"+", "-"},
+    {"*", "/", "%"},
+]
+
+# Operators whose result is always a boolean, so that it does not have to be coerced
+BOOLEAN_OPERATORS = {"not", "empty", "or", "and", "==", "!=", "<", ">", "<=", ">="}
+
+
+class Token(NamedTuple):
+    kind: str
+    value: str
+
+
+class Literal(NamedTuple):
+    value: Any
+    source: str
+
+
+class Variable(NamedTuple):
+    name: str
+
+
+class FunctionCall(NamedTuple):
+    name: str
+    arguments: Tuple[Any, ...]
+
+
+class UnaryOperation(NamedTuple):
+    operator: str
+    operand: Any
+
+
+class BinaryOperation(NamedTuple):
+    operator: str
+    left: Any
+    right: Any
+
+
+class Conditional(NamedTuple):
+    condition: Any
+    if_true: Any
+    if_false: Any
+
+
+class Index(NamedTuple):
+    value: Any
+    index: Any
+
+
+class Expression(NamedTuple):
+    """Single ${...} expression found in a string"""
+
+    source: str
+    node: Any
+
+
+TemplatePart = Union[str, Expression]
+
+
+def tokenize(text: str, position: int = 0) -> Tuple[List[Token], int]:
+    """
+    Splits the EL expression into tokens, stopping at the closing brace of the expression.
+
+    :param text: String containing the expression.
+    :param position: Index of the first character after the opening ${.
+    :return: Tokens of the expression and the index after its closing brace.
+    """
+    tokens: List[Token] = []
+    while True:
+        match = TOKEN_MATCH.match(text, position)
+        if not match or match.lastgroup is None:
+            raise ELParserException(f"Invalid EL expression at position {position}: {text}")
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "operator" and value == "}":
+            return tokens, position
+        if kind == "name" and value in KEYWORD_OPERATORS:
+            kind, value = "operator", KEYWORD_OPERATORS[value]
+        elif kind == "operator" and value in SYMBOL_OPERATORS:
+            value = SYMBOL_OPERATORS[value]
+        tokens.append(Token(kind, value))
+
+
+class _Parser:
+    """Recursive descent parser building the AST from the tokens of a single expression"""
+
+    def __init__(self, tokens: List[Token], source: str):
+        self.tokens = tokens
+        self.source = source
+        self.position = 0
+
+    def parse(self):
+        node = self.parse_conditional()
+        if self.peek() is not None:
+            self.fail(f"Unexpected token '{self.peek().value}'")
+        return node
+
+    def fail(self, message: str):
+        raise ELParserException(f"{message} in EL expression: {self.source}")
+
+    def peek(self) -> Optional[Token]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def accept(self, *operators: str) -> Optional[str]:
+        token = self.peek()
+        if token is not None and token.kind == "operator" and token.value in operators:
+            self.position += 1
+            return token.value
+        return None
+
+    def expect(self, operator: str):
+        if not self.accept(operator):
+            self.fail(f"Expected '{operator}'")
+
+    def parse_conditional(self):
+        node = self.parse_binary(0)
+        if self.accept("?"):
+            if_true = self.parse_conditional()
+            self.expect(":")
+            return Conditional(node, if_true, self.parse_conditional())
+        return node
+
+    def parse_binary(self, level: int):
+        if level == len(BINARY_OPERATORS_BY_PRECEDENCE):
+            return self.parse_unary()
+        node = self.parse_binary(level + 1)
+        operator = self.accept(*BINARY_OPERATORS_BY_PRECEDENCE[level])
+        while operator:
+            node = BinaryOperation(operator, node, self.parse_binary(level + 1))
+            operator = self.accept(*BINARY_OPERATORS_BY_PRECEDENCE[level])
+        return node
+
+    def parse_unary(self):
+        operator = self.accept("-", "not", "empty")
+        if operator:
+            return UnaryOperation(operator, self.parse_unary())
+        return self.parse_postfix()
+
+    def parse_postfix(self):
+        node = self.parse_primary()
+        while True:
+            if self.accept("."):
+                token = self.peek()
+                if token is None or token.kind != "name":
+                    self.fail("Expected property name")
+                self.position += 1
+                # Oozie properties have dotted names, e.g. ${mapred.job.queue.name}
+                if isinstance(node, Variable):
+                    node = Variable(f"{node.name}.{token.value}")
+                else:
+                    node = Index(node, Literal(token.value, f'"{token.value}"'))
+            elif self.accept("["):
+                node = Index(node, self.parse_conditional())
+                self.expect("]")
+            else:
+                return node
+
+    def parse_primary(self):
+        """Parses a literal, a variable, a function call or an expression in parentheses"""
+        token = self.peek()
+        if token is None:
+            self.fail("Unexpected end")
+        if self.accept("("):
+            node = self.parse_conditional()
+            self.expect(")")
+            return node
+        self.position += 1
+        parse_token = self.TOKEN_PARSERS.get(token.kind)
+        if parse_token is None:
+            return self.fail(f"Unexpected token '{token.value}'")
+        return parse_token(self, token)
+
+    def parse_string(self, token: Token):
+        return Literal(STRING_ESCAPE_MATCH.sub(r"\1", token.value[1:-1]), token.value)
+
+    def parse_number(self, token: Token):
+        value = float(token.value) if "." in token.value or "e" in token.value.lower() else int(token.value)
+        return Literal(value, token.value)
+
+    def parse_name(self, token: Token):
+        if token.value in KEYWORD_LITERALS:
+            return Literal(KEYWORD_LITERALS[token.value], token.value)
+        if not self.accept("("):
+            return Variable(token.value)
+        arguments = []
+        if not self.accept(")"):
+            arguments.append(self.parse_conditional())
+            while self.accept(","):
+                arguments.append(self.parse_conditional())
+            self.expect(")")
+        return FunctionCall(token.value, tuple(arguments))
+
+    # Parsers of the primary expressions starting with a token of the kind
+    TOKEN_PARSERS: Dict[str, Callable[["_Parser", Token], Any]] = {
+        "string": parse_string,
+        "number": parse_number,
+        "name": parse_name,
+    }
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def parse_expression(source: str):
+    """
+    Parses a single EL expression, e.g. concat(trim(a), wf:id()), into its AST.
+
+    :param source: The expression without the enclosing ${ and }.
+    :return: Root node of the AST.
+    """
+    tokens, end = tokenize(source + "}")
+    if end != len(source) + 1:
+        raise ELParserException(f"Unexpected '}}' in EL expression: {source}")
+    return _Parser(tokens, source).parse()
+
+
+def parse_template(text: str) -> Tuple[TemplatePart, ...]:
+    """
+    Splits the string into plain text and parsed ${...} expressions. Invalid expressions
+    are kept as plain text. Strings without expressions are returned without parsing.
+
+    :param text: String which may contain EL expressions.
+    :return: Plain text parts and expressions in the order they appear in the string.
+    """
+    if "${" not in text:
+        return (text,)
+    return _parse_template(text)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _parse_template(text: str) -> Tuple[TemplatePart, ...]:
+    """Splits the string containing ${ into plain text and parsed expressions, see parse_template"""
+    parts: List[TemplatePart] = []
+    position = 0
+    start = text.find("${")
+    while start != -1:
+        if start > position:
+            parts.append(text[position:start])
+        body_start = start + 2
+        try:
+            _, end = tokenize(text, body_start)
+            body_end = end - 1
+            expression = Expression(text[start:end], parse_expression(text[body_start:body_end]))
+        except ELParserException as ex:
+            logging.debug(f"Leaving unparsable EL as it is: {ex}")
+            parts.append(text[start:body_start])
+            position = body_start
+        else:
+            parts.append(expression)
+            position = end
+        start = text.find("${", position)
+    if position < len(text):
+        parts.append(text[position:])
+    return tuple(parts)
+
+
+def fold(node, functions: Mapping[str, Callable], variables: Mapping[str, Any]):
+    """
+    Evaluates the parts of the expression which only use known variables and pure functions,
+    so that they do not have to be evaluated at runtime.
+
+    :param node: Root node of the AST.
+    :param functions: Map of the pure EL function names to the functions implementing them.
+    :param variables: Map of the variable names to the values known at conversion time.
+    :return: A Literal if the whole expression is known, otherwise the AST with its known
+        sub-expressions replaced with Literals.
+    """
+    fold_node = FOLD_FUNCTIONS.get(type(node))
+    return fold_node(node, functions, variables) if fold_node else node
+
+
+def _fold_variable(node: Variable, _: Mapping[str, Callable], variables: Mapping[str, Any]):
+    return _to_literal(variables[node.name]) if node.name in variables else node
+
+
+def _fold_function_call(node: FunctionCall, functions: Mapping[str, Callable], variables: Mapping[str, Any]):
+    arguments = tuple(fold(argument, functions, variables) for argument in node.arguments)
+    if node.name in functions and all(isinstance(argument, Literal) for argument in arguments):
+        return _evaluate(functions[node.name], *(argument.value for argument in arguments)) or FunctionCall(
+            node.name, arguments
+        )
+    return FunctionCall(node.name, arguments)
+
+
+def _fold_unary_operation(
+    node: UnaryOperation, functions: Mapping[str, Callable], variables: Mapping[str, Any]
+):
+    operand = fold(node.operand, functions, variables)
+    if isinstance(operand, Literal):
+        operation = UNARY_OPERATIONS[node.operator]
+        return _evaluate(operation, operand.value) or UnaryOperation(node.operator, operand)
+    return UnaryOperation(node.operator, operand)
+
+
+def _fold_binary_operation(
+    node: BinaryOperation, functions: Mapping[str, Callable], variables: Mapping[str, Any]
+):
+    left = fold(node.left, functions, variables)
+    right = fold(node.right, functions, variables)
+    if isinstance(left, Literal) and isinstance(right, Literal):
+        operation = BINARY_OPERATIONS[node.operator]
+        return _evaluate(operation, left.value, right.value) or BinaryOperation(node.operator, left, right)
+    return BinaryOperation(node.operator, left, right)
+
+
+def _fold_conditional(node: Conditional, functions: Mapping[str, Callable], variables: Mapping[str, Any]):
+    condition = fold(node.condition, functions, variables)
+    if isinstance(condition, Literal) and isinstance(condition.value, bool):
+        return fold(node.if_true if condition.value else node.if_false, functions, variables)
+    return Conditional(
+        condition, fold(node.if_true, functions, variables), fold(node.if_false, functions, variables)
+    )
+
+
+def _fold_index(node: Index, functions: Mapping[str, Callable], variables: Mapping[str, Any]):
+    return Index(fold(node.value, functions, variables), fold(node.index, functions, variables))
+
+
+# Functions folding the nodes of the type, the other nodes are folded already
+FOLD_FUNCTIONS: Dict[type, Callable] = {
+    Variable: _fold_variable,
+    FunctionCall: _fold_function_call,
+    UnaryOperation: _fold_unary_operation,
+    BinaryOperation: _fold_binary_operation,
+    Conditional: _fold_conditional,
+    Index: _fold_index,
+}
+
+
+def _to_literal(value) -> Literal:
+    return Literal(value, repr(value))
+
+
+def _evaluate(operation: Callable, *arguments) -> Optional[Literal]:
+    try:
+        return _to_literal(operation(*arguments))
+    except (TypeError, ValueError, ArithmeticError, re.error):
+        return None
+
+
+# Evaluation of the operators following the coercion rules of the EL. The generated code
+# calls the same functions, so the operators behave alike at conversion time and at runtime.
+UNARY_OPERATIONS: Dict[str, Callable] = {
+    "-": el_operators.el_negate,
+    "not": el_operators.el_not,
+    "empty": el_operators.el_is_empty,
+}
+
+BINARY_OPERATIONS: Dict[str, Callable] = {
+    "or": el_operators.el_or,
+    "and": el_operators.el_and,
+    "==": el_operators.el_equals,
+    "!=": el_operators.el_not_equals,
+    "<": el_operators.el_less_than,
+    ">": el_operators.el_greater_than,
+    "<=": el_operators.el_less_or_equal,
+    ">=": el_operators.el_greater_or_equal,
+    "+": el_operators.el_add,
+    "-": el_operators.el_subtract,
+    "*": el_operators.el_multiply,
+    "/": el_operators.el_divide,
+    "%": el_operators.el_remainder,
+}
+
+
+def to_code(node, functions: Mapping[str, Optional[Callable]], format_variable: Callable[[str], str]) -> str:
+    """
+    Emits Python or Jinja code evaluating the expression. Both languages share the syntax
+    of the emitted constructs, so they only differ in how the variables are referenced.
+
+    :param node: Root node of the AST.
+    :param functions: Map of EL function names to the functions implementing them.
+    :param format_variable: Returns the code referencing the variable with the given name.
+    :return: The emitted code.
+    """
+    node_to_code = TO_CODE_FUNCTIONS.get(type(node))
+    if node_to_code is None:
+        raise ELParserException(f"Unknown EL node: {node}")
+    return node_to_code(node, functions, format_variable)
+
+
+def _literal_to_code(node: Literal, *_) -> str:
+    return node.source if isinstance(node.value, (str, int, float)) else repr(node.value)
+
+
+def _variable_to_code(node: Variable, _, format_variable: Callable[[str], str]) -> str:
+    return format_variable(node.name)
+
+
+def _function_call_to_code(
+    node: FunctionCall, functions: Mapping[str, Optional[Callable]], format_variable: Callable[[str], str]
+) -> str:
+    function = functions.get(node.name)
+    if function is None:
+        raise KeyError(f"{node.name} EL function not supported.")
+    arguments = ", ".join(to_code(argument, functions, format_variable) for argument in node.arguments)
+    return f"{function.__name__}({arguments})"
+
+
+def _unary_operation_to_code(
+    node: UnaryOperation, functions: Mapping[str, Optional[Callable]], format_variable: Callable[[str], str]
+) -> str:
+    operand = to_code(node.operand, functions, format_variable)
+    return f"{UNARY_OPERATIONS[node.operator].__name__}({operand})"
+
+
+def _binary_operation_to_code(
+    node: BinaryOperation, functions: Mapping[str, Optional[Callable]], format_variable: Callable[[str], str]
+) -> str:
+    if node.operator in ("and", "or"):
+        # Emitted as the Python operators, so that the right operand is evaluated only when needed
+        left, right = (
+            _to_boolean_code(child, _to_operand_code(child, functions, format_variable))
+            for child in (node.left, node.right)
+        )
+        return f"{left} {node.operator} {right}"
+    left = to_code(node.left, functions, format_variable)
+    right = to_code(node.right, functions, format_variable)
+    return f"{BINARY_OPERATIONS[node.operator].__name__}({left}, {right})"
+
+
+def _conditional_to_code(
+    node: Conditional, functions: Mapping[str, Optional[Callable]], format_variable: Callable[[str], str]
+) -> str:
+    condition = to_code(node.condition, functions, format_variable)
+    if_true = _to_operand_code(node.if_true, functions, format_variable)
+    if_false = _to_operand_code(node.if_false, functions, format_variable)
+    return f"{if_true} if {_to_boolean_code(node.condition, condition)} else {if_false}"
+
+
+def _index_to_code(
+    node: Index, functions: Mapping[str, Optional[Callable]], format_variable: Callable[[str], str]
+) -> str:
+    value = _to_operand_code(node.value, functions, format_variable)
+    return f"{value}[{to_code(node.index, functions, format_variable)}]"
+
+
+# Functions emitting the code of the nodes of the type
+TO_CODE_FUNCTIONS: Dict[type, Callable[..., str]] = {
+    Literal: _literal_to_code,
+    Variable: _variable_to_code,
+    FunctionCall: _function_call_to_code,
+    UnaryOperation: _unary_operation_to_code,
+    BinaryOperation: _binary_operation_to_code,
+    Conditional: _conditional_to_code,
+    Index: _index_to_code,
+}
+
+
+def _to_boolean_code(node, code: str) -> str:
+    if isinstance(node, (UnaryOperation, BinaryOperation)) and node.operator in BOOLEAN_OPERATORS:
+        return code
+    return f"{el_operators.el_to_boolean.__name__}({code})"
+
+
+def _to_operand_code(
+    node, functions: Mapping[str, Optional[Callable]], format_variable: Callable[[str], str]
+):
+    code = to_code(node, functions, format_variable)
+    if isinstance(node, Conditional) or (
+        isinstance(node, BinaryOperation) and node.operator in ("and", "or")
+    ):
+        return f"({code})"
+    return code
@@ -16,14 +16,32 @@
 import logging
 import os
 import re
-from typing import Dict, List, Optional, Union
+import threading
+from collections import ChainMap, OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
 from urllib.parse import urlparse, ParseResult
 
 from converter.exceptions import ParseException
 from o2a_libs import el_basic_functions
+from o2a_libs.el_macros import EL_MACROS
+from utils import el_parser
+from utils.constants import CONFIGURATION_PROPERTIES, JOB_PROPERTIES
+from utils.profile_utils import profiled
+from utils.properties_utils import Properties, load_properties_file
 
-FN_MATCH = re.compile(r"\${\s?(\w+)\(([\w\s,\'\"\-]*)\)\s?\}")
-VAR_MATCH = re.compile(r"\${([\w.]+)}")
+# Import of the macros registered in the DAGs whose Jinja templates call the EL functions or operators
+EL_MACROS_IMPORT = "from o2a_libs.el_macros import EL_MACROS"
+
+JINJA_EXPRESSION_MATCH = re.compile(r"{{(.*?)}}", re.DOTALL)
+FUNCTION_CALL_MATCH = re.compile(r"\b(\w+)\s*\(")
+
+# Number of the workflow applications whose params are kept for their next conversions
+WORKFLOW_PARAMS_CACHE_SIZE = 64
+
+# Params of the workflow applications by their directory and user, together with the mtime and
+# size of their properties files
+_WORKFLOW_PARAMS_CACHE: "OrderedDict[Tuple[str, str], Tuple[Tuple, Mapping[str, str]]]" = OrderedDict()
+_WORKFLOW_PARAMS_CACHE_LOCK = threading.Lock()
 
 EL_CONSTANTS = {"KB": 1024 ** 1, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4, "PB": 1024 ** 5}
 
@@ -40,6 +58,16 @@ EL_FUNCTIONS = {
     "toConfigurationStr": None,
 }
 
+# Functions whose result only depends on their arguments, so they can be evaluated at conversion time
+PURE_EL_FUNCTIONS: Dict[str, Callable] = {
+    "firstNotNull": el_basic_functions.first_not_null,
+    "concat": el_basic_functions.concat,
+    "replaceAll": el_basic_functions.replace_all,
+    "appendAll": el_basic_functions.append_all,
+    "trim": el_basic_functions.trim,
+    "urlEncode": el_basic_functions.url_encode,
+}
+
 WF_EL_FUNCTIONS = {
     "wf:id": None,
     "wf:name": None,
@@ -65,79 +93,141 @@ def strip_el(el_function):
     return re.sub("[${}]", "", el_function).strip()
 
 
+@profiled("el_resolution")
 def replace_el_with_var(el_function, params, quote=True):
     """
-    Only supports a single variable
+    Replaces the EL variables, e.g. ${hostname}, with their values from the params.
+    Other EL expressions are left as they are.
     """
-    # Matches oozie EL variables e.g. ${hostname}
-    var_match = VAR_MATCH.findall(el_function)
-
-    jinjafied_el = el_function
-    if var_match:
-        for var in var_match:
-            if var in params:
-                jinjafied_el = jinjafied_el.replace("${" + var + "}", params[var])
-            else:
-                logging.info(f"Couldn't replace EL {var}")
+    jinjafied_el = ""
+    for part in el_parser.parse_template(el_function):
+        if isinstance(part, str):
+            jinjafied_el += part
+        elif isinstance(part.node, el_parser.Variable) and part.node.name in params:
+            jinjafied_el += params[part.node.name]
+        else:
+            if isinstance(part.node, el_parser.Variable):
+                logging.info(f"Couldn't replace EL {part.node.name}")
+            jinjafied_el += part.source
 
     return "'" + jinjafied_el + "'" if quote else jinjafied_el
 
 
 def parse_el_func(el_function, el_func_map=None):
-    # Finds things like ${ function(arg1, arg2 } and returns
-    # a list like ['function', 'arg1, arg2']
+    """
+    Converts the first EL expression calling a function to Python, e.g.
+    ${concat("a", "b")} -> concat("a", "b"). Returns None if no function is called.
+    """
     if el_func_map is None:
         el_func_map = EL_FUNCTIONS
-    fn_match = FN_MATCH.findall(el_function)
+    for part in el_parser.parse_template(el_function):
+        if isinstance(part, el_parser.Expression) and not isinstance(part.node, el_parser.Variable):
+            return el_parser.to_code(part.node, el_func_map, _format_python_variable)
+    return None
 
-    if not fn_match:
-        return None
-
-    # fn_match is of the form [('concat', "'ls', '-l'")]
-    # for an el function like ${concat('ls', '-l')}
-    if fn_match[0][0] not in el_func_map:
-        raise KeyError("{} EL function not supported.".format(fn_match[0][0]))
-
-    mapped_func = el_func_map[fn_match[0][0]]
-
-    func_name = mapped_func.__name__
-    return "{}({})".format(func_name, fn_match[0][1])
 
-
-def convert_el_to_jinja(oozie_el, quote=True):
+@profiled("el_resolution")
+def convert_el_to_jinja(oozie_el, quote=True, params=None):
     """
-    Converts an EL with either a function or a variable to the form:
+    Converts an EL to the form:
     Variable:
         ${variable} -> {{ params.variable }}
-        ${func()} -> mapped_func()
+    Expression:
+        ${func(variable)} -> mapped_func(PARAMS["variable"])
 
-    Only supports a single variable or a single EL function.
+    If the whole EL is a single expression other than a variable, Python code evaluating
+    it is returned without quotes. Otherwise, the expressions are converted to Jinja and
+    the returned string is surrounded in single quotes if quote is true. Expressions
+    calling functions which are not supported yet are left as they are.
 
-    If quote is true, returns the string surround in single quotes, unless it
-    is a function, then no quotes are added.
+    If params are passed, the expressions using only their values and pure functions
+    are evaluated at conversion time and replaced with the result.
     """
-    # Matches oozie EL functions e.g. ${concat()}
-    fn_match = FN_MATCH.findall(oozie_el)
-    # Matches oozie EL variables e.g. ${hostname}
-    var_match = VAR_MATCH.findall(oozie_el)
+    parts = el_parser.parse_template(oozie_el)
+    if params is not None:
+        parts = _fold_template(parts, params)
+    expressions = [part for part in parts if isinstance(part, el_parser.Expression)]
+    if (
+        len(expressions) == 1
+        and not isinstance(expressions[0].node, el_parser.Variable)
+        and all(isinstance(part, el_parser.Expression) or not part.strip() for part in parts)
+    ):
+        try:
+            return el_parser.to_code(expressions[0].node, EL_FUNCTIONS, _format_python_variable)
+        except KeyError as ex:
+            logging.warning(f"Couldn't convert EL {expressions[0].source}: {ex}")
+
+    jinjafied_el = "".join(_convert_template_part_to_jinja(part) for part in parts)
+    return "'" + jinjafied_el + "'" if quote else jinjafied_el
 
-    jinjafied_el = oozie_el
 
-    if fn_match:
-        jinjafied_el = parse_el_func(oozie_el)
-        return jinjafied_el
-    if var_match:
-        for var in var_match:
-            jinjafied_el = jinjafied_el.replace("${" + var + "}", "{{ params." + var + " }}")
+def _convert_template_part_to_jinja(part: el_parser.TemplatePart) -> str:
+    if isinstance(part, str):
+        return part
+    if isinstance(part.node, el_parser.Literal):
+        return _to_text(part.node.value)
+    try:
+        return "{{ " + el_parser.to_code(part.node, EL_FUNCTIONS, _format_jinja_variable) + " }}"
+    except KeyError:
+        # Expressions calling functions that are not implemented yet are left as they are
+        return part.source
 
-    return "'" + jinjafied_el + "'" if quote else jinjafied_el
 
+def uses_el_macros(source: str) -> bool:
+    """
+    Checks if the Jinja templates in the generated source call any of the EL functions or
+    operators, which then have to be registered as the macros of the DAG.
 
-def parse_els(properties_file: Optional[str], prop_dict: Dict[str, str] = None):
+    :param source: The generated source of the tasks.
     """
-    Parses the properties file into a dictionary, if the value has
-    and EL function in it, it gets replaced with the corresponding
-    value that has already been parsed. For example, a file like:
+    return any(
+        name in EL_MACROS
+        for expression in JINJA_EXPRESSION_MATCH.findall(source)
+        for name in FUNCTION_CALL_MATCH.findall(expression)
+    )
+
+
+def _fold_template(
+    parts: Tuple[el_parser.TemplatePart, ...], params: Dict[str, str]
+) -> List[el_parser.TemplatePart]:
+    variables: "ChainMap[str, Any]" = ChainMap(params, EL_CONSTANTS)
+    folded_parts: List[el_parser.TemplatePart] = []
+    for part in parts:
+        if isinstance(part, el_parser.Expression):
+            node = el_parser.fold(part.node, PURE_EL_FUNCTIONS, variables)
+            part = el_parser.Expression(part.source, node)
+            if isinstance(node, el_parser.Literal) and isinstance(node.value, str):
+                part = node.value
+        folded_parts.append(part)
+    return folded_parts
+
+
+def _to_text(value) -> str:
+    """Converts the value to a string the way the EL does"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+def _format_python_variable(name: str) -> str:
+    if name in EL_CONSTANTS:
+        return str(EL_CONSTANTS[name])
+    return f'PARAMS["{name}"]'
+
+
+def _format_jinja_variable(name: str) -> str:
+    if name in EL_CONSTANTS:
+        return str(EL_CONSTANTS[name])
+    return f"params.{name}"
+
+
+def parse_els(properties_file: Optional[str], prop_dict: Mapping[str, str] = None) -> Mapping[str, str]:
+    """
+    Parses the properties file into a mapping. The values are resolved on first access:
+    an EL variable in a value gets replaced with the corresponding property, defined in
+    the file or in prop_dict. For example, a file like:
 
     job.properties
         host=user@google.com
@@ -148,29 +238,62 @@ def parse_els(properties_file: Optional[str], prop_dict: Dict[str, str] = None):
         host: 'user@google.com',
         command='ssh user@google.com',
     }
+
+    :param properties_file: Path to the properties file.
+    :param prop_dict: Properties which the properties from the file are layered on.
+    :return: Layered view of prop_dict and the properties from the file.
     """
     if prop_dict is None:
         prop_dict = {}
     if properties_file:
         if os.path.isfile(properties_file):
-            with open(properties_file, "r") as prop_file:
-                for line in prop_file.readlines():
-                    if line.startswith("#") or line.startswith(" ") or line.startswith("\n"):
-                        continue
-                    else:
-                        _convert_line(line, prop_dict)
+            if not isinstance(prop_dict, Properties):
+                prop_dict = Properties(prop_dict)
+            prop_dict = prop_dict.new_child(load_properties_file(properties_file))
         else:
             logging.warning(f"The properties file is missing: {properties_file}")
     return prop_dict
 
 
-def _convert_line(line: str, prop_dict: Dict[str, str]) -> None:
+def _get_file_version(file_path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_workflow_params(input_directory_path: str, user: str) -> Mapping[str, str]:
     """
-    Converts a line from the properties file and adds it to the properties dictionary.
+    Returns the params of the workflow application: the user name, the properties from
+    job.properties and, overriding them, the properties from configuration.properties.
+
+    The view is shared by all the conversions of the application by the same user in the
+    process - e.g. by the cache key and the conversion, or by all the parents of a common
+    sub-workflow in a batch - until its properties files change, so the values resolved by
+    one conversion are reused by the others.
+
+    :param input_directory_path: Oozie workflow application directory.
+    :param user: The user used in place of ${user.name}.
     """
-    key, value = line.split("=", 1)
-    value = replace_el_with_var(value.strip(), prop_dict, quote=False)
-    prop_dict[key.strip()] = value
+    input_directory_path = os.path.abspath(input_directory_path)
+    job_properties_file = os.path.join(input_directory_path, JOB_PROPERTIES)
+    configuration_properties_file = os.path.join(input_directory_path, CONFIGURATION_PROPERTIES)
+    key = (input_directory_path, user)
+    versions = (_get_file_version(job_properties_file), _get_file_version(configuration_properties_file))
+    with _WORKFLOW_PARAMS_CACHE_LOCK:
+        cached = _WORKFLOW_PARAMS_CACHE.get(key)
+        if cached and cached[0] == versions:
+            _WORKFLOW_PARAMS_CACHE.move_to_end(key)
+            return cached[1]
+    params = parse_els(job_properties_file, {"user.name": user})
+    params = parse_els(configuration_properties_file, params)
+    with _WORKFLOW_PARAMS_CACHE_LOCK:
+        _WORKFLOW_PARAMS_CACHE[key] = (versions, params)
+        _WORKFLOW_PARAMS_CACHE.move_to_end(key)
+        while len(_WORKFLOW_PARAMS_CACHE) > WORKFLOW_PARAMS_CACHE_SIZE:
+            _WORKFLOW_PARAMS_CACHE.popitem(last=False)
+    return params
 
 
 def comma_separated_string_to_list(line: str) -> Union[List[str], str]:
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Formatting of the generated Python sources"""
+import hashlib
+from collections import OrderedDict
+from typing import Tuple
+
+from utils.profile_utils import profiled
+
+LINE_LENGTH = 110
+
+# Maximum number of formatted sources kept in memory
+FORMATTED_SOURCES_CACHE_SIZE = 256
+FORMATTED_SOURCES_CACHE: "OrderedDict[Tuple[str, bool], str]" = OrderedDict()
+
+
+@profiled("format_source")
+def format_source(source: str, fast: bool = False) -> str:
+    """
+    Formats the Python source with black. Results are cached by the hash of the unformatted
+    source, so identical sources (e.g. a sub-workflow used by many workflows) are formatted once.
+
+    :param source: Python source to format.
+    :param fast: Skip black's AST equivalence and stability checks. The generated code comes
+        from trusted templates, so the checks can be safely skipped to save time.
+    :return: The formatted source.
+    """
+    key = (hashlib.sha256(source.encode()).hexdigest(), fast)
+    if key in FORMATTED_SOURCES_CACHE:
+        FORMATTED_SOURCES_CACHE.move_to_end(key)
+        return FORMATTED_SOURCES_CACHE[key]
+
+    # black is slow to import and not needed before the DAG is written
+    import black
+
+    try:
+        formatted_source = black.format_file_contents(
+            source, fast=fast, mode=black.FileMode(line_length=LINE_LENGTH)
+        )
+    except black.NothingChanged:
+        formatted_source = source
+
+    FORMATTED_SOURCES_CACHE[key] = formatted_source
+    if len(FORMATTED_SOURCES_CACHE) > FORMATTED_SOURCES_CACHE_SIZE:
+        FORMATTED_SOURCES_CACHE.popitem(last=False)
+    return formatted_source
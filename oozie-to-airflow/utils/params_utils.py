@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Finds the params referenced by the generated code, so that only these are written to the DAG"""
+import json
+import re
+from typing import Dict, Mapping, Set
+
+# PARAMS["name"] in the Python code
+PYTHON_REFERENCE_MATCH = re.compile(r"""\bPARAMS\[\s*(["'])(?P<name>.+?)\1\s*\]""")
+# params.name or params["name"] in the Jinja templates rendered by the operators
+JINJA_REFERENCE_MATCH = re.compile(
+    r"""\bparams(?:\.(?P<dotted_name>[A-Za-z_][\w.]*)|\[\s*(["'])(?P<name>.+?)\2\s*\])"""
+)
+# The operator argument passing all params to the task
+TASK_PARAMS_MATCH = re.compile(r"\bparams=PARAMS\b")
+
+
+def find_jinja_references(source: str, params: Mapping[str, str]) -> Set[str]:
+    """
+    Returns the keys of the params referenced by the Jinja templates in the source. As the
+    keys may contain dots, params.a.b references both the "a" and the "a.b" keys, if present.
+    """
+    keys: Set[str] = set()
+    for match in JINJA_REFERENCE_MATCH.finditer(source):
+        if match.group("name") is not None:
+            names = [match.group("name")]
+        else:
+            parts = match.group("dotted_name").rstrip(".").split(".")
+            names = [".".join(parts[: index + 1]) for index in range(len(parts))]
+        keys.update(name for name in names if name in params)
+    return keys
+
+
+def find_referenced_params(source: str, params: Mapping[str, str]) -> Set[str]:
+    """Returns the keys of the params referenced by the Python code or the Jinja templates in the source"""
+    keys = {match.group("name") for match in PYTHON_REFERENCE_MATCH.finditer(source)}
+    return {key for key in keys if key in params} | find_jinja_references(source, params)
+
+
+def prune_params(source: str, params: Mapping[str, str]) -> Dict[str, str]:
+    """Returns only the params referenced by the source, sorted by key"""
+    return {key: params[key] for key in sorted(find_referenced_params(source, params))}
+
+
+def project_task_params(task_source: str, params: Mapping[str, str]) -> str:
+    """
+    Replaces the params=PARAMS argument of the operators in the source of a task with a
+    dictionary of only the params referenced by the templates of the task.
+    """
+    if not TASK_PARAMS_MATCH.search(task_source):
+        return task_source
+    keys = sorted(find_jinja_references(task_source, params))
+    projection = ", ".join(f"{json.dumps(key)}: PARAMS[{json.dumps(key)}]" for key in keys)
+    return TASK_PARAMS_MATCH.sub(lambda _: f"params={{{projection}}}", task_source)
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Profiling of the time and memory spent in the phases of a conversion"""
+import contextlib
+import functools
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, TypeVar, cast
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore
+
+# Number of the slowest workflows listed in the report
+SLOWEST_WORKFLOWS_COUNT = 10
+# Number of the top allocation sites recorded at each memory checkpoint
+TOP_ALLOCATION_SITES_COUNT = 10
+# Number of frames stored by tracemalloc for every allocation
+TRACEMALLOC_FRAMES = 1
+
+# The phase that covers the whole conversion of a workflow
+TOTAL_PHASE = "convert_workflow"
+# Prefix of the phases recorded for every mapper - followed by the name of the mapper class
+PARSE_NODE_PHASE = "on_parse_node/"
+
+Function = TypeVar("Function", bound=Callable[..., Any])
+
+
+class PhaseStats:
+    """Number of runs and time spent in a phase"""
+
+    __slots__ = ("count", "wall_time", "cpu_time")
+
+    def __init__(self, count: int = 0, wall_time: float = 0.0, cpu_time: float = 0.0):
+        self.count = count
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+
+    def add(self, other: "PhaseStats") -> None:
+        self.count += other.count
+        self.wall_time += other.wall_time
+        self.cpu_time += other.cpu_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "wall_time": self.wall_time, "cpu_time": self.cpu_time}
+
+
+class Profile:
+    """
+    Wall and CPU time spent in the phases of the conversion. The phases may be nested,
+    and the time of a phase includes the time of the phases nested in it. A phase entered
+    again while it is running - e.g. by a recursive call - is recorded once.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, PhaseStats] = {}
+        self._running_phases: List[str] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if name in self._running_phases:
+            yield
+            return
+        self._running_phases.append(name)
+        start_wall_time = time.perf_counter()
+        start_cpu_time = time.process_time()
+        try:
+            yield
+        finally:
+            self.add(
+                name,
+                PhaseStats(1, time.perf_counter() - start_wall_time, time.process_time() - start_cpu_time),
+            )
+            self._running_phases.pop()
+
+    def add(self, name: str, stats: PhaseStats) -> None:
+        self.phases.setdefault(name, PhaseStats()).add(stats)
+
+    def merge(self, other: "Profile") -> None:
+        for name, stats in other.phases.items():
+            self.add(name, stats)
+
+    def get_mapper_counts(self) -> Dict[str, int]:
+        """Returns number of the parsed nodes per mapper class"""
+        return {
+            name.replace(PARSE_NODE_PHASE, "", 1): stats.count
+            for name, stats in sorted(self.phases.items())
+            if name.startswith(PARSE_NODE_PHASE)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "phases": {name: stats.to_dict() for name, stats in sorted(self.phases.items())},
+            "mapper_counts": self.get_mapper_counts(),
+        }
+
+    @classmethod
+    def from_dict(cls, profile_dict: Dict[str, Any]) -> "Profile":
+        profile = cls()
+        for name, stats in profile_dict["phases"].items():
+            profile.add(name, PhaseStats(**stats))
+        return profile
+
+    def format_table(self) -> str:
+        """Returns the phases as a table sorted by wall time, with the share of the total time"""
+        total = self.phases.get(TOTAL_PHASE)
+        total_wall_time = total.wall_time if total else sum(stats.wall_time for stats in self.phases.values())
+        lines = [f"{'Phase':<48}{'Count':>8}{'Wall [s]':>12}{'CPU [s]':>12}{'Wall %':>9}"]
+        for name, stats in sorted(self.phases.items(), key=lambda item: (-item[1].wall_time, item[0])):
+            share = 100 * stats.wall_time / total_wall_time if total_wall_time else 0.0
+            lines.append(
+                f"{name:<48}{stats.count:>8}{stats.wall_time:>12.3f}{stats.cpu_time:>12.3f}{share:>8.1f}%"
+            )
+        return "\n".join(lines)
+
+
+class _NoPhase:
+    """Context manager used in place of the phases when nothing is profiled"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+_ACTIVE_PROFILE: Optional[Profile] = None
+
+
+@contextlib.contextmanager
+def profiling(profile: Optional[Profile]) -> Iterator[Optional[Profile]]:
+    """
+    Records the phases run in the current process to the profile, while the context is active.
+    Nothing is recorded when the profile is None.
+    """
+    global _ACTIVE_PROFILE  # pylint: disable=global-statement
+    previous_profile = _ACTIVE_PROFILE
+    _ACTIVE_PROFILE = profile
+    try:
+        yield profile
+    finally:
+        _ACTIVE_PROFILE = previous_profile
+
+
+def phase(name: str):
+    """Returns a context manager recording the phase to the active profile, if there is one"""
+    if _ACTIVE_PROFILE is None:
+        return _NO_PHASE
+    return _ACTIVE_PROFILE.phase(name)
+
+
+def profiled(name: str) -> Callable[[Function], Function]:
+    """Decorator recording every call of the function as the phase"""
+
+    def decorator(func: Function) -> Function:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _ACTIVE_PROFILE is None:
+                return func(*args, **kwargs)
+            with _ACTIVE_PROFILE.phase(name):
+                return func(*args, **kwargs)
+
+        return cast(Function, wrapper)
+
+    return decorator
+
+
+def profile_iterator(name: str, iterable: Iterable) -> Iterator:
+    """Yields the items of the iterable, recording the time spent to get each item as the phase"""
+    iterator = iter(iterable)
+    while True:
+        with phase(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def write_profile_report(
+    workflow_profiles: Dict[str, Profile], profile_file_path: str, file: TextIO = None
+) -> None:
+    """
+    Prints the phases of all the workflows and the slowest workflows as tables, and writes
+    the profile of every workflow and their total as JSON to the profile file.
+
+    :param workflow_profiles: Dictionary of {'workflow directory': Profile}
+    :param profile_file_path: Path of the JSON file.
+    :param file: The file pointer to print to [defaults to stdout].
+    """
+    file = file or sys.stdout
+    total_profile = Profile()
+    for workflow_profile in workflow_profiles.values():
+        total_profile.merge(workflow_profile)
+    with open(profile_file_path, "w") as profile_file:
+        json.dump(
+            {
+                "total": total_profile.to_dict(),
+                "workflows": {path: profile.to_dict() for path, profile in sorted(workflow_profiles.items())},
+            },
+            profile_file,
+            indent=2,
+        )
+
+    print(file=file)
+    print(f"Profile of {len(workflow_profiles)} workflow(s):", file=file)
+    print(file=file)
+    print(total_profile.format_table(), file=file)
+    wall_times = {
+        path: profile.phases[TOTAL_PHASE].wall_time
+        for path, profile in workflow_profiles.items()
+        if TOTAL_PHASE in profile.phases
+    }
+    if len(wall_times) > 1:
+        print(file=file)
+        print("Slowest workflows:", file=file)
+        print(file=file)
+        slowest_paths = sorted(wall_times, key=lambda path: (-wall_times[path], path))[
+            :SLOWEST_WORKFLOWS_COUNT
+        ]
+        for path in slowest_paths:
+            print(f"{wall_times[path]:>10.3f}s  {path}", file=file)
+    print(file=file)
+    print(f"Profile saved to: {profile_file_path}", file=file)
+
+
+class AllocationSite(NamedTuple):
+    """Memory allocated by a line of code and still in use"""
+
+    location: str
+    size: int
+    blocks: int
+
+
+class MemoryCheckpoint(NamedTuple):
+    """Memory traced at the end of a phase"""
+
+    phase: str
+    current: int
+    peak: int
+    top_allocation_sites: List[AllocationSite]
+
+
+class MemoryProfile:
+    """
+    Memory allocated by the conversion, traced by tracemalloc. A checkpoint is taken at the
+    end of each phase with the memory in use, the peak since the previous checkpoint and the
+    lines of code which allocated most of the memory in use. On Python older than 3.9 the
+    peak cannot be reset, so it is the peak since the tracing started.
+    """
+
+    def __init__(self):
+        self.checkpoints: List[MemoryCheckpoint] = []
+
+    def checkpoint(self, phase_name: str) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+        )
+        top_allocation_sites = [
+            AllocationSite(
+                f"{statistic.traceback[0].filename}:{statistic.traceback[0].lineno}",
+                statistic.size,
+                statistic.count,
+            )
+            for statistic in snapshot.statistics("lineno")[:TOP_ALLOCATION_SITES_COUNT]
+        ]
+        self.checkpoints.append(MemoryCheckpoint(phase_name, current, peak, top_allocation_sites))
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    @property
+    def peak(self) -> int:
+        return max((checkpoint.peak for checkpoint in self.checkpoints), default=0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "peak": self.peak,
+            "checkpoints": [
+                {
+                    "phase": checkpoint.phase,
+                    "current": checkpoint.current,
+                    "peak": checkpoint.peak,
+                    "top_allocation_sites": [site._asdict() for site in checkpoint.top_allocation_sites],
+                }
+                for checkpoint in self.checkpoints
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, profile_dict: Dict[str, Any]) -> "MemoryProfile":
+        profile = cls()
+        for checkpoint in profile_dict["checkpoints"]:
+            profile.checkpoints.append(
+                MemoryCheckpoint(
+                    phase=checkpoint["phase"],
+                    current=checkpoint["current"],
+                    peak=checkpoint["peak"],
+                    top_allocation_sites=[
+                        AllocationSite(**site) for site in checkpoint["top_allocation_sites"]
+                    ],
+                )
+            )
+        return profile
+
+    def format_table(self) -> str:
+        """Returns the checkpoints as a table, followed by the top allocation sites at the highest peak"""
+        lines = [f"{'Phase':<48}{'Current [MB]':>14}{'Peak [MB]':>12}"]
+        for checkpoint in self.checkpoints:
+            lines.append(
+                f"{checkpoint.phase:<48}{_to_mb(checkpoint.current):>14.1f}{_to_mb(checkpoint.peak):>12.1f}"
+            )
+        if self.checkpoints:
+            highest_checkpoint = max(self.checkpoints, key=lambda checkpoint: checkpoint.peak)
+            lines.append("")
+            lines.append(
+                f"Top allocation sites after the phase with the highest peak ({highest_checkpoint.phase}):"
+            )
+            for site in highest_checkpoint.top_allocation_sites:
+                lines.append(f"{_to_mb(site.size):>10.1f} MB {site.blocks:>10} blocks  {site.location}")
+        return "\n".join(lines)
+
+
+def _to_mb(size: int) -> float:
+    return size / (1024 * 1024)
+
+
+_ACTIVE_MEMORY_PROFILE: Optional[MemoryProfile] = None
+
+
+@contextlib.contextmanager
+def memory_profiling(profile: Optional[MemoryProfile]) -> Iterator[Optional[MemoryProfile]]:
+    """
+    Traces the memory allocations with tracemalloc and records the checkpoints to the profile,
+    while the context is active. Nothing is traced when the profile is None.
+    """
+    global _ACTIVE_MEMORY_PROFILE  # pylint: disable=global-statement
+    if profile is None:
+        yield None
+        return
+    previous_profile = _ACTIVE_MEMORY_PROFILE
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    _ACTIVE_MEMORY_PROFILE = profile
+    try:
+        yield profile
+    finally:
+        _ACTIVE_MEMORY_PROFILE = previous_profile
+        if started:
+            tracemalloc.stop()
+
+
+def memory_checkpoint(phase_name: str) -> None:
+    """Takes a checkpoint of the memory at the end of the phase, if the memory is profiled"""
+    if _ACTIVE_MEMORY_PROFILE is not None:
+        _ACTIVE_MEMORY_PROFILE.checkpoint(phase_name)
+
+
+def get_peak_rss() -> Optional[int]:
+    """Returns the peak resident set size of the current process in bytes, if it is known"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def write_memory_profile_report(
+    workflow_profiles: Dict[str, MemoryProfile], profile_file_path: str, file: TextIO = None
+) -> None:
+    """
+    Prints the memory checkpoints of the workflow with the highest peak and the workflows with
+    the highest peaks, and writes the memory profile of every workflow as JSON to the file.
+
+    :param workflow_profiles: Dictionary of {'workflow directory': MemoryProfile}
+    :param profile_file_path: Path of the JSON file.
+    :param file: The file pointer to print to [defaults to stdout].
+    """
+    file = file or sys.stdout
+    with open(profile_file_path, "w") as profile_file:
+        json.dump(
+            {"workflows": {path: profile.to_dict() for path, profile in sorted(workflow_profiles.items())}},
+            profile_file,
+            indent=2,
+        )
+
+    print(file=file)
+    if workflow_profiles:
+        paths = sorted(workflow_profiles, key=lambda path: (-workflow_profiles[path].peak, path))
+        print(f"Memory profile of the workflow with the highest peak: {paths[0]}", file=file)
+        print(file=file)
+        print(workflow_profiles[paths[0]].format_table(), file=file)
+        if len(paths) > 1:
+            print(file=file)
+            print("Workflows with the highest peaks:", file=file)
+            print(file=file)
+            for path in paths[:SLOWEST_WORKFLOWS_COUNT]:
+                print(f"{_to_mb(workflow_profiles[path].peak):>10.1f} MB  {path}", file=file)
+        print(file=file)
+    print(f"Memory profile saved to: {profile_file_path}", file=file)
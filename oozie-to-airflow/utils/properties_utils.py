@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Loading of the Java properties files with lazy resolution of the EL variables"""
+import logging
+import os
+import re
+import threading
+from typing import Dict, FrozenSet, Iterator, List, Mapping, Optional, Set, Tuple
+
+from converter.exceptions import ParseException
+from utils import el_parser
+
+ESCAPE_MATCH = re.compile(r"\\(u[0-9a-fA-F]{4}|.)", re.DOTALL)
+ESCAPED_CHARACTERS = {"t": "\t", "n": "\n", "r": "\r", "f": "\f"}
+KEY_TERMINATORS = "=: \t\f"
+WHITESPACE = " \t\f"
+
+# Parsed properties files by path, together with the mtime and size of the parsed version
+_PROPERTIES_FILES_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+_PROPERTIES_FILES_CACHE_LOCK = threading.Lock()
+
+
+def _iterate_logical_lines(text: str) -> Iterator[str]:
+    """Joins the continued lines and skips the comments and blank lines"""
+    logical_line: List[str] = []
+    for natural_line in text.splitlines():
+        line = natural_line.lstrip(WHITESPACE)
+        if not logical_line and (not line or line[0] in "#!"):
+            continue
+        trailing_backslashes = len(line) - len(line.rstrip("\\"))
+        if trailing_backslashes % 2:
+            logical_line.append(line[:-1])
+            continue
+        logical_line.append(line)
+        yield "".join(logical_line)
+        logical_line = []
+    if logical_line:
+        yield "".join(logical_line)
+
+
+def _unescape(text: str) -> str:
+    def replace(match):
+        escaped = match.group(1)
+        if len(escaped) == 5:
+            return chr(int(escaped[1:], 16))
+        return ESCAPED_CHARACTERS.get(escaped, escaped)
+
+    return ESCAPE_MATCH.sub(replace, text)
+
+
+def _split_key_value(line: str) -> Tuple[str, str]:
+    """Splits the line at the first separator (=, : or whitespace) which is not escaped"""
+    position = 0
+    while position < len(line) and line[position] not in KEY_TERMINATORS:
+        position += 2 if line[position] == "\\" else 1
+    key = line[:position]
+    rest = line[position:].lstrip(WHITESPACE)
+    if rest[:1] in ("=", ":"):
+        rest = rest[1:].lstrip(WHITESPACE)
+    return _unescape(key), _unescape(rest)
+
+
+def parse_properties(text: str) -> Dict[str, str]:
+    """
+    Parses the content of a properties file following the format read by
+    java.util.Properties.load: comments, line continuations, all key-value
+    separators and escape sequences are supported.
+
+    :param text: Content of the properties file.
+    :return: Dictionary of {'key': 'unresolved value'}.
+    """
+    properties: Dict[str, str] = {}
+    for line in _iterate_logical_lines(text):
+        key, value = _split_key_value(line)
+        properties[key] = value
+    return properties
+
+
+def load_properties_file(properties_file: str) -> Dict[str, str]:
+    """
+    Returns the parsed properties file. Files are parsed once per process and parsed
+    again only when they change. The returned dictionary must not be modified.
+    """
+    properties_file = os.path.abspath(properties_file)
+    stat = os.stat(properties_file)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _PROPERTIES_FILES_CACHE.get(properties_file)
+    if cached and cached[0] == version:
+        return cached[1]
+    with open(properties_file, "r") as prop_file:
+        properties = parse_properties(prop_file.read())
+    with _PROPERTIES_FILES_CACHE_LOCK:
+        _PROPERTIES_FILES_CACHE[properties_file] = (version, properties)
+    return properties
+
+
+class Properties(Mapping[str, str]):
+    """
+    Read-only layered view of properties. The values of a layer override the values
+    of the layers below it. The ${var} references in the values are resolved on first
+    access against the whole view, so references to keys defined later or in upper
+    layers work, and keys that are never read are never resolved.
+
+    The layers are not modified by their upper layers, so a single layer can be shared
+    by many views, e.g. by all the conversions of a batch. A view reuses the resolved
+    values of the layers below it unless they reference keys it overrides.
+    """
+
+    def __init__(self, values: Mapping[str, str] = None, parent: "Properties" = None):
+        self._values = values if values is not None else {}
+        self._parent = parent
+        self._resolved: Dict[str, str] = {}
+        # Keys referenced, directly or not, by the resolved values
+        self._references: Dict[str, FrozenSet[str]] = {}
+        self._keys: Optional[List[str]] = None
+        self._lock = threading.RLock()
+
+    def new_child(self, values: Mapping[str, str]) -> "Properties":
+        """Returns a view with the values as a new layer on top of this one"""
+        return Properties(values, parent=self)
+
+    def __getitem__(self, key: str) -> str:
+        with self._lock:
+            return self._resolve(key, ())[0]
+
+    def __contains__(self, key) -> bool:
+        return key in self._values or (self._parent is not None and key in self._parent)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._keys is None:
+            keys = list(self._parent) if self._parent is not None else []
+            keys.extend(key for key in self._values if self._parent is None or key not in self._parent)
+            self._keys = keys
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)})"
+
+    def _get_raw(self, key: str) -> str:
+        if key in self._values:
+            return self._values[key]
+        if self._parent is not None:
+            return self._parent._get_raw(key)  # pylint: disable=protected-access
+        raise KeyError(key)
+
+    def _resolve(self, key: str, path: Tuple[str, ...]) -> Tuple[str, FrozenSet[str]]:
+        """
+        Returns the value with the variables of the properties replaced, and the names of the
+        variables it references. The path holds the keys being resolved, to detect cycles.
+        """
+        if key in self._resolved:
+            return self._resolved[key], self._references[key]
+        if key in path:
+            cycle_start = path.index(key)
+            cycle = " -> ".join(path[cycle_start:] + (key,))
+            raise ParseException(f"Cyclic reference in properties: {cycle}")
+        if key not in self._values and self._parent is not None and key in self._parent:
+            with self._parent._lock:  # pylint: disable=protected-access
+                parent_value, parent_references = self._parent._resolve(  # pylint: disable=protected-access
+                    key, ()
+                )
+            if not any(reference in self._values for reference in parent_references):
+                return self._remember(key, parent_value, parent_references)
+
+        value = ""
+        references: Set[str] = set()
+        for part in el_parser.parse_template(self._get_raw(key)):
+            if isinstance(part, str):
+                value += part
+                continue
+            if isinstance(part.node, el_parser.Variable):
+                name = part.node.name
+                references.add(name)
+                if name in self:
+                    resolved_value, resolved_references = self._resolve(name, path + (key,))
+                    references.update(resolved_references)
+                    value += resolved_value
+                    continue
+                logging.info(f"Couldn't replace EL {name}")
+            value += part.source
+        return self._remember(key, value, frozenset(references))
+
+    def _remember(self, key: str, value: str, references: FrozenSet[str]) -> Tuple[str, FrozenSet[str]]:
+        self._resolved[key] = value
+        self._references[key] = references
+        return value, references
@@ -13,8 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Relation utilities"""
-
-from typing import List, Sequence
+import heapq
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 from converter.primitives import Relation, Task
 
@@ -39,3 +39,125 @@ def chain(ops: Sequence[Task]) -> List[Relation]:
     :return: list of relations
     """
     return [Relation(from_task_id=a.task_id, to_task_id=b.task_id) for a, b in zip(ops, ops[1::])]
+
+
+def sort_relations(relations: Iterable[Relation]) -> List[Relation]:
+    """
+    Returns the relations in a stable order: by the topological order of their tasks,
+    where tasks with no order between them are ordered by their task_id. Tasks in cycles,
+    if any, come after all the other tasks, ordered by their task_id.
+
+    :param relations: relations between tasks
+    :return: sorted list of relations
+    """
+    relations = set(relations)
+    downstream_task_ids: Dict[str, Set[str]] = {}
+    upstream_count: Dict[str, int] = {}
+    for relation in relations:
+        downstream_task_ids.setdefault(relation.from_task_id, set()).add(relation.to_task_id)
+        downstream_task_ids.setdefault(relation.to_task_id, set())
+        upstream_count[relation.to_task_id] = upstream_count.get(relation.to_task_id, 0) + 1
+
+    ready_task_ids = [task_id for task_id in downstream_task_ids if not upstream_count.get(task_id)]
+    heapq.heapify(ready_task_ids)
+    task_order: Dict[str, int] = {}
+    while ready_task_ids:
+        task_id = heapq.heappop(ready_task_ids)
+        task_order[task_id] = len(task_order)
+        for downstream_task_id in downstream_task_ids[task_id]:
+            upstream_count[downstream_task_id] -= 1
+            if not upstream_count[downstream_task_id]:
+                heapq.heappush(ready_task_ids, downstream_task_id)
+    for task_id in sorted(set(downstream_task_ids) - set(task_order)):
+        task_order[task_id] = len(task_order)
+
+    return sorted(
+        relations,
+        key=lambda relation: (
+            task_order[relation.from_task_id],
+            task_order[relation.to_task_id],
+            relation.from_task_id,
+            relation.to_task_id,
+        ),
+    )
+
+
+def group_relations(relations: Iterable[Relation]) -> List[List[List[str]]]:
+    """
+    Groups the relations into chained statements, such as `[a, b] >> c >> d >> [e, f]`:
+    the tasks of every stage of a statement are upstream of the tasks of the next stage.
+    Only the first and the last stage can have more than one task - a fan-in and a fan-out,
+    as a list of tasks cannot be set upstream of another list. Each relation belongs to
+    exactly one statement, and the statements are ordered by their first relation.
+
+    :param relations: relations between tasks, in the desired order
+    :return: list of statements, each a list of stages, each a list of task_ids
+    """
+    relations = list(dict.fromkeys(relations))
+    downstream_task_ids: Dict[str, List[str]] = {}
+    upstream_task_ids: Dict[str, List[str]] = {}
+    for relation in relations:
+        downstream_task_ids.setdefault(relation.from_task_id, []).append(relation.to_task_id)
+        upstream_task_ids.setdefault(relation.to_task_id, []).append(relation.from_task_id)
+        downstream_task_ids.setdefault(relation.to_task_id, [])
+        upstream_task_ids.setdefault(relation.from_task_id, [])
+
+    def get_next_task_id(task_id: str) -> Optional[str]:
+        """Returns the only downstream task, if the task is its only upstream task"""
+        if len(downstream_task_ids[task_id]) != 1:
+            return None
+        next_task_id = downstream_task_ids[task_id][0]
+        return next_task_id if len(upstream_task_ids[next_task_id]) == 1 else None
+
+    def has_previous_task_id(task_id: str) -> bool:
+        upstream = upstream_task_ids[task_id]
+        return len(upstream) == 1 and get_next_task_id(upstream[0]) == task_id
+
+    def create_chain(head_task_id: str) -> List[str]:
+        chain_task_ids = [head_task_id]
+        next_task_id = get_next_task_id(head_task_id)
+        while next_task_id is not None and next_task_id != head_task_id:
+            chain_task_ids.append(next_task_id)
+            next_task_id = get_next_task_id(next_task_id)
+        if next_task_id == head_task_id:
+            # The tasks form a cycle
+            chain_task_ids.append(head_task_id)
+        return chain_task_ids
+
+    relation_indexes = {relation: index for index, relation in enumerate(relations)}
+    visited_task_ids: Set[str] = set()
+    statements: List[Tuple[int, List[List[str]]]] = []
+
+    def add_statement(chain_task_ids: List[str]) -> None:
+        visited_task_ids.update(chain_task_ids)
+        head_task_id, tail_task_id = chain_task_ids[0], chain_task_ids[-1]
+        # The relations from tasks with other downstream tasks belong to their fan-out
+        fan_in = [
+            task_id for task_id in upstream_task_ids[head_task_id] if len(downstream_task_ids[task_id]) == 1
+        ]
+        if has_previous_task_id(head_task_id):
+            fan_in = []
+        fan_out = downstream_task_ids[tail_task_id] if len(downstream_task_ids[tail_task_id]) > 1 else []
+        stages = [[task_id] for task_id in chain_task_ids]
+        if fan_in:
+            stages.insert(0, fan_in)
+        if fan_out:
+            stages.append(fan_out)
+        if len(stages) < 2:
+            return
+        statement_relations = [
+            Relation(from_task_id=from_task_id, to_task_id=to_task_id)
+            for from_stage, to_stage in zip(stages, stages[1:])
+            for from_task_id in from_stage
+            for to_task_id in to_stage
+        ]
+        position = min(relation_indexes[relation] for relation in statement_relations)
+        statements.append((position, stages))
+
+    for task_id in downstream_task_ids:
+        if not has_previous_task_id(task_id):
+            add_statement(create_chain(task_id))
+    for task_id in downstream_task_ids:
+        if task_id not in visited_task_ids:
+            add_statement(create_chain(task_id))
+    return [stages for _, stages in sorted(statements, key=lambda statement: statement[0])]
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Converts the generated source of the tasks to data literals, from which the task factory
+of o2a_libs creates the tasks when the DAG is loaded.
+"""
+import ast
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from converter.primitives import Relation
+from utils.relation_utils import sort_relations
+
+PARAMS_NAME = "PARAMS"
+# Name of the variable holding the tasks created by the factory, used when the code
+# kept as it is references them
+TASKS_VARIABLE_NAME = "o2a_tasks"
+TASK_FACTORY_IMPORT = "from o2a_libs import task_factory"
+
+# Value of an argument which cannot be written as data
+_NOT_CONVERTIBLE = object()
+
+
+class TaskType(NamedTuple):
+    operator_path: str
+    argument_names: Tuple[str, ...]
+    param_argument_names: Tuple[str, ...]
+
+
+class TaskRow(NamedTuple):
+    type_index: int
+    arguments: Tuple[Any, ...]
+    param_arguments: Tuple[Any, ...]
+
+
+def get_import_aliases(imports: Iterable[str]) -> Dict[str, str]:
+    """
+    Returns the full paths of the names bound by the import statements, e.g.
+    {"bash_operator": "airflow.operators.bash_operator"} for
+    "from airflow.operators import bash_operator".
+    """
+    aliases = {}
+    for statement in ast.parse("\n".join(imports)).body:
+        if isinstance(statement, ast.ImportFrom) and statement.module and not statement.level:
+            for alias in statement.names:
+                aliases[alias.asname or alias.name] = f"{statement.module}.{alias.name}"
+        elif isinstance(statement, ast.Import):
+            for alias in statement.names:
+                if alias.asname:
+                    aliases[alias.asname] = alias.name
+                else:
+                    name = alias.name.split(".", 1)[0]
+                    aliases[name] = name
+    return aliases
+
+
+def _literal_eval(node: ast.AST, default: Any) -> Any:
+    """Returns the value of the literal expression, or the default for other expressions"""
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return default
+
+
+def _get_subscript_key(node: ast.Subscript) -> Optional[str]:
+    """Returns the key of PARAMS["key"]"""
+    if not isinstance(node.value, ast.Name) or node.value.id != PARAMS_NAME:
+        return None
+    key_node = node.slice.value if isinstance(node.slice, ast.Index) else node.slice  # type: ignore
+    key = _literal_eval(key_node, default=None)
+    return key if isinstance(key, str) else None
+
+
+def convert_param_argument(node: ast.AST) -> Any:
+    """
+    Returns the data of an argument taken from the params, as resolved by the task factory:
+    None for PARAMS, the key for PARAMS["key"], and the list of the keys for a dictionary
+    of {"key": PARAMS["key"], ...}.
+    """
+    if isinstance(node, ast.Name) and node.id == PARAMS_NAME:
+        return None
+    if isinstance(node, ast.Subscript):
+        key = _get_subscript_key(node)
+        return key if key is not None else _NOT_CONVERTIBLE
+    if isinstance(node, ast.Dict):
+        keys = []
+        for key_node, value_node in zip(node.keys, node.values):
+            # The key node is None for a dictionary unpacked with **
+            if key_node is None:
+                return _NOT_CONVERTIBLE
+            key = _get_subscript_key(value_node) if isinstance(value_node, ast.Subscript) else None
+            if key is None or key != _literal_eval(key_node, default=None):
+                return _NOT_CONVERTIBLE
+            keys.append(key)
+        return keys
+    return _NOT_CONVERTIBLE
+
+
+def _get_task_names(node: ast.AST) -> Optional[List[str]]:
+    """Returns the names of the tasks in an operand of >>: a name or a list of names"""
+    if isinstance(node, ast.Name):
+        return [node.id]
+    if isinstance(node, ast.List) and all(isinstance(element, ast.Name) for element in node.elts):
+        return [element.id for element in node.elts]  # type: ignore
+    return None
+
+
+def _is_task_method(node: ast.expr, method_name: str) -> bool:
+    """Checks if the node is the method of the given name of a task referenced by its name"""
+    return isinstance(node, ast.Attribute) and node.attr == method_name and isinstance(node.value, ast.Name)
+
+
+def _is_set_downstream_call(expression: ast.expr) -> bool:
+    """Checks if the expression is a call of task.set_downstream(...) with a single argument"""
+    return (
+        isinstance(expression, ast.Call)
+        and _is_task_method(expression.func, "set_downstream")
+        and len(expression.args) == 1
+        and not expression.keywords
+    )
+
+
+def parse_relations(statement: ast.stmt) -> Optional[List[Relation]]:
+    """
+    Returns the relations set by a statement such as a >> [b, c] or a.set_downstream(b),
+    or None for other statements.
+    """
+    if not isinstance(statement, ast.Expr):
+        return None
+    expression = statement.value
+    if _is_set_downstream_call(expression):
+        downstream_task_ids = _get_task_names(expression.args[0])  # type: ignore
+        if downstream_task_ids is None:
+            return None
+        from_task_id = expression.func.value.id  # type: ignore
+        return [Relation(from_task_id=from_task_id, to_task_id=task_id) for task_id in downstream_task_ids]
+    stages: List[List[str]] = []
+    while isinstance(expression, ast.BinOp) and isinstance(expression.op, ast.RShift):
+        stages.insert(0, _get_task_names(expression.right))  # type: ignore
+        expression = expression.left
+    stages.insert(0, _get_task_names(expression))  # type: ignore
+    if len(stages) < 2 or any(stage is None for stage in stages):
+        return None
+    return [
+        Relation(from_task_id=from_task_id, to_task_id=to_task_id)
+        for from_stage, to_stage in zip(stages, stages[1:])
+        for from_task_id in from_stage
+        for to_task_id in to_stage
+    ]
+
+
+def _get_statement_segments(source: str, statements: List[ast.stmt]) -> List[str]:
+    """Splits the source into the lines of each top-level statement"""
+    lines = source.splitlines(keepends=True)
+    starts = [0]
+    for statement in statements[1:]:
+        decorator_lines = [decorator.lineno for decorator in getattr(statement, "decorator_list", [])]
+        starts.append(min([statement.lineno] + decorator_lines) - 1)
+    starts.append(len(lines))
+    return ["".join(lines[start:end]) for start, end in zip(starts, starts[1:])]
+
+
+class TaskTable:
+    """
+    Tasks of a DAG, as rows of the arguments of their operators, and the relations between
+    them. The statements which do not create a task from literal arguments and params, nor
+    set relations, are kept as code.
+    """
+
+    def __init__(self, import_aliases: Dict[str, str]):
+        self.import_aliases = import_aliases
+        self.task_types: Dict[TaskType, int] = {}
+        self.tasks: List[TaskRow] = []
+        self.task_ids: Set[str] = set()
+        self.relations: Set[Relation] = set()
+        self.code: List[str] = []
+
+    def _get_operator_path(self, node: ast.AST) -> Optional[str]:
+        if isinstance(node, ast.Name):
+            return self.import_aliases.get(node.id)
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+            module_path = self.import_aliases.get(node.value.id)
+            return f"{module_path}.{node.attr}" if module_path else None
+        return None
+
+    def _add_task(self, statement: ast.stmt) -> bool:
+        """Adds the task created by the statement, if it can be written as data"""
+        if (
+            not isinstance(statement, ast.Assign)
+            or len(statement.targets) != 1
+            or not isinstance(statement.targets[0], ast.Name)
+            or not isinstance(statement.value, ast.Call)
+            or statement.value.args
+        ):
+            return False
+        operator_path = self._get_operator_path(statement.value.func)
+        if not operator_path:
+            return False
+        arguments: Dict[str, Any] = {}
+        param_arguments: Dict[str, Any] = {}
+        for keyword in statement.value.keywords:
+            if keyword.arg is None:
+                return False
+            value = _literal_eval(keyword.value, default=_NOT_CONVERTIBLE)
+            if value is not _NOT_CONVERTIBLE:
+                arguments[keyword.arg] = value
+                continue
+            value = convert_param_argument(keyword.value)
+            if value is _NOT_CONVERTIBLE:
+                return False
+            param_arguments[keyword.arg] = value
+        # The variable is referenced by its task_id in the relations
+        task_id = statement.targets[0].id
+        if arguments.get("task_id") != task_id:
+            return False
+        task_type = TaskType(
+            operator_path=operator_path,
+            argument_names=tuple(arguments),
+            param_argument_names=tuple(param_arguments),
+        )
+        type_index = self.task_types.setdefault(task_type, len(self.task_types))
+        self.tasks.append(
+            TaskRow(
+                type_index=type_index,
+                arguments=tuple(arguments.values()),
+                param_arguments=tuple(param_arguments.values()),
+            )
+        )
+        self.task_ids.add(task_id)
+        return True
+
+    def add_source(self, source: str) -> None:
+        """
+        Adds the tasks and the relations of the generated source of the tasks. The other
+        statements are kept as code.
+
+        :param source: Generated source, not indented.
+        """
+        statements = ast.parse(source).body
+        for statement, segment in zip(statements, _get_statement_segments(source, statements)):
+            relations = parse_relations(statement)
+            if relations is not None:
+                self.relations.update(relations)
+            elif not self._add_task(statement):
+                self.code.append(segment)
+
+    def add_relations(self, relations: Iterable[Relation]) -> None:
+        self.relations.update(relations)
+
+    def get_code(self) -> str:
+        return "".join(self.code)
+
+    def get_referenced_task_ids(self) -> List[str]:
+        """Returns the task_ids of the tasks created by the factory and referenced by the code"""
+        names = {node.id for node in ast.walk(ast.parse(self.get_code())) if isinstance(node, ast.Name)}
+        return sorted(names & self.task_ids)
+
+    def render_data(self) -> str:
+        """Returns the data literals of the tasks and the relations"""
+        task_types = [tuple(task_type) for task_type in self.task_types]
+        tasks = [tuple(task) for task in self.tasks]
+        relations: Dict[str, List[str]] = {}
+        for relation in sort_relations(self.relations):
+            relations.setdefault(relation.from_task_id, []).append(relation.to_task_id)
+        return f"TASK_TYPES = {task_types!r}\n\n" f"TASKS = {tasks!r}\n\n" f"RELATIONS = {relations!r}\n\n"
+
+    def render_body(self) -> str:
+        """Returns the code creating the tasks and setting the relations in the body of the DAG"""
+        referenced_task_ids = self.get_referenced_task_ids()
+        create_tasks = f"task_factory.create_tasks(TASK_TYPES, TASKS, {PARAMS_NAME})\n"
+        if referenced_task_ids:
+            create_tasks = f"{TASKS_VARIABLE_NAME} = {create_tasks}"
+        bindings = "".join(
+            f"{task_id} = {TASKS_VARIABLE_NAME}[{task_id!r}]\n" for task_id in referenced_task_ids
+        )
+        # The body starts on a new line after the header of the DAG
+        return (
+            "\n"
+            + create_tasks
+            + bindings
+            + self.get_code()
+            + "\ntask_factory.set_relations(dag, RELATIONS)\n"
+        )
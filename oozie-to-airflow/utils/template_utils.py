@@ -13,21 +13,33 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Template utilities"""
+import functools
 from typing import Dict, Any
 
-import jinja2
-
 from definitions import TPL_PATH
+from utils.profile_utils import profiled
 
-TEMPLATE_LOADER = jinja2.FileSystemLoader(searchpath=TPL_PATH)
-TEMPLATE_ENV = jinja2.Environment(loader=TEMPLATE_LOADER)
 TEMPLATE_CACHES: Dict[str, Any] = {}
 
 
+@functools.lru_cache(maxsize=None)
+def get_template_env():
+    """Returns the Jinja environment, importing Jinja on first use"""
+    import jinja2
+
+    # Imported here, as the relations import this module
+    from utils.relation_utils import group_relations
+
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(searchpath=TPL_PATH))
+    env.filters["group_relations"] = group_relations
+    return env
+
+
+@profiled("render_template")
 def render_template(template_name: str, *args, **kwargs) -> str:
     """Render Jinja template"""
     if template_name not in TEMPLATE_CACHES:
-        template = TEMPLATE_ENV.get_template(template_name)
+        template = get_template_env().get_template(template_name)
         TEMPLATE_CACHES[template_name] = template
     content: str = TEMPLATE_CACHES[template_name].render(*args, **kwargs)
     return content
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Validates Oozie workflows against the XML schemas of the supported actions"""
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, NamedTuple
+
+from lxml import etree
+
+from definitions import SCHEMA_PATH
+
+
+class ValidationError(NamedTuple):
+    """Single schema violation found in a workflow file"""
+
+    file_path: str
+    line: int
+    column: int
+    message: str
+
+    def __str__(self):
+        return f"{self.file_path}:{self.line}:{self.column}: {self.message}"
+
+
+class ValidationResult(NamedTuple):
+    """Outcome of validating a single workflow file"""
+
+    file_path: str
+    errors: List[ValidationError]
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+
+# XMLSchema objects keep the error log of the last validation, so they must not be shared
+# between threads. The schema is compiled once per thread and reused for every file.
+_SCHEMAS = threading.local()
+
+
+def get_schema(schema_path: str = SCHEMA_PATH) -> etree.XMLSchema:
+    """Returns the compiled schema for the current thread, compiling it on first use"""
+    schemas = _SCHEMAS.__dict__.setdefault("schemas", {})
+    if schema_path not in schemas:
+        schemas[schema_path] = etree.XMLSchema(etree.parse(schema_path))
+    return schemas[schema_path]
+
+
+def _to_validation_errors(file_path: str, error_log) -> List[ValidationError]:
+    return [
+        ValidationError(file_path=file_path, line=error.line, column=error.column, message=error.message)
+        for error in error_log
+    ]
+
+
+def validate_workflow(file_path: str, schema_path: str = SCHEMA_PATH) -> ValidationResult:
+    """
+    Validates the workflow file against the schema.
+
+    :param file_path: Path to the workflow.xml file.
+    :param schema_path: Path to the XSD file including schemas of all supported actions.
+    :return: Result with all errors found in the file, empty when the file is valid.
+    """
+    schema = get_schema(schema_path)
+    # Errors of a previous failed parse in this thread would otherwise be reported again
+    etree.clear_error_log()
+    try:
+        document = etree.parse(file_path)
+    except etree.XMLSyntaxError as ex:
+        return ValidationResult(file_path=file_path, errors=_to_validation_errors(file_path, ex.error_log))
+    except OSError as ex:
+        return ValidationResult(
+            file_path=file_path,
+            errors=[ValidationError(file_path=file_path, line=0, column=0, message=str(ex))],
+        )
+    if schema.validate(document):
+        return ValidationResult(file_path=file_path, errors=[])
+    return ValidationResult(file_path=file_path, errors=_to_validation_errors(file_path, schema.error_log))
+
+
+def validate_workflows(
+    file_paths: Iterable[str], schema_path: str = SCHEMA_PATH, max_workers: int = None
+) -> List[ValidationResult]:
+    """
+    Validates many workflow files concurrently.
+
+    :param file_paths: Paths to the workflow.xml files.
+    :param schema_path: Path to the XSD file including schemas of all supported actions.
+    :param max_workers: Number of validating threads [defaults to ThreadPoolExecutor's default].
+    :return: Results in the order of the file paths.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda file_path: validate_workflow(file_path, schema_path), file_paths))
+
+
+def main(args: List[str]) -> int:
+    """Validates the workflow files passed as arguments and prints the errors found"""
+    results = validate_workflows(args)
+    for result in results:
+        if result.is_valid:
+            print(f"{result.file_path} validates")
+        for error in result.errors:
+            print(error)
+
+    failed = [result.file_path for result in results if not result.is_valid]
+    print()
+    if failed:
+        print("Some workflows failed validation:")
+        print()
+        for file_path in failed:
+            print(file_path)
+        print()
+        return 1
+    print("Workflows validated properly")
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
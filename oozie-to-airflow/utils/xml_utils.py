@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """XML parsing utilities"""
+from typing import Dict
+from xml.etree.ElementTree import Element
 
 
 class NoNodeFoundException(Exception):
@@ -43,6 +45,39 @@ def find_node_by_name(root, name):
     return node[0]
 
 
+def index_nodes_by_name(root) -> Dict[str, Element]:
+    """
+    Builds an index of the nodes with an attribute 'name', so that they can be
+    looked up in constant time. Only direct descendants of the root are indexed.
+
+    :param root: The node of which to index the direct descendants.
+    :return: Dictionary of {'name': XML node}. Raises an exception if more than
+        one node has the same name.
+    """
+    index: Dict[str, Element] = {}
+    for node in root:
+        name = node.attrib.get("name")
+        if name is None:
+            continue
+        if name in index:
+            raise MultipleNodeFoundException("More than one node with name {} found".format(name))
+        index[name] = node
+    return index
+
+
+def get_node_by_name(index: Dict[str, Element], name: str) -> Element:
+    """
+    Returns the node with the name from an index built with `index_nodes_by_name`.
+
+    :param index: Dictionary of {'name': XML node}.
+    :param name: Name of node to look for.
+    :return: The XML node that was found, or raises an exception if not found.
+    """
+    if name not in index:
+        raise NoNodeFoundException("Node with name {} not found.".format(name))
+    return index[name]
+
+
 def find_nodes_by_tag(root, tag):
     """
     Returns a list of XML nodes that have the tag provided. In this case